@@ -0,0 +1,98 @@
+"""
+Admission: Per-client token bucket rate limiting.
+Lets the API shed excess load with fast 429 responses instead of queueing
+work it cannot finish in time.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at a fixed rate."""
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize token bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def consume(self, cost: float = 1.0) -> Tuple[bool, float]:
+        """
+        Try to take tokens from the bucket.
+
+        Args:
+            cost: Tokens needed
+
+        Returns:
+            Tuple of (allowed, seconds until enough tokens are available)
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True, 0.0
+
+        if self.rate <= 0:
+            return False, float("inf")
+        return False, (cost - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token buckets keyed by client identity."""
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 10000):
+        """
+        Initialize rate limiter.
+
+        Args:
+            rate: Requests per second allowed per client
+            burst: Requests a client may make at once
+            max_clients: Buckets kept before the least recently seen is dropped
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, client_id: str, cost: float = 1.0) -> Tuple[bool, int]:
+        """
+        Charge a client for a request.
+
+        Args:
+            client_id: Client identity (API client id or remote address)
+            cost: Tokens the request costs, capped at the burst size
+
+        Returns:
+            Tuple of (allowed, Retry-After seconds when rejected)
+        """
+        if self.rate <= 0:
+            return True, 0
+
+        cost = min(cost, self.burst)
+
+        with self._lock:
+            bucket = self._buckets.get(client_id)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst)
+                self._buckets[client_id] = bucket
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            self._buckets.move_to_end(client_id)
+
+            allowed, wait = bucket.consume(cost)
+
+        return allowed, 0 if allowed else max(1, math.ceil(wait))
@@ -4,8 +4,14 @@ Creates code based on project plan and user preferences.
 """
 
 import json
-from typing import List, Dict, Any
-from schemas import ProjectPlan, GeneratedFile
+import threading
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Iterator, Optional
+from schemas import ProjectPlan, GeneratedFile, FileDefinition
+from cancellation import CancelToken, check_cancelled
+from lru_cache import LRUCache
+from template_engine import Template, compile_template
 
 
 class AgentGenerator:
@@ -137,7 +143,17 @@ pytest==7.4.3
 black==23.12.0
 flake8==6.1.0
 mypy==1.7.1
-''',
+{{#if pytorch}}
+torch==2.1.1
+torchvision==0.16.1
+{{/if}}{{#if tensorflow}}
+tensorflow==2.14.0
+{{/if}}{{#if scikit}}
+scikit-learn==1.3.2
+{{/if}}{{#if pandas}}
+pandas==2.1.1
+numpy==1.26.2
+{{/if}}''',
         "readme": '''# {{project_name}}
 
 ## Overview
@@ -154,7 +170,8 @@ mypy==1.7.1
 
 ## Tech Stack
 
-{{tech_stack}}
+{{#each tech_stack}}{{#if @index}}
+{{/if}}- {{this}}{{/each}}
 
 ## Project Structure
 
@@ -393,47 +410,170 @@ CMD ["python", "main.py"]
 '''
     }
     
-    def __init__(self):
-        """Initialize code generator."""
-        pass
+    # TEMPLATES parsed once; rendering is a single join per file
+    COMPILED_TEMPLATES = {
+        name: compile_template(source, name) for name, source in TEMPLATES.items()
+    }
+    
+    def __init__(self, workers: int = 1, use_processes: bool = False, cache_entries: int = 1024):
+        """
+        Initialize code generator.
+        
+        Args:
+            workers: Files generated concurrently; 1 generates serially
+            use_processes: Use a process pool instead of threads, for
+                CPU-bound generators (each file's plan is pickled)
+            cache_entries: Rendered files kept in the render cache; 0
+                disables it
+        """
+        # (template id, template version, context values) -> content; the
+        # same str object is returned for every hit, so identical files
+        # share memory and reviewer cache lookups hash them only once
+        self.render_cache = LRUCache(cache_entries)
+        self.workers = max(1, workers)
+        self.use_processes = use_processes
+        self._pool: Optional[Executor] = None
+        self._pool_lock = threading.Lock()
+        # Templates of the file each thread is generating
+        self._local = _FileTemplates()
     
     def generate_files(self, 
                       plan: ProjectPlan,
-                      memory: Dict[str, Any]) -> List[GeneratedFile]:
+                      memory: Dict[str, Any],
+                      progress_callback: Optional[Callable[..., None]] = None,
+                      cancel_token: Optional[CancelToken] = None,
+                      templates: Optional[Dict[str, Template]] = None) -> List[GeneratedFile]:
         """
         Generate code files based on project plan.
         
         Args:
             plan: Project plan from planner
             memory: User preferences from memory
+            progress_callback: Optional callback(stage, message, **data)
+                invoked after each file is generated
+            cancel_token: Optional token checked before each file
+            templates: Compiled templates to render with (default
+                COMPILED_TEMPLATES), e.g. a TemplateSet's generator templates
             
         Returns:
             List of generated files with content
+            
+        Raises:
+            JobCancelledError: If cancelled or past the deadline
         """
-        generated_files = []
+        return list(self.iter_generated_files(plan, memory, progress_callback, cancel_token, templates))
+    
+    def iter_generated_files(self,
+                             plan: ProjectPlan,
+                             memory: Dict[str, Any],
+                             progress_callback: Optional[Callable[..., None]] = None,
+                             cancel_token: Optional[CancelToken] = None,
+                             templates: Optional[Dict[str, Template]] = None) -> Iterator[GeneratedFile]:
+        """
+        Generate files one at a time, in plan order.
         
-        for file_def in plan.files:
-            content = self._generate_file_content(
-                file_def,
-                plan,
-                memory
-            )
+        With workers > 1, up to 2 * workers files are generated ahead on
+        the pool; results are yielded in plan order as soon as they are
+        next, so at most that many finished files are held at once.
+        Progress callbacks run in the caller's thread, in plan order.
+        
+        Args:
+            plan: Project plan from planner
+            memory: User preferences from memory
+            progress_callback: Optional callback(stage, message, **data)
+                invoked after each file is generated
+            cancel_token: Optional token checked before each file
+            templates: Compiled templates to render with (default
+                COMPILED_TEMPLATES); every file of the plan uses these
             
-            generated_file = GeneratedFile(
+        Yields:
+            Generated files with content
+            
+        Raises:
+            JobCancelledError: If cancelled or past the deadline
+        """
+        if self.workers == 1 or len(plan.files) <= 1:
+            for file_def in plan.files:
+                check_cancelled(cancel_token)
+                content = self._generate_file_content(file_def, plan, memory, templates)
+                yield self._generated_file(file_def, content, progress_callback)
+            return
+        
+        pool = self._get_pool()
+        task = _generate_in_worker if self.use_processes else self._generate_file_content
+        window = 2 * self.workers
+        pending = deque()
+        
+        try:
+            for file_def in plan.files:
+                check_cancelled(cancel_token)
+                pending.append((file_def, pool.submit(task, file_def, plan, memory, templates)))
+                if len(pending) >= window:
+                    file_def, future = pending.popleft()
+                    yield self._generated_file(file_def, future.result(), progress_callback)
+            
+            while pending:
+                check_cancelled(cancel_token)
+                file_def, future = pending.popleft()
+                yield self._generated_file(file_def, future.result(), progress_callback)
+        finally:
+            # Cancellation, an error or the caller stopping early: drop
+            # files not started yet
+            for _, future in pending:
+                future.cancel()
+    
+    def _generated_file(self,
+                        file_def: FileDefinition,
+                        content: str,
+                        progress_callback: Optional[Callable[..., None]]) -> GeneratedFile:
+        """Wrap generated content and report progress."""
+        generated_file = GeneratedFile(
+            path=file_def.path,
+            content=content,
+            reviewed=False
+        )
+        
+        if progress_callback:
+            progress_callback(
+                "generate",
+                f"Generated {file_def.path}",
                 path=file_def.path,
-                content=content,
-                reviewed=False
+                size=len(content)
             )
-            
-            generated_files.append(generated_file)
         
-        return generated_files
+        return generated_file
+    
+    def _get_pool(self) -> Executor:
+        """Get the generation pool, creating it on first parallel use."""
+        with self._pool_lock:
+            if self._pool is None:
+                pool_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+                self._pool = pool_class(max_workers=self.workers)
+            return self._pool
+    
+    def shutdown(self):
+        """Stop the generation pool, if one was started."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
     
     def _generate_file_content(self, 
                                file_def,
                                plan: ProjectPlan,
-                               memory: Dict[str, Any]) -> str:
-        """Generate content for a single file."""
+                               memory: Dict[str, Any],
+                               templates: Optional[Dict[str, Template]] = None) -> str:
+        """Generate content for a single file, rendering with templates."""
+        # The _generate_* methods render through _render, which reads the
+        # templates of the current thread's file
+        self._local.templates = templates
+        try:
+            return self._dispatch_file(file_def, plan, memory)
+        finally:
+            self._local.templates = None
+    
+    def _dispatch_file(self, file_def, plan: ProjectPlan, memory: Dict[str, Any]) -> str:
+        """Pick the generator for a file by its path and type."""
         file_type = file_def.file_type.lower()
         file_path = file_def.path.lower()
         
@@ -463,69 +603,46 @@ CMD ["python", "main.py"]
         framework = self._detect_framework(plan.tech_stack)
         
         template_key = f"{framework}_main"
-        template = self.TEMPLATES.get(template_key, self.TEMPLATES["fastapi_main"])
-        
-        # Replace placeholders
-        content = template
-        content = content.replace("{{project_name}}", plan.project_name)
-        content = content.replace("{{description}}", plan.description)
+        if template_key not in self._templates():
+            template_key = "fastapi_main"
         
-        return content
+        return self._render(template_key, {
+            "project_name": plan.project_name,
+            "description": plan.description
+        })
     
     def _generate_requirements(self, plan: ProjectPlan) -> str:
         """Generate requirements.txt."""
-        template = self.TEMPLATES["requirements"]
+        # Tech-specific requirements are {{#if <tech>}} sections of the
+        # template, keyed by the lowercased tech stack entries
+        context = dict.fromkeys([t.lower() for t in plan.tech_stack], True)
+        context["project_name"] = plan.project_name
+        context["python_version"] = "3.11"
         
-        tech_stack = ", ".join(plan.tech_stack)
-        
-        content = template
-        content = content.replace("{{project_name}}", plan.project_name)
-        content = content.replace("{{tech_stack}}", tech_stack)
-        content = content.replace("{{python_version}}", "3.11")
-        
-        # Add tech-specific requirements
-        if "pytorch" in [t.lower() for t in plan.tech_stack]:
-            content += "\ntorch==2.1.1\ntorchvision==0.16.1\n"
-        
-        if "tensorflow" in [t.lower() for t in plan.tech_stack]:
-            content += "\ntensorflow==2.14.0\n"
-        
-        if "scikit" in [t.lower() for t in plan.tech_stack]:
-            content += "\nscikit-learn==1.3.2\n"
-        
-        if "pandas" in [t.lower() for t in plan.tech_stack]:
-            content += "\npandas==2.1.1\nnumpy==1.26.2\n"
-        
-        return content
+        return self._render("requirements", context)
     
     def _generate_readme(self, plan: ProjectPlan) -> str:
         """Generate README.md."""
-        template = self.TEMPLATES["readme"]
-        
-        tech_stack = "\n".join([f"- {tech}" for tech in plan.tech_stack])
-        
-        content = template
-        content = content.replace("{{project_name}}", plan.project_name)
-        content = content.replace("{{description}}", plan.description)
-        content = content.replace("{{tech_stack}}", tech_stack)
-        
-        return content
+        return self._render("readme", {
+            "project_name": plan.project_name,
+            "description": plan.description,
+            "tech_stack": plan.tech_stack
+        })
     
     def _generate_env_file(self, plan: ProjectPlan) -> str:
         """Generate .env file."""
-        return self.TEMPLATES["env"]
+        return self._render("env")
     
     def _generate_gitignore(self) -> str:
         """Generate .gitignore."""
-        return self.TEMPLATES["gitignore"]
+        return self._render("gitignore")
     
     def _generate_model(self, plan: ProjectPlan) -> str:
         """Generate model file."""
         if "pytorch" in [t.lower() for t in plan.tech_stack]:
-            template = self.TEMPLATES["model_pytorch"]
-            project_class_name = self._camel_case(plan.project_name)
-            content = template.replace("{{ProjectName}}", project_class_name)
-            return content
+            return self._render("model_pytorch", {
+                "ProjectName": self._camel_case(plan.project_name)
+            })
         
         # Generic model template
         return self._generate_generic_file(
@@ -535,11 +652,36 @@ CMD ["python", "main.py"]
     
     def _generate_test(self, plan: ProjectPlan) -> str:
         """Generate test file."""
-        return self.TEMPLATES["test_main"]
+        return self._render("test_main")
     
     def _generate_dockerfile(self) -> str:
         """Generate Dockerfile."""
-        return self.TEMPLATES["dockerfile"]
+        return self._render("dockerfile")
+    
+    def _render(self, template_id: str, context: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Render a compiled template through the render cache.
+        
+        Only the context values the template reads are part of the key,
+        so e.g. every project gets the same cached .gitignore.
+        """
+        template = self._templates()[template_id]
+        context = context or {}
+        key = (
+            template_id,
+            template.version,
+            tuple(_hashable(context.get(name)) for name in template.variables)
+        )
+        
+        content = self.render_cache.get(key)
+        if content is None:
+            content = template.render(context)
+            self.render_cache.put(key, content)
+        return content
+    
+    def _templates(self) -> Dict[str, Template]:
+        """Templates of the file being generated on this thread."""
+        return self._local.templates or self.COMPILED_TEMPLATES
     
     def _generate_generic_file(self, file_def, plan: ProjectPlan) -> str:
         """Generate a generic Python file."""
@@ -582,3 +724,28 @@ if __name__ == "__main__":
         """Convert snake_case to CamelCase."""
         components = snake_str.split('_')
         return ''.join(x.title() for x in components)
+
+
+class _FileTemplates(threading.local):
+    """Per-thread templates of the file being generated (None: the built-ins)."""
+    templates: Optional[Dict[str, Template]] = None
+
+
+def _hashable(value: Any) -> Any:
+    """Context value usable in a cache key (lists become tuples)."""
+    return tuple(value) if isinstance(value, list) else value
+
+
+# Generator of a pool worker process, kept so its render cache is reused
+_worker_generator: Optional[AgentGenerator] = None
+
+
+def _generate_in_worker(file_def: FileDefinition,
+                        plan: ProjectPlan,
+                        memory: Dict[str, Any],
+                        templates: Optional[Dict[str, Template]] = None) -> str:
+    """Process pool task: generate one file's content."""
+    global _worker_generator
+    if _worker_generator is None:
+        _worker_generator = AgentGenerator()
+    return _worker_generator._generate_file_content(file_def, plan, memory, templates)
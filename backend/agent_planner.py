@@ -4,7 +4,7 @@ Decides project structure, files, and folder organization.
 """
 
 import json
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from schemas import ProjectPlan, FileDefinition
 
 
@@ -76,7 +76,8 @@ class AgentPlanner:
     def plan(self, 
             prompt: str,
             memory: Dict[str, Any],
-            project_name_override: str = None) -> ProjectPlan:
+            project_name_override: str = None,
+            templates: Optional[Dict[str, Dict[str, Any]]] = None) -> ProjectPlan:
         """
         Create project plan from prompt.
         
@@ -84,6 +85,8 @@ class AgentPlanner:
             prompt: Natural language project description
             memory: User preferences from memory system
             project_name_override: Optional project name override
+            templates: Project templates by framework (default TEMPLATES),
+                e.g. a TemplateSet's planner templates
             
         Returns:
             ProjectPlan object with structure and files
@@ -102,7 +105,8 @@ class AgentPlanner:
         files = self._build_file_structure(
             detected_tech, 
             primary_framework, 
-            prompt_lower
+            prompt_lower,
+            templates or self.TEMPLATES
         )
         
         # Create structure description
@@ -181,12 +185,13 @@ class AgentPlanner:
     def _build_file_structure(self,
                              tech_stack: List[str],
                              framework: str,
-                             prompt: str) -> List[FileDefinition]:
+                             prompt: str,
+                             templates: Dict[str, Dict[str, Any]]) -> List[FileDefinition]:
         """Build list of files needed for project."""
         files = []
         
         # Start with framework template
-        template = self.TEMPLATES.get(framework, self.TEMPLATES["fastapi"])
+        template = templates.get(framework, templates["fastapi"])
         base_files = template.get("files", [])
         
         for file_def in base_files:
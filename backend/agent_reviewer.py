@@ -4,8 +4,10 @@ Reviews, validates, and improves code quality automatically.
 """
 
 import re
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Callable, Optional
 from schemas import GeneratedFile
+from cancellation import CancelToken, check_cancelled
+from lru_cache import LRUCache
 
 
 class AgentReviewer:
@@ -31,25 +33,67 @@ class AgentReviewer:
         }
     }
     
-    def __init__(self):
-        """Initialize reviewer."""
-        pass
+    # Function definitions, compiled once instead of per reviewed line
+    DEF_PATTERN = re.compile(r'\s*def\s+\w+\s*\(')
+    DEF_NAME_PATTERN = re.compile(r'def\s+(\w+)')
     
-    def review_files(self, files: List[GeneratedFile]) -> List[GeneratedFile]:
+    def __init__(self, cache_entries: int = 1024):
+        """
+        Initialize reviewer.
+        
+        Args:
+            cache_entries: Review results kept in the review cache; 0
+                disables it
+        """
+        # (file type, content) -> (improved content, notes): a review
+        # depends on nothing else, so files many projects share (.gitignore,
+        # Dockerfile, tests, ...) are reviewed once
+        self.review_cache = LRUCache(cache_entries)
+    
+    def warm_up(self):
+        """Exercise every review rule once so the first real review is not slower."""
+        sample = GeneratedFile(
+            path="warm_up.py",
+            content='def run(value):\n    return value\n\n\ndef main(a, b, c, d, e, f, g, h, i, j, k, l, m, n, o, p, q, r, s):\n    pass\n'
+        )
+        # _review, not review_file: a cached result would skip the rules
+        self._review(sample)
+        self.validate_syntax(sample)
+        self.get_code_metrics(sample)
+    
+    def review_files(self,
+                    files: List[GeneratedFile],
+                    progress_callback: Optional[Callable[..., None]] = None,
+                    cancel_token: Optional[CancelToken] = None) -> List[GeneratedFile]:
         """
         Review and improve all generated files.
         
         Args:
             files: List of generated files
+            progress_callback: Optional callback(stage, message, **data)
+                invoked after each file is reviewed
+            cancel_token: Optional token checked before each file
             
         Returns:
             Improved files with review notes
+            
+        Raises:
+            JobCancelledError: If cancelled or past the deadline
         """
         reviewed_files = []
         
         for file_obj in files:
+            check_cancelled(cancel_token)
             reviewed_file = self.review_file(file_obj)
             reviewed_files.append(reviewed_file)
+            
+            if progress_callback:
+                progress_callback(
+                    "review",
+                    f"Reviewed {reviewed_file.path}",
+                    path=reviewed_file.path,
+                    notes=reviewed_file.review_notes
+                )
         
         return reviewed_files
     
@@ -63,6 +107,19 @@ class AgentReviewer:
         Returns:
             Improved file object
         """
+        key = (self._file_type(file_obj.path), file_obj.content)
+        result = self.review_cache.get(key)
+        if result is None:
+            result = self._review(file_obj)
+            self.review_cache.put(key, result)
+        
+        file_obj.content, file_obj.review_notes = result
+        file_obj.reviewed = True
+        
+        return file_obj
+    
+    def _review(self, file_obj: GeneratedFile) -> Tuple[str, str]:
+        """Analyze and fix a file, returning (improved content, notes)."""
         issues = self._analyze_file(file_obj)
         improved_content = file_obj.content
         
@@ -75,16 +132,17 @@ class AgentReviewer:
                     file_obj.path
                 )
         
-        file_obj.content = improved_content
-        file_obj.reviewed = True
-        file_obj.review_notes = self._generate_review_notes(issues)
-        
-        return file_obj
+        return improved_content, self._generate_review_notes(issues)
+    
+    @staticmethod
+    def _file_type(path: str) -> str:
+        """Type the review rules go by: the lowercased extension."""
+        return path.split('.')[-1].lower()
     
     def _analyze_file(self, file_obj: GeneratedFile) -> Dict[str, Dict]:
         """Analyze file for common issues."""
         content = file_obj.content
-        file_type = file_obj.path.split('.')[-1].lower()
+        file_type = self._file_type(file_obj.path)
         
         issues = {
             "missing_imports": {"found": False, "count": 0},
@@ -224,14 +282,14 @@ class AgentReviewer:
             fixed_lines.append(line)
             
             # Check if this is a function definition
-            if re.match(r'\s*def\s+\w+\s*\(', line):
+            if self.DEF_PATTERN.match(line):
                 # Check if next line is not a docstring
                 if i + 1 < len(lines):
                     next_line = lines[i + 1].strip()
                     if not next_line.startswith('"""') and next_line:
                         # Add docstring
                         indent = len(line) - len(line.lstrip()) + 4
-                        func_name = re.search(r'def\s+(\w+)', line)
+                        func_name = self.DEF_NAME_PATTERN.search(line)
                         if func_name:
                             docstring = f'{" " * indent}"""Function documentation."""'
                             fixed_lines.append(docstring)
@@ -246,7 +304,7 @@ class AgentReviewer:
         fixed_lines = []
         
         for line in lines:
-            if re.match(r'\s*def\s+\w+\s*\(', line) and '->' not in line:
+            if self.DEF_PATTERN.match(line) and '->' not in line:
                 # Add return type hint
                 if line.rstrip().endswith(':'):
                     line = line.rstrip()[:-1] + ' -> Any:'
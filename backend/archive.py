@@ -0,0 +1,196 @@
+"""
+Archive: Streaming ZIP and tar.gz export of project directories.
+Archives are produced chunk by chunk while files are read, so a download
+needs no temporary file and server memory stays constant with project size.
+"""
+
+import os
+import tarfile
+import time
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+
+CHUNK_SIZE = 64 * 1024
+
+# format -> (media type, file extension)
+FORMATS: Dict[str, Tuple[str, str]] = {
+    "zip": ("application/zip", ".zip"),
+    "tar.gz": ("application/gzip", ".tar.gz")
+}
+
+
+class _ChunkBuffer:
+    """Write-only, unseekable sink that hands written bytes back in chunks."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        """Return and forget everything written so far."""
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _project_files(root: Path) -> Iterator[Tuple[Path, str]]:
+    """
+    Yield (path, archive name) for every file under root in sorted order.
+
+    Symlinks are skipped, so a link inside a project can't pull content
+    from outside it; os.walk doesn't descend into linked directories.
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = Path(dirpath) / filename
+            if path.is_symlink():
+                continue
+            yield path, path.relative_to(root).as_posix()
+
+
+def _open_file(path: Path):
+    """Open a file for reading, refusing a symlink swapped in after the walk."""
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+    return os.fdopen(fd, "rb")
+
+
+def iter_zip(root: Path, prefix: str = "", chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Stream a deflated ZIP archive of a directory.
+
+    zipfile writes local headers with data descriptors when its output is
+    not seekable, so entries can be emitted before their CRC is known.
+
+    Args:
+        root: Directory to archive
+        prefix: Top-level folder name inside the archive
+        chunk_size: Bytes read from each file at a time
+
+    Yields:
+        Archive bytes
+    """
+    buffer = _ChunkBuffer()
+
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for path, name in _project_files(root):
+            try:
+                source = _open_file(path)
+                stat = os.fstat(source.fileno())
+            except OSError as e:
+                print(f"✗ Skipping {path} in archive: {e}")
+                continue
+
+            info = zipfile.ZipInfo(
+                f"{prefix}/{name}" if prefix else name,
+                date_time=time.localtime(stat.st_mtime)[:6]
+            )
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = (stat.st_mode & 0xFFFF) << 16
+            info.file_size = stat.st_size
+
+            with source, archive.open(info, mode="w", force_zip64=stat.st_size > zipfile.ZIP64_LIMIT) as entry:
+                while True:
+                    chunk = source.read(chunk_size)
+                    if not chunk:
+                        break
+                    entry.write(chunk)
+                    data = buffer.drain()
+                    if data:
+                        yield data
+
+            data = buffer.drain()
+            if data:
+                yield data
+
+    # Central directory
+    data = buffer.drain()
+    if data:
+        yield data
+
+
+def iter_tar_gz(root: Path,
+                prefix: str = "",
+                chunk_size: int = CHUNK_SIZE,
+                compresslevel: int = 6) -> Iterator[bytes]:
+    """
+    Stream a gzip-compressed tar archive of a directory.
+
+    Tar members are laid out by hand (header, data, padding) so each file
+    is compressed as it is read instead of being staged by tarfile.
+
+    Args:
+        root: Directory to archive
+        prefix: Top-level folder name inside the archive
+        chunk_size: Bytes read from each file at a time
+        compresslevel: gzip compression level
+
+    Yields:
+        Archive bytes
+    """
+    # wbits=31 makes zlib emit a complete gzip stream (header and trailer)
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, 31)
+    written = 0
+
+    for path, name in _project_files(root):
+        try:
+            source = _open_file(path)
+            stat = os.fstat(source.fileno())
+        except OSError as e:
+            print(f"✗ Skipping {path} in archive: {e}")
+            continue
+
+        info = tarfile.TarInfo(f"{prefix}/{name}" if prefix else name)
+        info.size = stat.st_size
+        info.mtime = int(stat.st_mtime)
+        info.mode = stat.st_mode & 0o7777
+        header = info.tobuf(format=tarfile.PAX_FORMAT)
+        written += len(header)
+        data = compressor.compress(header)
+        if data:
+            yield data
+
+        # The header fixed the size; truncate growth and zero-fill shrinkage
+        remaining = info.size
+        with source:
+            while remaining > 0:
+                chunk = source.read(min(chunk_size, remaining)) or b"\0" * min(chunk_size, remaining)
+                remaining -= len(chunk)
+                written += len(chunk)
+                data = compressor.compress(chunk)
+                if data:
+                    yield data
+
+        padding = -info.size % tarfile.BLOCKSIZE
+        written += padding
+        data = compressor.compress(b"\0" * padding)
+        if data:
+            yield data
+
+    # End-of-archive marker, padded to a full record like tarfile does
+    trailer = 2 * tarfile.BLOCKSIZE
+    trailer += -(written + trailer) % tarfile.RECORDSIZE
+    yield compressor.compress(b"\0" * trailer) + compressor.flush()
+
+
+def iter_archive(root: Path, archive_format: str, prefix: str = "") -> Iterator[bytes]:
+    """
+    Stream an archive of a directory in one of FORMATS.
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    if archive_format == "zip":
+        return iter_zip(root, prefix)
+    if archive_format == "tar.gz":
+        return iter_tar_gz(root, prefix)
+    raise ValueError(f"Unsupported archive format: {archive_format}")
@@ -0,0 +1,71 @@
+"""
+Cancellation: Cooperative cancellation and deadlines for long-running work.
+Pipeline stages and per-file loops call CancelToken.check() at safe points
+so a cancelled or overdue job stops without leaving half-written files.
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+# Cancellation reasons
+CLIENT_CANCELLED = "cancelled by client"
+DEADLINE_EXCEEDED = "deadline exceeded"
+
+
+class JobCancelledError(Exception):
+    """Raised at a check point once work has been cancelled or timed out."""
+
+
+class CancelToken:
+    """Thread-safe cancellation flag with an optional deadline."""
+
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        Initialize cancel token.
+
+        Args:
+            timeout: Seconds from now after which the work is cancelled;
+                None for no deadline
+        """
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the work was cancelled or its deadline has passed."""
+        if not self._event.is_set() and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel(DEADLINE_EXCEEDED)
+        return self._event.is_set()
+
+    def cancel(self, reason: str = CLIENT_CANCELLED):
+        """Request cancellation; the first reason given is kept."""
+        with self._lock:
+            if not self._event.is_set():
+                self.reason = reason
+                self._event.set()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None without one."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self):
+        """
+        Stop the caller if work should no longer continue.
+
+        Raises:
+            JobCancelledError: If cancelled or past the deadline
+        """
+        if self.cancelled:
+            raise JobCancelledError(self.reason)
+
+
+def check_cancelled(cancel_token: Optional[CancelToken]):
+    """Call cancel_token.check() when a token was given."""
+    if cancel_token is not None:
+        cancel_token.check()
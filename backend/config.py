@@ -27,6 +27,68 @@ class Config:
     GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
     GITHUB_USERNAME = os.getenv("GITHUB_USERNAME", "")
     
+    # Job engine
+    MAX_WORKERS = int(os.getenv("MAX_WORKERS", "4"))
+    MAX_JOB_HISTORY = int(os.getenv("MAX_JOB_HISTORY", "1000"))
+    MAX_QUEUE_SIZE = int(os.getenv("MAX_QUEUE_SIZE", "32"))
+    INTERACTIVE_RESERVED_WORKERS = int(os.getenv("INTERACTIVE_RESERVED_WORKERS", "1"))
+    BATCH_NICENESS = int(os.getenv("BATCH_NICENESS", "10"))
+    BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", str(os.cpu_count() or 1)))
+    MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "100"))
+    MAX_CONCURRENT_BATCHES = int(os.getenv("MAX_CONCURRENT_BATCHES", "1"))
+    BATCH_RETRY_AFTER = int(os.getenv("BATCH_RETRY_AFTER", "30"))
+    JOB_TIMEOUT_SECONDS = float(os.getenv("JOB_TIMEOUT_SECONDS", "600"))
+    
+    # Files generated concurrently within one job (1 = serial); processes
+    # instead of threads help only CPU-bound generators
+    GENERATOR_WORKERS = int(os.getenv("GENERATOR_WORKERS", "1"))
+    GENERATOR_USE_PROCESSES = os.getenv("GENERATOR_USE_PROCESSES", "False").lower() == "true"
+    
+    # Files buffered between the streaming generate/review/write stages
+    PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "4"))
+    
+    # On-disk template packs layered over the built-in templates; checked
+    # for changes every TEMPLATE_RELOAD_INTERVAL seconds (0 disables)
+    TEMPLATE_PACKS_DIR = os.getenv("TEMPLATE_PACKS_DIR", "templates")
+    TEMPLATE_RELOAD_INTERVAL = float(os.getenv("TEMPLATE_RELOAD_INTERVAL", "2"))
+    
+    # Admission control (per-client token bucket; rate 0 disables)
+    RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", "2"))
+    RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "10"))
+    
+    # Result cache
+    RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "True").lower() == "true"
+    RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", "cache/results")
+    RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256"))
+    RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    
+    # Response compression (gzip, or brotli when installed)
+    COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+    GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "1"))
+    BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+    
+    # Startup warm-up: synthetic generations before /ready reports ready
+    WARM_UP_ENABLED = os.getenv("WARM_UP_ENABLED", "True").lower() == "true"
+    
+    # In-memory cache of /plan previews
+    PLAN_CACHE_MAX_ENTRIES = int(os.getenv("PLAN_CACHE_MAX_ENTRIES", "512"))
+    
+    # In-memory caches of rendered templates and per-file review results
+    RENDER_CACHE_MAX_ENTRIES = int(os.getenv("RENDER_CACHE_MAX_ENTRIES", "1024"))
+    REVIEW_CACHE_MAX_ENTRIES = int(os.getenv("REVIEW_CACHE_MAX_ENTRIES", "1024"))
+    
+    # Project file index
+    PROJECT_INDEX_DIR = os.getenv("PROJECT_INDEX_DIR", "cache/index")
+    
+    # Push queue (durable, retried GitHub pushes)
+    PUSH_QUEUE_DB = os.getenv("PUSH_QUEUE_DB", "memory/push_queue.db")
+    PUSH_WORKERS = int(os.getenv("PUSH_WORKERS", "2"))
+    PUSH_MAX_ATTEMPTS = int(os.getenv("PUSH_MAX_ATTEMPTS", "5"))
+    PUSH_RETRY_BASE_DELAY = float(os.getenv("PUSH_RETRY_BASE_DELAY", "2"))
+    PUSH_RETRY_MAX_DELAY = float(os.getenv("PUSH_RETRY_MAX_DELAY", "300"))
+    PUSH_MAX_PENDING = int(os.getenv("PUSH_MAX_PENDING", "100"))
+    PUSH_ATTEMPT_TIMEOUT = float(os.getenv("PUSH_ATTEMPT_TIMEOUT", "900"))
+    
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     
@@ -61,6 +123,8 @@ def setup_logging(name: str = "ai_project_generator",
         )
         handler.setFormatter(formatter)
         logger.addHandler(handler)
+        # The handler above replaces the root one, so don't log twice
+        logger.propagate = False
     
     logger.setLevel(getattr(logging, level))
     return logger
@@ -92,7 +156,3 @@ def sanitize_name(name: str) -> str:
     
     return sanitized or "project"
 
-
-# Initialize on import
-Config.ensure_directories()
-logger = setup_logging()
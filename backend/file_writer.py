@@ -4,23 +4,32 @@ Handles all file operations for generated projects.
 """
 
 import os
+import threading
+import uuid
 from pathlib import Path
-from typing import List, Dict, Any
-from schemas import GeneratedFile
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+from schemas import GeneratedFile, FileChange
+from patching import apply_unified_diff
+from metrics import FILES_WRITTEN, BYTES_WRITTEN
+from cancellation import CancelToken, check_cancelled
+from project_index import ProjectIndex
 
 
 class FileWriter:
     """Manages file creation and project structure setup."""
     
-    def __init__(self, workspace_dir: str = "workspace"):
+    def __init__(self, workspace_dir: str = "workspace", index: Optional[ProjectIndex] = None):
         """
         Initialize file writer.
         
         Args:
             workspace_dir: Base directory for all generated projects
+            index: Optional project index kept in sync with every write
         """
         self.workspace_dir = Path(workspace_dir)
         self.workspace_dir.mkdir(exist_ok=True)
+        self.index = index
+        self._changes_lock = threading.Lock()
     
     def create_project_structure(self, 
                                 project_name: str, 
@@ -51,36 +60,68 @@ class FileWriter:
     
     def write_files(self, 
                    project_name: str, 
-                   files: List[GeneratedFile]) -> Dict[str, bool]:
+                   files: Iterable[GeneratedFile],
+                   progress_callback: Optional[Callable[..., None]] = None,
+                   cancel_token: Optional[CancelToken] = None) -> Dict[str, bool]:
         """
         Write all generated files to project directory.
         
         Args:
             project_name: Name of the project
-            files: List of generated files with content
+            files: Generated files with content; may be a stream, each
+                file is written as soon as it arrives and then released
+            progress_callback: Optional callback(stage, message, **data)
+                invoked after each file write attempt
+            cancel_token: Optional token checked before each file; files
+                already written are kept
             
         Returns:
             Dictionary mapping file paths to write success status
+            
+        Raises:
+            JobCancelledError: If cancelled or past the deadline
         """
         project_path = self.workspace_dir / project_name
         results = {}
+        written = {}
         
-        for file_obj in files:
-            try:
-                file_path = project_path / file_obj.path
-                
-                # Create parent directories
-                file_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            for file_obj in files:
+                check_cancelled(cancel_token)
                 
-                # Write file
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(file_obj.content)
+                try:
+                    file_path = project_path / file_obj.path
+                    data = file_obj.content.encode('utf-8')
+                    
+                    # Create parent directories
+                    file_path.parent.mkdir(parents=True, exist_ok=True)
+                    
+                    # Write file
+                    with open(file_path, 'wb') as f:
+                        f.write(data)
+                    
+                    FILES_WRITTEN.inc()
+                    BYTES_WRITTEN.inc(len(data))
+                    if self.index is not None:
+                        written[file_obj.path] = self.index.describe(file_path, data)
+                    results[file_obj.path] = True
+                    print(f"✓ Created: {file_obj.path}")
+                except Exception as e:
+                    results[file_obj.path] = False
+                    print(f"✗ Failed to create {file_obj.path}: {e}")
                 
-                results[file_obj.path] = True
-                print(f"✓ Created: {file_obj.path}")
-            except Exception as e:
-                results[file_obj.path] = False
-                print(f"✗ Failed to create {file_obj.path}: {e}")
+                if progress_callback:
+                    success = results[file_obj.path]
+                    progress_callback(
+                        "write",
+                        f"{'Wrote' if success else 'Failed to write'} {file_obj.path}",
+                        path=file_obj.path,
+                        success=success
+                    )
+        finally:
+            # Index whatever reached disk, even if cancelled part way
+            if written:
+                self.index.record_entries(project_name, written)
         
         return results
     
@@ -102,10 +143,15 @@ class FileWriter:
         try:
             full_path = self.workspace_dir / project_name / file_path
             full_path.parent.mkdir(parents=True, exist_ok=True)
+            data = content.encode('utf-8')
             
-            with open(full_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            with open(full_path, 'wb') as f:
+                f.write(data)
             
+            FILES_WRITTEN.inc()
+            BYTES_WRITTEN.inc(len(data))
+            if self.index is not None:
+                self.index.record(project_name, {Path(file_path).as_posix(): data})
             return True
         except Exception as e:
             print(f"Error writing file {file_path}: {e}")
@@ -138,6 +184,245 @@ class FileWriter:
         """Get full path to project."""
         return str(self.workspace_dir / project_name)
     
+    def iter_files(self, project_name: str, file_paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Read several files of a project, one result per requested path.
+        
+        The project is resolved once; a missing or unreadable file yields
+        an entry with "error" set instead of failing the whole batch.
+        
+        Args:
+            project_name: Project name
+            file_paths: Relative file paths, in the order results are wanted
+            
+        Yields:
+            Dicts with "path" and either "content" and "size" or "error"
+        """
+        project_path = self.resolve_path(project_name)
+        
+        for file_path in file_paths:
+            full_path = (project_path / file_path).resolve() if project_path else None
+            if full_path is None or project_path not in full_path.parents:
+                yield {"path": file_path, "error": "invalid path"}
+                continue
+            
+            try:
+                with open(full_path, 'rb') as f:
+                    data = f.read()
+                yield {"path": file_path, "content": data.decode('utf-8'), "size": len(data)}
+            except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+                yield {"path": file_path, "error": "not found"}
+            except UnicodeDecodeError:
+                yield {"path": file_path, "error": "not UTF-8 text"}
+            except OSError as e:
+                yield {"path": file_path, "error": str(e)}
+    
+    def apply_changes(self,
+                      project_name: str,
+                      changes: List[FileChange]) -> Tuple[bool, List[Dict[str, Any]]]:
+        """
+        Apply a set of create/update/delete operations all or nothing.
+        
+        Every change is validated and every new file staged next to its
+        target and fsynced before the first rename, so the project only
+        changes once all new content is durable. If a rename fails, the
+        operations already done are reverted from the original contents.
+        Change sets on one writer are serialized.
+        
+        Args:
+            project_name: Project name
+            changes: File operations, applied in order
+            
+        Returns:
+            Tuple of (whether all changes were applied, per-change result
+            dicts with path, action, success and error)
+        """
+        results = [
+            {"path": change.path, "action": change.action, "success": False, "error": None}
+            for change in changes
+        ]
+        project_path = self.resolve_path(project_name)
+        
+        with self._changes_lock:
+            # Validate everything and compute new contents before touching disk
+            plan = []
+            seen = set()
+            for result, change in zip(results, changes):
+                try:
+                    full_path = self.resolve_path(project_name, change.path)
+                    if project_path is None or full_path is None or full_path == project_path:
+                        raise ValueError("invalid path")
+                    if full_path in seen:
+                        raise ValueError("path changed more than once")
+                    seen.add(full_path)
+                    plan.append((full_path, *self._change_contents(full_path, change)))
+                except (ValueError, OSError) as e:
+                    result["error"] = str(e)
+            
+            if any(result["error"] for result in results):
+                return False, results
+            
+            token = uuid.uuid4().hex[:8]
+            staged = {}
+            created_dirs = []
+            committed = []
+            try:
+                for full_path, data, original in plan:
+                    if data is None:
+                        continue
+                    created_dirs.extend(self._make_parents(full_path, project_path))
+                    staged_path = full_path.with_name(f".{full_path.name}.{token}.tmp")
+                    with open(staged_path, 'wb') as f:
+                        f.write(data)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    staged[full_path] = staged_path
+                
+                # Barrier passed: all new content is on disk, swap it in
+                for full_path, data, original in plan:
+                    if data is None:
+                        os.unlink(full_path)
+                    else:
+                        os.replace(staged[full_path], full_path)
+                        del staged[full_path]
+                    committed.append((full_path, original))
+            except OSError as e:
+                print(f"✗ Rolling back changes to {project_name}: {e}")
+                self._rollback(committed, staged, created_dirs)
+                for result in results:
+                    result["error"] = f"not applied: {e}"
+                return False, results
+            
+            for directory in {full_path.parent for full_path, _, _ in plan}:
+                self._fsync_directory(directory)
+        
+        written = {}
+        for full_path, data, original in plan:
+            if data is not None:
+                FILES_WRITTEN.inc()
+                BYTES_WRITTEN.inc(len(data))
+                written[full_path.relative_to(project_path).as_posix()] = data
+        if self.index is not None:
+            with self.index.deferred(project_name):
+                self.index.record(project_name, written)
+                self.index.remove(project_name, [
+                    full_path.relative_to(project_path).as_posix()
+                    for full_path, data, original in plan if data is None
+                ])
+        
+        for result in results:
+            result["success"] = True
+        return True, results
+    
+    def _change_contents(self, full_path: Path, change: FileChange) -> Tuple[Optional[bytes], Optional[bytes]]:
+        """
+        Work out the bytes a change leaves at a path.
+        
+        Returns:
+            Tuple of (new bytes or None to delete, current bytes or None)
+            
+        Raises:
+            ValueError: If the change does not fit the file's current state
+        """
+        original = full_path.read_bytes() if full_path.is_file() else None
+        
+        if change.action == "create":
+            if full_path.exists():
+                raise ValueError("already exists")
+            if change.content is None or change.patch is not None:
+                raise ValueError("create needs content")
+            return change.content.encode('utf-8'), None
+        
+        if original is None:
+            raise ValueError("not found")
+        
+        if change.action == "delete":
+            return None, original
+        
+        if (change.content is None) == (change.patch is None):
+            raise ValueError("update needs exactly one of content or patch")
+        if change.content is not None:
+            return change.content.encode('utf-8'), original
+        try:
+            text = original.decode('utf-8')
+        except UnicodeDecodeError:
+            raise ValueError("not UTF-8 text")
+        return apply_unified_diff(text, change.patch).encode('utf-8'), original
+    
+    def _make_parents(self, full_path: Path, project_path: Path) -> List[Path]:
+        """Create missing parent directories, returning the ones created top-down."""
+        missing = []
+        parent = full_path.parent
+        while parent != project_path and not parent.exists():
+            missing.append(parent)
+            parent = parent.parent
+        missing.reverse()
+        for directory in missing:
+            directory.mkdir()
+        return missing
+    
+    def _rollback(self,
+                  committed: List[Tuple[Path, Optional[bytes]]],
+                  staged: Dict[Path, Path],
+                  created_dirs: List[Path]):
+        """Undo a partly applied change set on a best-effort basis."""
+        for full_path, original in reversed(committed):
+            try:
+                if original is None:
+                    full_path.unlink()
+                else:
+                    with open(full_path, 'wb') as f:
+                        f.write(original)
+            except OSError as e:
+                print(f"✗ Could not restore {full_path}: {e}")
+        
+        for staged_path in staged.values():
+            try:
+                staged_path.unlink()
+            except OSError:
+                pass
+        
+        for directory in reversed(created_dirs):
+            try:
+                directory.rmdir()
+            except OSError:
+                pass
+    
+    def _fsync_directory(self, directory: Path):
+        """Make renames in a directory durable (no-op where unsupported)."""
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+    
+    def resolve_path(self, project_name: str, file_path: str = "") -> Optional[Path]:
+        """
+        Resolve a project, or a file inside it, to an absolute path.
+        
+        Args:
+            project_name: Project name
+            file_path: Optional relative file path within the project
+            
+        Returns:
+            Resolved path, or None if it would escape the workspace or project
+        """
+        workspace = self.workspace_dir.resolve()
+        project_path = (workspace / project_name).resolve()
+        if project_path.parent != workspace:
+            return None
+        
+        full_path = (project_path / file_path).resolve()
+        if full_path != project_path and project_path not in full_path.parents:
+            return None
+        
+        return full_path
+    
     def project_exists(self, project_name: str) -> bool:
         """Check if project directory exists."""
         return (self.workspace_dir / project_name).exists()
@@ -149,6 +434,9 @@ class FileWriter:
         if not project_path.exists():
             return []
         
+        if self.index is not None:
+            return self.index.paths(project_name)
+        
         files = []
         for root, dirs, filenames in os.walk(project_path):
             for filename in filenames:
@@ -165,6 +453,8 @@ class FileWriter:
             if project_path.exists():
                 import shutil
                 shutil.rmtree(project_path)
+                if self.index is not None:
+                    self.index.drop(project_name)
                 return True
             return False
         except Exception as e:
@@ -4,10 +4,13 @@ Manages repo creation, file uploads, commits, and pushes.
 """
 
 import base64
+import hashlib
 import requests
 import json
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable
 from pathlib import Path
+from metrics import GITHUB_API_CALLS
+from cancellation import CancelToken, check_cancelled
 
 
 class GitHubManager:
@@ -59,6 +62,8 @@ class GitHubManager:
             else:
                 raise ValueError(f"Unsupported method: {method}")
             
+            GITHUB_API_CALLS.inc(method=method, status=str(response.status_code))
+            
             # Handle different status codes
             if response.status_code in [200, 201, 204]:
                 return response.json() if response.text else {}
@@ -66,8 +71,63 @@ class GitHubManager:
                 error_msg = response.json().get('message', response.text)
                 raise Exception(f"GitHub API error: {error_msg}")
         except requests.exceptions.RequestException as e:
+            GITHUB_API_CALLS.inc(method=method, status="error")
             raise Exception(f"Request failed: {e}")
     
+    @staticmethod
+    def git_blob_sha(content: bytes) -> str:
+        """SHA-1 git assigns to a blob with this content."""
+        return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+    
+    def get_tree(self,
+                 repo_name: str,
+                 branch: str = "main",
+                 owner: Optional[str] = None) -> Dict[str, str]:
+        """
+        Get every file of a branch with its blob SHA in one API call.
+        
+        A tree too large for one response is read again a directory at a
+        time, so every listed path has its real SHA and unlisted paths are
+        known to be new.
+        
+        Args:
+            repo_name: Repository name
+            branch: Branch (or commit SHA) to read
+            owner: Repository owner; defaults to the authenticated user
+            
+        Returns:
+            Dictionary mapping file paths to blob SHAs
+            
+        Raises:
+            Exception: If the tree cannot be read, or a single directory
+                has too many entries to list
+        """
+        trees = f"/repos/{owner or self.username}/{repo_name}/git/trees"
+        response = self._request("GET", f"{trees}/{branch}?recursive=1")
+        
+        if not response.get("truncated"):
+            return {
+                item["path"]: item["sha"]
+                for item in response.get("tree", [])
+                if item.get("type") == "blob"
+            }
+        
+        print(f"Tree of {repo_name} is truncated; reading it a directory at a time")
+        shas = {}
+        pending = [("", branch)]
+        while pending:
+            prefix, tree = pending.pop()
+            response = self._request("GET", f"{trees}/{tree}")
+            if response.get("truncated"):
+                raise Exception(f"Directory {prefix or '/'} of {repo_name} has too many entries to list")
+            for item in response.get("tree", []):
+                if item.get("type") == "blob":
+                    shas[prefix + item["path"]] = item["sha"]
+                elif item.get("type") == "tree":
+                    pending.append((prefix + item["path"] + "/", item["sha"]))
+        
+        return shas
+    
     def repo_exists(self, repo_name: str) -> bool:
         """Check if repository exists."""
         try:
@@ -113,7 +173,8 @@ class GitHubManager:
                              file_path: str,
                              content: str,
                              message: str,
-                             branch: str = "main") -> Dict[str, Any]:
+                             branch: str = "main",
+                             sha: Optional[str] = None) -> Dict[str, Any]:
         """
         Create or update a file in repository.
         
@@ -123,6 +184,8 @@ class GitHubManager:
             content: File content
             message: Commit message
             branch: Target branch
+            sha: Current blob SHA if already known ("" for a new file);
+                looked up with an extra request when None
             
         Returns:
             File creation/update response
@@ -131,12 +194,13 @@ class GitHubManager:
         encoded_content = base64.b64encode(content.encode()).decode()
         
         # Check if file exists
-        try:
-            existing = self._request("GET", 
-                f"/repos/{self.username}/{repo_name}/contents/{file_path}?ref={branch}")
-            sha = existing.get("sha")
-        except:
-            sha = None
+        if sha is None:
+            try:
+                existing = self._request("GET", 
+                    f"/repos/{self.username}/{repo_name}/contents/{file_path}?ref={branch}")
+                sha = existing.get("sha")
+            except:
+                sha = None
         
         data = {
             "message": message,
@@ -156,7 +220,10 @@ class GitHubManager:
     def create_multiple_files(self,
                              repo_name: str,
                              files: Dict[str, str],
-                             branch: str = "main") -> Dict[str, bool]:
+                             branch: str = "main",
+                             progress_callback: Optional[Callable[..., None]] = None,
+                             cancel_token: Optional[CancelToken] = None,
+                             remote_shas: Optional[Dict[str, str]] = None) -> Dict[str, bool]:
         """
         Create/update multiple files in one go.
         
@@ -164,33 +231,66 @@ class GitHubManager:
             repo_name: Repository name
             files: Dictionary mapping file paths to content
             branch: Target branch
+            progress_callback: Optional callback(stage, message, **data)
+                invoked after each file upload attempt
+            cancel_token: Optional token checked before each file; uploads
+                are idempotent, so a cancelled push can simply be rerun
+            remote_shas: Branch tree from get_tree; files whose content
+                already matches are skipped and no per-file SHA lookups
+                are needed
             
         Returns:
             Dictionary mapping file paths to success status
+            
+        Raises:
+            JobCancelledError: If cancelled or past the deadline
         """
         results = {}
         
         for file_path, content in files.items():
+            check_cancelled(cancel_token)
+            
+            sha = None
+            if remote_shas is not None:
+                sha = remote_shas.get(file_path, "")
+                if sha == self.git_blob_sha(content.encode()):
+                    results[file_path] = True
+                    print(f"= Unchanged: {file_path}")
+                    continue
+            
             try:
                 self.create_or_update_file(
                     repo_name,
                     file_path,
                     content,
                     f"Add/update {file_path}",
-                    branch
+                    branch,
+                    sha
                 )
                 results[file_path] = True
                 print(f"✓ Uploaded: {file_path}")
             except Exception as e:
                 results[file_path] = False
                 print(f"✗ Failed to upload {file_path}: {e}")
+            
+            if progress_callback:
+                success = results[file_path]
+                progress_callback(
+                    "push",
+                    f"{'Uploaded' if success else 'Failed to upload'} {file_path}",
+                    path=file_path,
+                    success=success
+                )
         
         return results
     
     def upload_project(self,
                       repo_name: str,
                       project_path: str,
-                      branch: str = "main") -> Dict[str, bool]:
+                      branch: str = "main",
+                      progress_callback: Optional[Callable[..., None]] = None,
+                      cancel_token: Optional[CancelToken] = None,
+                      remote_shas: Optional[Dict[str, str]] = None) -> Dict[str, bool]:
         """
         Upload entire project to repository.
         
@@ -198,6 +298,11 @@ class GitHubManager:
             repo_name: Repository name
             project_path: Local project directory
             branch: Target branch
+            progress_callback: Optional callback(stage, message, **data)
+                invoked after each file upload attempt
+            cancel_token: Optional token checked before each file upload
+            remote_shas: Branch tree from get_tree, so files already
+                identical on GitHub are not uploaded again
             
         Returns:
             Dictionary mapping files to upload status
@@ -227,7 +332,14 @@ class GitHubManager:
                 files_to_upload[repo_file_path] = content
         
         # Upload files
-        return self.create_multiple_files(repo_name, files_to_upload, branch)
+        return self.create_multiple_files(
+            repo_name,
+            files_to_upload,
+            branch,
+            progress_callback,
+            cancel_token,
+            remote_shas
+        )
     
     def commit_and_push(self,
                        repo_name: str,
@@ -0,0 +1,148 @@
+"""
+HTTP Utils: Conditional and range request helpers for file downloads.
+Provides strong content-hash ETags, If-None-Match matching and byte range
+parsing so clients only transfer bytes they do not already have.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+class RangeNotSatisfiableError(ValueError):
+    """Raised when a Range header lies entirely outside the file."""
+
+
+class ETagCache:
+    """Strong ETags from file content hashes, cached by (mtime_ns, size)."""
+
+    def __init__(self, max_entries: int = 4096):
+        """
+        Initialize ETag cache.
+
+        Args:
+            max_entries: Number of file hashes remembered
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def etag(self, path: Path, stat_result) -> str:
+        """
+        Get the quoted strong ETag for a file.
+
+        The file is only hashed again when its mtime or size changed.
+
+        Args:
+            path: File path
+            stat_result: Result of os.stat for the file
+
+        Returns:
+            ETag header value
+        """
+        key = str(path)
+        version = (stat_result.st_mtime_ns, stat_result.st_size)
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[:2] == version:
+                self._entries.move_to_end(key)
+                return cached[2]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        etag = f'"{digest.hexdigest()[:32]}"'
+
+        with self._lock:
+            self._entries[key] = (*version, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return etag
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag (weak comparison).
+
+    Args:
+        header: If-None-Match header value
+        etag: Current quoted ETag
+
+    Returns:
+        Whether the client's copy is current
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return any(opaque(tag) == opaque(etag) for tag in header.split(","))
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single byte range.
+
+    Multi-range and malformed headers return None, which per RFC 9110
+    means the range is ignored and the whole file is served.
+
+    Args:
+        header: Range header value
+        size: File size in bytes
+
+    Returns:
+        Inclusive (start, end) byte offsets, or None to serve the whole file
+
+    Raises:
+        RangeNotSatisfiableError: If the range starts past the end of the file
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    try:
+        start = int(start_text) if start_text else None
+        end = int(end_text) if end_text else None
+    except ValueError:
+        return None
+
+    if start is None:
+        # Suffix range: the last N bytes
+        if end is None:
+            return None
+        if end <= 0 or size == 0:
+            raise RangeNotSatisfiableError(header)
+        return max(0, size - end), size - 1
+
+    if end is not None and end < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiableError(header)
+
+    return start, size - 1 if end is None else min(end, size - 1)
+
+
+def iter_file_range(path: Path, start: int, end: int, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield bytes start..end (inclusive) of a file in chunks."""
+    remaining = end - start + 1
+    with open(path, "rb") as f:
+        f.seek(start)
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
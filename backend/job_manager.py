@@ -0,0 +1,474 @@
+"""
+Job Manager: Runs long pipeline work on a bounded worker pool.
+Tracks job status, progress events and results so the API can answer
+requests immediately and stream progress to clients. Jobs are scheduled
+by priority class so bulk traffic only uses capacity interactive users
+are not using.
+"""
+
+import logging
+import math
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from cancellation import CLIENT_CANCELLED, CancelToken, JobCancelledError
+from metrics import JOB_QUEUE_WAIT
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at capacity."""
+
+    def __init__(self, message: str, retry_after: int):
+        """
+        Initialize error.
+
+        Args:
+            message: Error description
+            retry_after: Suggested seconds to wait before retrying
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Job:
+    """A single unit of work tracked by the job manager."""
+
+    def __init__(self,
+                 job_id: str,
+                 kind: str,
+                 parent: Optional["Job"] = None,
+                 timeout: Optional[float] = None,
+                 priority: str = "interactive"):
+        """
+        Initialize job.
+
+        Args:
+            job_id: Unique job identifier
+            kind: Type of work (e.g. "generate", "update")
+            parent: Job that spawned this one; progress is forwarded to it
+            timeout: Seconds from submission before the job is cancelled
+            priority: Scheduling class, "interactive" or "bulk"
+        """
+        self.job_id = job_id
+        self.kind = kind
+        self.parent = parent
+        self.priority = priority
+        self.status = "queued"
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.events: List[Dict[str, Any]] = []
+        self.pending_children = 0
+        self.dedupe_key: Optional[str] = None
+        self.attached = 0
+        self.cancel_token = CancelToken(timeout)
+        self.queued_at = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job reached a terminal state."""
+        return self.status in JobManager.TERMINAL_STATUSES
+
+    @property
+    def stream_closed(self) -> bool:
+        """Whether no more progress events will be emitted for this job."""
+        return self.finished and self.pending_children == 0
+
+    def emit(self, stage: str, message: str, **data):
+        """
+        Record a progress event.
+
+        Args:
+            stage: Pipeline stage (plan, generate, review, write, push, ...)
+            message: Human readable progress message
+            **data: Extra structured fields (file path, counts, ...)
+        """
+        with self._lock:
+            event = {
+                "seq": len(self.events) + 1,
+                "job_id": self.job_id,
+                "stage": stage,
+                "message": message,
+                "timestamp": datetime.now().isoformat(),
+                "data": data
+            }
+            self.events.append(event)
+
+        # Lifecycle events stay on the child; the parent has its own
+        if self.parent is not None and stage not in JobManager.LIFECYCLE_STAGES:
+            self.parent.emit(stage, message, source_job_id=self.job_id, **data)
+
+    def hold(self):
+        """Keep the event stream open for follow-up work run elsewhere."""
+        with self._lock:
+            self.pending_children += 1
+
+    def release(self):
+        """Signal that follow-up work registered with hold has finished."""
+        with self._lock:
+            self.pending_children -= 1
+
+    def events_since(self, seq: int) -> List[Dict[str, Any]]:
+        """Get events with a sequence number greater than seq."""
+        with self._lock:
+            return self.events[seq:]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize job for API responses."""
+        result = self.result
+        if hasattr(result, "model_dump"):
+            result = result.model_dump()
+
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "priority": self.priority,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "attached": self.attached,
+            "deadline_in": self.cancel_token.remaining() if not self.finished else None,
+            "result": result
+        }
+
+
+class JobManager:
+    """
+    Executes jobs on a bounded set of worker threads and keeps their status.
+
+    Each priority class has its own FIFO queue. Idle workers always take
+    interactive jobs first, and bulk jobs never occupy the workers reserved
+    for interactive traffic, so a bulk backlog cannot starve the UI while
+    bulk work still soaks up the remaining capacity.
+    """
+
+    TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+    LIFECYCLE_STAGES = ("queued", "running", "completed", "failed", "cancelled")
+    PRIORITIES = ("interactive", "bulk")
+
+    def __init__(self,
+                 max_workers: int = 4,
+                 max_history: int = 1000,
+                 max_queue: Optional[int] = None,
+                 reserved_workers: int = 0):
+        """
+        Initialize job manager.
+
+        Args:
+            max_workers: Maximum number of jobs running at once
+            max_history: Number of finished jobs kept for status queries
+            max_queue: Maximum jobs of each priority class waiting for a
+                worker; None for unbounded
+            reserved_workers: Workers bulk jobs may never use, kept free for
+                interactive jobs (at most max_workers - 1)
+        """
+        self.max_workers = max_workers
+        self.max_history = max_history
+        self.max_queue = max_queue
+        self.reserved_workers = max(0, min(reserved_workers, max_workers - 1))
+        self.jobs: Dict[str, Job] = {}
+        self._inflight: Dict[str, str] = {}
+        self._queues: Dict[str, Deque[Tuple[Job, Callable[..., Any], tuple, Dict[str, Any]]]] = {
+            priority: deque() for priority in self.PRIORITIES
+        }
+        self._active = {priority: 0 for priority in self.PRIORITIES}
+        self._running = {priority: 0 for priority in self.PRIORITIES}
+        self._avg_duration = 1.0
+        self._shutdown = False
+        self._lock = threading.Lock()
+        self._work_available = threading.Condition(self._lock)
+        self._workers = [
+            threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            for i in range(max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self,
+              kind: str,
+              func: Callable[..., Any],
+              *args,
+              parent: Optional[Job] = None,
+              timeout: Optional[float] = None,
+              priority: str = "interactive",
+              **kwargs) -> Job:
+        """
+        Queue a function for execution on the worker pool.
+
+        The function is called as ``func(job, *args, **kwargs)`` so it can
+        report progress through ``job.emit`` and stop at check points via
+        ``job.cancel_token``. Child jobs (with a parent) are follow-ups of
+        admitted work, bypass the queue limit and inherit the parent's
+        priority.
+
+        Args:
+            kind: Type of work, reported in job status
+            func: Callable to run; its return value becomes the job result
+            *args: Positional arguments for func
+            parent: Job whose event stream should also receive progress
+            timeout: Seconds from submission before the job is cancelled
+            priority: Scheduling class, "interactive" or "bulk"
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The queued job
+
+        Raises:
+            QueueFullError: If the queue for the priority class is at capacity
+        """
+        if parent is not None:
+            priority = parent.priority
+        job, _ = self._submit(kind, func, args, kwargs, parent, None, timeout, priority)
+        return job
+
+    def submit_deduplicated(self,
+                            dedupe_key: str,
+                            kind: str,
+                            func: Callable[..., Any],
+                            *args,
+                            timeout: Optional[float] = None,
+                            priority: str = "interactive",
+                            **kwargs) -> Tuple[Job, bool]:
+        """
+        Queue a function unless an identical job is already in flight.
+
+        Concurrent submissions with the same key attach to the running job
+        and share its events and result instead of repeating the work. An
+        interactive submission attaching to a queued bulk job promotes it.
+
+        Args:
+            dedupe_key: Key identifying identical work
+            kind: Type of work, reported in job status
+            func: Callable to run, as for submit
+            *args: Positional arguments for func
+            timeout: Seconds from submission before the job is cancelled;
+                ignored when attaching to an in-flight job
+            priority: Scheduling class, "interactive" or "bulk"
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Tuple of (job, whether the call attached to an existing job)
+
+        Raises:
+            QueueFullError: If no identical job is in flight and the queue
+                is at capacity
+        """
+        return self._submit(kind, func, args, kwargs, None, dedupe_key, timeout, priority)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get job by id."""
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self, status: Optional[str] = None) -> List[Job]:
+        """List tracked jobs, optionally filtered by status."""
+        with self._lock:
+            jobs = list(self.jobs.values())
+
+        if status:
+            jobs = [job for job in jobs if job.status == status]
+
+        return jobs
+
+    def cancel(self, job_id: str, reason: str = CLIENT_CANCELLED) -> Optional[Job]:
+        """
+        Request cancellation of a job.
+
+        Queued jobs never start; running jobs stop at their next check
+        point. Finished jobs are left untouched.
+
+        Returns:
+            The job, or None if it is unknown
+        """
+        job = self.get(job_id)
+        if job is not None and not job.finished:
+            job.cancel_token.cancel(reason)
+        return job
+
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a worker."""
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def class_stats(self) -> Dict[str, Dict[str, int]]:
+        """Queued and running job counts per priority class."""
+        with self._lock:
+            return {
+                priority: {
+                    "queued": len(self._queues[priority]),
+                    "running": self._running[priority],
+                    "capacity": self._capacity(priority)
+                }
+                for priority in self.PRIORITIES
+            }
+
+    def retry_after(self, priority: str = "interactive") -> int:
+        """Estimated seconds until a queue slot for the class frees up."""
+        with self._lock:
+            return self._retry_after(priority)
+
+    def _submit(self,
+               kind: str,
+               func: Callable[..., Any],
+               args: tuple,
+               kwargs: Dict[str, Any],
+               parent: Optional[Job],
+               dedupe_key: Optional[str],
+               timeout: Optional[float] = None,
+               priority: str = "interactive") -> Tuple[Job, bool]:
+        """Register a job (or attach to an in-flight one) and queue it."""
+        if priority not in self.PRIORITIES:
+            raise ValueError(f"Unknown priority {priority}")
+
+        with self._lock:
+            if dedupe_key is not None:
+                existing = self.jobs.get(self._inflight.get(dedupe_key, ""))
+                if existing is not None and not existing.finished:
+                    existing.attached += 1
+                    self._promote(existing, priority)
+                    return existing, True
+
+            capacity = self._capacity(priority)
+            if (parent is None and self.max_queue is not None
+                    and self._active[priority] >= capacity + self.max_queue):
+                raise QueueFullError(
+                    f"{priority.capitalize()} job queue full "
+                    f"({self._active[priority] - capacity} waiting)",
+                    self._retry_after(priority)
+                )
+
+            job = Job(uuid.uuid4().hex, kind, parent, timeout, priority)
+            job.dedupe_key = dedupe_key
+            self._active[priority] += 1
+            self.jobs[job.job_id] = job
+            self._prune_history()
+            if dedupe_key is not None:
+                self._inflight[dedupe_key] = job.job_id
+            if parent is not None:
+                parent.hold()
+
+        job.emit("queued", f"{kind} job queued", priority=priority)
+        with self._work_available:
+            self._queues[priority].append((job, func, args, kwargs))
+            self._work_available.notify()
+        return job, False
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and optionally wait for queued and running ones."""
+        with self._work_available:
+            self._shutdown = True
+            self._work_available.notify_all()
+
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def _capacity(self, priority: str) -> int:
+        """Workers a priority class may occupy."""
+        if priority == "bulk":
+            return self.max_workers - self.reserved_workers
+        return self.max_workers
+
+    def _promote(self, job: Job, priority: str):
+        """Move a queued job to a more urgent class (lock held)."""
+        if self.PRIORITIES.index(priority) >= self.PRIORITIES.index(job.priority):
+            return
+
+        for entry in self._queues[job.priority]:
+            if entry[0] is job:
+                self._queues[job.priority].remove(entry)
+                self._queues[priority].append(entry)
+                self._active[job.priority] -= 1
+                self._active[priority] += 1
+                job.priority = priority
+                self._work_available.notify()
+                return
+
+    def _next_job(self):
+        """Pick the next runnable job, honouring reserved workers (lock held)."""
+        for priority in self.PRIORITIES:
+            if self._queues[priority] and self._running[priority] < self._capacity(priority):
+                self._running[priority] += 1
+                return self._queues[priority].popleft()
+        return None
+
+    def _worker_loop(self):
+        """Run queued jobs until shut down and drained."""
+        while True:
+            with self._work_available:
+                entry = self._next_job()
+                while entry is None:
+                    if self._shutdown and not any(self._queues.values()):
+                        return
+                    self._work_available.wait()
+                    entry = self._next_job()
+
+            self._run(*entry)
+
+    def _run(self,
+            job: Job,
+            func: Callable[..., Any],
+            args: tuple,
+            kwargs: Dict[str, Any]):
+        """Execute a job and record its outcome."""
+        started = time.perf_counter()
+        JOB_QUEUE_WAIT.observe(started - job.queued_at, priority=job.priority)
+        job.status = "running"
+        job.started_at = datetime.now().isoformat()
+        job.emit("running", f"{job.kind} job started")
+
+        # The final event is emitted before the status flips so that stream
+        # readers which see a terminal status have already got every event
+        try:
+            job.cancel_token.check()
+            job.result = func(job, *args, **kwargs)
+            job.emit("completed", f"{job.kind} job completed")
+            job.status = "completed"
+        except JobCancelledError as e:
+            job.error = str(e)
+            job.emit("cancelled", f"{job.kind} job cancelled: {e}")
+            job.status = "cancelled"
+        except Exception as e:
+            job.error = str(e)
+            job.emit("failed", f"{job.kind} job failed: {e}")
+            job.status = "failed"
+            logger.exception(f"✗ Job {job.job_id} ({job.kind}) failed: {e}")
+        finally:
+            job.finished_at = datetime.now().isoformat()
+            with self._work_available:
+                self._active[job.priority] -= 1
+                self._running[job.priority] -= 1
+                # Moving average of run time drives Retry-After estimates
+                duration = time.perf_counter() - started
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+                if job.parent is not None:
+                    job.parent.release()
+                if self._inflight.get(job.dedupe_key) == job.job_id:
+                    del self._inflight[job.dedupe_key]
+                # A freed bulk slot may unblock a waiting bulk job
+                self._work_available.notify_all()
+
+    def _retry_after(self, priority: str) -> int:
+        """Seconds until the class queue drains by one slot (lock held)."""
+        capacity = self._capacity(priority)
+        waiting = max(1, self._active[priority] - capacity + 1)
+        return max(1, math.ceil(waiting * self._avg_duration / capacity))
+
+    def _prune_history(self):
+        """Drop the oldest finished jobs beyond max_history (lock held)."""
+        overflow = len(self.jobs) - self.max_history
+        if overflow <= 0:
+            return
+
+        for job_id in [j.job_id for j in self.jobs.values() if j.finished][:overflow]:
+            del self.jobs[job_id]
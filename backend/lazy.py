@@ -0,0 +1,65 @@
+"""
+Lazy: Deferred, thread-safe construction of expensive singletons.
+Module-level managers and agents are wrapped in Lazy so importing a module
+does no I/O; the object is built on first use or by an explicit warm-up.
+"""
+
+import threading
+from typing import Any, Callable
+
+
+class Lazy:
+    """
+    Proxy that builds its object on first attribute access.
+
+    The proxy exposes no attributes of its own so it never shadows the
+    wrapped object's; use initialize() and is_initialized() instead.
+    """
+
+    def __init__(self, factory: Callable[[], Any], name: str = ""):
+        """
+        Initialize lazy proxy.
+
+        Args:
+            factory: Builds the object; called at most once
+            name: Label used in readiness reports
+        """
+        # Set through __dict__: __setattr__ forwards to the wrapped object
+        self.__dict__.update(
+            _lazy_factory=factory,
+            _lazy_name=name or getattr(factory, "__name__", "object"),
+            _lazy_instance=None,
+            _lazy_lock=threading.Lock()
+        )
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(initialize(self), attribute)
+
+    def __setattr__(self, attribute: str, value: Any):
+        setattr(initialize(self), attribute, value)
+
+    def __repr__(self) -> str:
+        state = "initialized" if is_initialized(self) else "not initialized"
+        return f"<Lazy {self._lazy_name} ({state})>"
+
+
+def initialize(proxy: Lazy) -> Any:
+    """Get the wrapped object, building it on first call."""
+    instance = proxy._lazy_instance
+    if instance is None:
+        with proxy._lazy_lock:
+            instance = proxy._lazy_instance
+            if instance is None:
+                instance = proxy._lazy_factory()
+                proxy.__dict__["_lazy_instance"] = instance
+    return instance
+
+
+def is_initialized(proxy: Lazy) -> bool:
+    """Whether the wrapped object has been built."""
+    return proxy._lazy_instance is not None
+
+
+def name_of(proxy: Lazy) -> str:
+    """Label of a proxy, for readiness reports."""
+    return proxy._lazy_name
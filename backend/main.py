@@ -4,12 +4,25 @@ Provides endpoints for project generation, updates, and memory management.
 """
 
 import os
+import json
+import hashlib
+import mimetypes
+import time
+import asyncio
+import shutil
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from email.utils import formatdate
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import (
+    FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+)
+from pydantic import BaseModel
 import logging
 
 # Load environment variables
@@ -22,14 +35,28 @@ logger = logging.getLogger(__name__)
 # Import agents and managers
 from schemas import (
     ProjectGenerateRequest, ProjectUpdateRequest, GenerationResponse,
-    UpdateResponse, ErrorResponse, FileEditRequest, FilePushRequest
+    UpdateResponse, ErrorResponse, FileEditRequest, FilePushRequest,
+    ProjectPlanRequest, JobSubmitResponse, JobStatusResponse, BatchGenerateRequest,
+    BatchGenerateResponse, BatchItemResult, ProjectPlan, GeneratedFile,
+    PushStatusResponse, ProjectFilesResponse, FileBatchGetRequest,
+    FileBatchGetResponse, ProjectChangesRequest, ProjectChangesResponse
 )
+from config import Config, setup_logging
 from memory_manager import MemoryManager
 from file_writer import FileWriter
-from github_manager import GitHubManager
-from agent_planner import AgentPlanner
-from agent_generator import AgentGenerator
-from agent_reviewer import AgentReviewer
+from project_index import ProjectIndex
+from job_manager import JobManager, QueueFullError
+from push_queue import PushQueue
+from cancellation import CancelToken, JobCancelledError, check_cancelled
+from admission import RateLimiter
+from result_cache import ResultCache
+from lru_cache import LRUCache
+from lazy import Lazy, initialize, is_initialized, name_of
+import archive
+import http_utils
+import serialization
+import pipeline
+import metrics
 
 
 # Initialize FastAPI app
@@ -38,9 +65,12 @@ app = FastAPI(
     description="Intelligent agent that creates complete software projects from natural language",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    default_response_class=serialization.NegotiatedResponse
 )
 
+serialization.configure(Config.COMPRESSION_MIN_BYTES, Config.GZIP_LEVEL, Config.BROTLI_QUALITY)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -50,18 +80,225 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize managers and agents
-memory_manager = MemoryManager("memory")
-file_writer = FileWriter("workspace")
-planner = AgentPlanner()
-generator = AgentGenerator()
-reviewer = AgentReviewer()
+# Managers touch disk when built, so they are constructed on first use
+# (or by the startup warm-up) rather than at import
+memory_manager = Lazy(lambda: MemoryManager("memory"), "memory_manager")
+project_index = Lazy(lambda: ProjectIndex("workspace", Config.PROJECT_INDEX_DIR), "project_index")
+file_writer = Lazy(lambda: FileWriter("workspace", initialize(project_index)), "file_writer")
+job_manager = Lazy(lambda: JobManager(
+    Config.MAX_WORKERS,
+    Config.MAX_JOB_HISTORY,
+    Config.MAX_QUEUE_SIZE,
+    Config.INTERACTIVE_RESERVED_WORKERS
+), "job_manager")
+push_queue = Lazy(lambda: PushQueue(
+    Config.PUSH_QUEUE_DB,
+    workers=Config.PUSH_WORKERS,
+    max_attempts=Config.PUSH_MAX_ATTEMPTS,
+    base_delay=Config.PUSH_RETRY_BASE_DELAY,
+    max_delay=Config.PUSH_RETRY_MAX_DELAY,
+    max_pending=Config.PUSH_MAX_PENDING,
+    attempt_timeout=Config.PUSH_ATTEMPT_TIMEOUT or None
+), "push_queue")
+rate_limiter = RateLimiter(Config.RATE_LIMIT_PER_SECOND, Config.RATE_LIMIT_BURST)
+
+result_cache = Lazy(lambda: ResultCache(
+    Config.RESULT_CACHE_DIR,
+    Config.RESULT_CACHE_MAX_ENTRIES,
+    Config.RESULT_CACHE_MAX_BYTES
+), "result_cache") if Config.RESULT_CACHE_ENABLED else None
+
+# Set once the startup warm-up has built everything; gates /ready
+_ready = threading.Event()
+_warm_up_error: Optional[str] = None
+
+# Plan previews by normalized prompt and memory snapshot
+plan_cache = LRUCache(Config.PLAN_CACHE_MAX_ENTRIES)
+
+# Content-hash ETags for raw file downloads
+etag_cache = http_utils.ETagCache()
+
+# Serializes memory updates across jobs and batches
+workspace_lock = threading.Lock()
+
+# Project name -> [lock, number of writers holding or waiting for it];
+# see _project_lock
+_project_locks: Dict[str, List[Any]] = {}
+_project_locks_guard = threading.Lock()
+
+# Push id -> job whose event stream is held open until that push's first
+# attempt ends or it is cancelled; see _enqueue_push
+_push_holds: Dict[int, Any] = {}
+_push_holds_lock = threading.Lock()
+
+# Process pool for batch generation, created on first batch request
+_batch_pool: Optional[ProcessPoolExecutor] = None
+_batch_pool_lock = threading.Lock()
+_batch_slots = threading.BoundedSemaphore(Config.MAX_CONCURRENT_BATCHES)
 
 # Get configuration from environment
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
 GITHUB_USERNAME = os.getenv("GITHUB_USERNAME", "")
 
 
+
+def _queue_depth():
+    """
+    Unfinished jobs and pushes by (kind, state) for the queue depth gauge.
+    
+    Components not built yet count as empty, so a scrape never builds them.
+    """
+    depth: Dict[Tuple[str, str], float] = {}
+    if is_initialized(job_manager):
+        for job in job_manager.list_jobs():
+            if not job.finished:
+                key = (job.kind, job.status)
+                depth[key] = depth.get(key, 0) + 1
+    counts = push_queue.counts() if is_initialized(push_queue) else {}
+    for state in ("pending", "running"):
+        depth[("push", state)] = counts.get(state, 0)
+    return depth
+
+
+def _job_queue():
+    """Queued/running jobs by (priority, state) for the scheduler gauge."""
+    stats = _job_class_stats()
+    return {
+        (priority, state): counts[state]
+        for priority, counts in stats.items()
+        for state in ("queued", "running")
+    }
+
+
+def _job_workers_capacity():
+    """Workers each priority class may use, for the capacity gauge."""
+    return {(priority,): counts["capacity"] for priority, counts in _job_class_stats().items()}
+
+
+def _job_class_stats() -> Dict[str, Dict[str, int]]:
+    """JobManager.class_stats, or zeros while the job manager is not built."""
+    if not is_initialized(job_manager):
+        return {
+            priority: {"queued": 0, "running": 0, "capacity": 0}
+            for priority in JobManager.PRIORITIES
+        }
+    return job_manager.class_stats()
+
+
+metrics.QUEUE_DEPTH.set_function(_queue_depth)
+metrics.JOB_QUEUE.set_function(_job_queue)
+metrics.JOB_WORKERS_CAPACITY.set_function(_job_workers_capacity)
+
+# Server-sent events polling and keep-alive intervals (seconds)
+SSE_POLL_INTERVAL = 0.2
+SSE_KEEPALIVE_INTERVAL = 15.0
+
+
+@app.on_event("startup")
+async def start_warm_up():
+    """
+    Warm up in the background so /health answers immediately.
+    
+    /ready reports 503 until the warm-up has finished.
+    """
+    setup_logging(logger.name)
+    threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
+
+
+def _warm_up():
+    """
+    Build managers and agents, run synthetic generations, then start push workers.
+    
+    The synthetic runs and the OpenAPI schema take the one-off costs (first
+    use of every template, review rule and model serializer) off the first
+    real requests.
+    """
+    global _warm_up_error
+    started = time.perf_counter()
+    
+    try:
+        Config.ensure_directories()
+        for proxy in _lazy_components():
+            initialize(proxy)
+        
+        if Config.WARM_UP_ENABLED:
+            logger.info(f"✓ Synthetic generations took {pipeline.warm_up():.2f}s")
+            app.openapi()
+        
+        # Resume pushes interrupted by a restart
+        push_queue.start(_push_to_github)
+        
+        if Config.TEMPLATE_RELOAD_INTERVAL > 0:
+            pipeline.registry.start_watching(Config.TEMPLATE_RELOAD_INTERVAL)
+    except Exception as e:
+        _warm_up_error = str(e)
+        logger.error(f"✗ Warm-up failed: {e}")
+        return
+    
+    _ready.set()
+    logger.info(f"✓ Warm-up finished in {time.perf_counter() - started:.2f}s")
+
+
+def _lazy_components() -> List[Lazy]:
+    """Every lazily built manager and agent, in dependency order."""
+    components = [
+        memory_manager, project_index, file_writer, job_manager, push_queue,
+        pipeline.registry, pipeline.planner, pipeline.generator, pipeline.reviewer
+    ]
+    if result_cache is not None:
+        components.append(result_cache)
+    return components
+
+
+@app.on_event("shutdown")
+async def stop_workers():
+    """Let push workers finish their current attempt, stop the generation pool and template watcher."""
+    if is_initialized(push_queue):
+        push_queue.stop()
+    if is_initialized(pipeline.generator):
+        pipeline.generator.shutdown()
+    if is_initialized(pipeline.registry):
+        pipeline.registry.stop_watching()
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Record per-endpoint request latency (time to response headers)."""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.REQUEST_LATENCY.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            path=getattr(route, "path", "unmatched"),
+            status=str(status)
+        )
+
+
+@app.middleware("http")
+async def negotiate_response_format(request: Request, call_next):
+    """
+    Expose Accept and Accept-Encoding to NegotiatedResponse.
+    
+    JSON bodies are then rendered as orjson JSON or MessagePack and
+    compressed with brotli or gzip above COMPRESSION_MIN_BYTES. Streams,
+    file downloads and explicit JSONResponses are left as they are.
+    """
+    token = serialization.set_request_headers(
+        request.headers.get("accept", ""),
+        request.headers.get("accept-encoding", "")
+    )
+    try:
+        return await call_next(request)
+    finally:
+        serialization.reset_request_headers(token)
+
+
 @app.get("/")
 async def root():
     """Root endpoint with system info."""
@@ -78,21 +315,659 @@ async def health_check():
     """Health check endpoint."""
     return {
         "status": "healthy",
-        "memory": "loaded" if memory_manager.memory else "error"
+        "memory": "loaded" if is_initialized(memory_manager) else "not loaded"
     }
 
 
-@app.post("/generate", response_model=GenerationResponse)
-async def generate_project(
-    request: ProjectGenerateRequest,
-    background_tasks: BackgroundTasks
-):
+@app.get("/ready")
+async def readiness_check():
     """
-    Generate a complete new project from prompt.
+    Readiness check: 200 once the startup warm-up has finished, 503 before.
+    
+    Unlike /health, which only says the process is serving, this is the
+    probe load balancers should use before routing traffic here.
+    """
+    components = {
+        name_of(proxy): is_initialized(proxy) for proxy in _lazy_components()
+    }
+    
+    if _ready.is_set():
+        return {"status": "ready", "components": components}
+    
+    return JSONResponse(
+        status_code=503,
+        content={
+            "status": "failed" if _warm_up_error else "warming up",
+            "error": _warm_up_error,
+            "components": components
+        },
+        headers={"Retry-After": "1"}
+    )
+
+
+@app.get("/metrics")
+def get_metrics():
+    """Expose metrics in Prometheus text format (reads the push database)."""
+    return PlainTextResponse(
+        metrics.registry.render(),
+        media_type=metrics.MetricsRegistry.CONTENT_TYPE
+    )
+
+
+@app.post("/plan", response_model=ProjectPlan)
+def plan_project(request: ProjectPlanRequest, response: Response):
+    """
+    Preview the plan a prompt would produce, without generating or writing.
+    
+    Nothing is written and memory is not updated. Plans are cached by
+    whitespace-normalized prompt, project name and memory snapshot, so
+    repeated previews (e.g. on every keystroke) are served from memory;
+    the X-Plan-Cache header says hit or miss.
+    """
+    prompt = " ".join(request.prompt.split())
+    if not prompt:
+        raise HTTPException(status_code=400, detail="prompt must not be empty")
+    
+    memory = memory_manager.get_memory_dict()
+    templates = pipeline.registry.current()
+    cache_key = ResultCache.make_key(
+        prompt, request.project_name, memory, templates_version=templates.version
+    )
+    plan = plan_cache.get(cache_key)
+    response.headers["X-Plan-Cache"] = "hit" if plan is not None else "miss"
+    
+    if plan is None:
+        plan = pipeline.planner.plan(prompt, memory, request.project_name, templates.planner)
+        plan_cache.put(cache_key, plan)
+    
+    # Callers get their own copy so the cached plan can never be mutated
+    return plan.model_copy(deep=True)
+
+
+@app.post("/generate", response_model=JobSubmitResponse, status_code=202)
+async def generate_project(request: ProjectGenerateRequest, http_request: Request):
+    """
+    Queue generation of a complete new project from prompt.
+    
+    The pipeline runs on the job worker pool so the API keeps serving
+    other requests; poll /jobs/{job_id} for status and the final result,
+    or follow /jobs/{job_id}/events for live progress. The job is
+    cancelled if it has not finished within timeout_seconds
+    (JOB_TIMEOUT_SECONDS by default) or on POST /jobs/{job_id}/cancel.
+    
+    Interactive jobs are scheduled ahead of bulk ones; set the priority
+    field or the X-Priority header to "bulk" for CI and scripted traffic.
     
     Args:
         request: Project generation request with prompt
-        background_tasks: Background task handler for GitHub push
+        http_request: Raw request, used for rate limiting
+        
+    Returns:
+        Job id and status URLs for the queued generation
+    """
+    _admit(http_request)
+    logger.info(f"Queueing project generation: {request.prompt[:50]}...")
+    job, attached = _submit_or_reject(
+        job_manager.submit_deduplicated,
+        _dedupe_key("generate", request),
+        "generate",
+        _run_generation,
+        request,
+        timeout=_job_timeout(request),
+        priority=_priority(http_request, request.priority)
+    )
+    return _job_submit_response(job, attached)
+
+
+@app.post("/update", response_model=JobSubmitResponse, status_code=202)
+async def update_project(request: ProjectUpdateRequest, http_request: Request):
+    """
+    Queue an update of an existing project from GitHub or locally.
+    
+    Changes are compared against, and pushed to, GITHUB_USERNAME's copy
+    of the repository, so a URL naming another owner is rejected.
+    
+    Args:
+        request: Project update request with GitHub URL and update prompt
+        http_request: Raw request, used for rate limiting
+        
+    Returns:
+        Job id and status URLs for the queued update
+    """
+    repo = _parse_repo_url(request.github_repo_url)
+    if repo is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Not a GitHub repository URL: {request.github_repo_url}"
+        )
+    owner, repo_name = repo
+    if GITHUB_USERNAME and owner.lower() != GITHUB_USERNAME.lower():
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Updates are pushed to {GITHUB_USERNAME}/{repo_name}; "
+                f"cannot update a repository owned by {owner}"
+            )
+        )
+    
+    _admit(http_request)
+    logger.info(f"Queueing project update: {request.github_repo_url}")
+    job, attached = _submit_or_reject(
+        job_manager.submit_deduplicated,
+        _dedupe_key("update", request),
+        "update",
+        _run_update,
+        request,
+        timeout=_job_timeout(request),
+        priority=_priority(http_request, request.priority)
+    )
+    return _job_submit_response(job, attached)
+
+
+@app.post("/generate/batch", response_model=BatchGenerateResponse)
+def generate_batch(request: BatchGenerateRequest, http_request: Request):
+    """
+    Generate many projects at once.
+    
+    Plan/generate/review runs for every prompt in parallel on a process
+    pool, against one memory snapshot taken before fan-out. Workspace
+    writes and memory updates then happen in request order, so results
+    are deterministic and never interleave. Batches are bulk traffic:
+    pool processes run at reduced OS priority and their pushes queue
+    behind interactive ones unless X-Priority says otherwise.
+    
+    Args:
+        request: Batch of project generation requests
+        http_request: Raw request, used for rate limiting
+        
+    Returns:
+        Per-item results and aggregate stage timings
+    """
+    if len(request.requests) > Config.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.requests)} > {Config.MAX_BATCH_SIZE}"
+        )
+    
+    _admit(http_request, cost=len(request.requests))
+    
+    if not _batch_slots.acquire(blocking=False):
+        metrics.ADMISSION_REJECTIONS.inc(reason="batch_busy")
+        raise HTTPException(
+            status_code=503,
+            detail="Too many batches in progress",
+            headers={"Retry-After": str(Config.BATCH_RETRY_AFTER)}
+        )
+    
+    try:
+        return _run_batch(request, _priority(http_request, None, default="bulk"))
+    finally:
+        _batch_slots.release()
+
+
+def _run_batch(request: BatchGenerateRequest,
+               priority: str = "bulk") -> BatchGenerateResponse:
+    """Fan a batch out over the process pool and write results in order."""
+    logger.info(f"Generating batch of {len(request.requests)} projects")
+    batch_started = time.perf_counter()
+    memory_snapshot = memory_manager.get_memory_dict()
+    # Pickled to the workers with the rest of each item, so every item
+    # uses the templates in effect now (workers don't watch the packs)
+    templates = pipeline.registry.current()
+    
+    # Cached results resolve immediately; the rest fan out to the pool
+    pool = _get_batch_pool()
+    cache_keys = []
+    futures = []
+    for item in request.requests:
+        cache_key = ResultCache.make_key(
+            item.prompt, item.github_repo_name, memory_snapshot,
+            templates_version=templates.version
+        )
+        cached = result_cache.get(cache_key) if result_cache is not None else None
+        
+        if cached is not None:
+            future = Future()
+            future.set_result((*cached, {"cache": 0.0}))
+        else:
+            future = pool.submit(
+                pipeline.build_project,
+                item.prompt,
+                memory_snapshot,
+                item.github_repo_name,
+                templates=templates
+            )
+        
+        cache_keys.append(cache_key)
+        futures.append(future)
+    
+    results = []
+    seen_projects = set()
+    totals: Dict[str, float] = {}
+    
+    for index, (item, future) in enumerate(zip(request.requests, futures)):
+        try:
+            project_plan, reviewed_files, timings = future.result()
+            metrics.observe_stages(timings)
+            if result_cache is not None and "cache" not in timings:
+                result_cache.put(cache_keys[index], project_plan, reviewed_files)
+            
+            if project_plan.project_name in seen_projects:
+                raise ValueError(
+                    f"Duplicate project name in batch: {project_plan.project_name}"
+                )
+            seen_projects.add(project_plan.project_name)
+            
+            started = time.perf_counter()
+            project_path, files_created = _write_project(project_plan, reviewed_files)
+            timings["write"] = time.perf_counter() - started
+            
+            repo_url = _schedule_push(
+                item,
+                project_plan.project_name,
+                project_path,
+                project_plan.description,
+                priority=priority
+            )
+            
+            results.append(BatchItemResult(
+                index=index,
+                success=True,
+                project_name=project_plan.project_name,
+                files_created=files_created,
+                workspace_path=str(project_path),
+                repo_url=repo_url,
+                timings=timings
+            ))
+            for stage, seconds in timings.items():
+                totals[stage] = totals.get(stage, 0.0) + seconds
+        
+        except Exception as e:
+            logger.error(f"Error generating batch item {index}: {e}")
+            results.append(BatchItemResult(index=index, success=False, error=str(e)))
+    
+    succeeded = sum(1 for r in results if r.success)
+    wall_time = time.perf_counter() - batch_started
+    logger.info(f"✓ Batch completed: {succeeded}/{len(results)} in {wall_time:.2f}s")
+    
+    return BatchGenerateResponse(
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        wall_time=wall_time,
+        timings=totals,
+        results=results
+    )
+
+
+def _get_batch_pool() -> ProcessPoolExecutor:
+    """Get the shared batch process pool, creating it on first use."""
+    global _batch_pool
+    
+    with _batch_pool_lock:
+        if _batch_pool is None:
+            _batch_pool = ProcessPoolExecutor(
+                max_workers=Config.BATCH_WORKERS,
+                initializer=_lower_process_priority,
+                initargs=(Config.BATCH_NICENESS,)
+            )
+    
+    return _batch_pool
+
+
+def _lower_process_priority(niceness: int):
+    """Batch pool initializer: let interactive work win the CPU."""
+    if niceness and hasattr(os, "nice"):
+        try:
+            os.nice(niceness)
+        except OSError:
+            pass
+
+
+@app.get("/cache/stats")
+def get_cache_stats():
+    """
+    Get result, plan, render and review cache sizes and hit/miss counters.
+    
+    The render and review caches of agents not built yet are reported
+    empty ({}) rather than building the agents.
+    """
+    in_memory = {
+        "plan_cache": plan_cache.stats(),
+        "render_cache": (
+            pipeline.generator.render_cache.stats() if is_initialized(pipeline.generator) else {}
+        ),
+        "review_cache": (
+            pipeline.reviewer.review_cache.stats() if is_initialized(pipeline.reviewer) else {}
+        )
+    }
+    if result_cache is None:
+        return {"enabled": False, **in_memory}
+    return {"enabled": True, **result_cache.stats(), **in_memory}
+
+
+@app.delete("/cache")
+def clear_cache():
+    """Invalidate every cached generation result."""
+    removed = result_cache.invalidate() if result_cache is not None else 0
+    plan_cache.clear()
+    # Agents not built yet have nothing cached
+    if is_initialized(pipeline.generator):
+        pipeline.generator.render_cache.clear()
+    if is_initialized(pipeline.reviewer):
+        pipeline.reviewer.review_cache.clear()
+    return {"message": "Result cache cleared", "removed": removed}
+
+
+@app.delete("/cache/{cache_key}")
+def invalidate_cache_entry(cache_key: str):
+    """Invalidate a single cached generation result."""
+    if result_cache is None or not result_cache.invalidate(cache_key):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Cache entry {cache_key} not found"
+        )
+    return {"message": f"Cache entry {cache_key} invalidated", "removed": 1}
+
+
+@app.get("/templates")
+async def get_templates():
+    """Get the template registry version, loaded packs and pack errors."""
+    return pipeline.registry.describe()
+
+
+@app.post("/templates/reload")
+def reload_templates():
+    """
+    Reload changed template packs now instead of at the next poll.
+
+    Jobs already running keep the templates they started with. A plain def
+    so reading the packs runs in the threadpool.
+    """
+    result = pipeline.registry.reload()
+    logger.info(f"✓ Templates reloaded: version {result['version']}")
+    return result
+
+
+@app.get("/pushes")
+async def list_pushes(status: Optional[str] = None, limit: int = 100):
+    """List queued GitHub pushes, newest first, optionally filtered by status."""
+    if status and status not in PushQueue.STATUSES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown push status {status}; expected one of {', '.join(PushQueue.STATUSES)}"
+        )
+    
+    pushes = push_queue.list_pushes(status, limit)
+    return {
+        "pushes": pushes,
+        "count": len(pushes),
+        "counts": push_queue.counts()
+    }
+
+
+@app.get("/pushes/{push_id}", response_model=PushStatusResponse)
+async def get_push(push_id: int):
+    """Get the state of a queued GitHub push."""
+    return _get_push_or_404(push_id)
+
+
+@app.post("/pushes/{push_id}/retry", response_model=PushStatusResponse)
+async def retry_push(push_id: int):
+    """Requeue a push that exhausted its attempts."""
+    push = _get_push_or_404(push_id)
+    
+    if not push_queue.retry(push_id):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Push {push_id} is {push['status']}; only failed pushes can be retried"
+        )
+    
+    logger.info(f"✓ Push {push_id} requeued")
+    return push_queue.get(push_id)
+
+
+@app.post("/pushes/{push_id}/cancel", response_model=PushStatusResponse)
+async def cancel_push(push_id: int):
+    """
+    Cancel a pending or running push.
+    
+    A running push stops before its next file upload; files already
+    uploaded are kept and the push can be resumed with /retry.
+    """
+    push = _get_push_or_404(push_id)
+    
+    if not push_queue.cancel(push_id):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Push {push_id} is {push['status']}; only pending or running pushes can be cancelled"
+        )
+    
+    logger.info(f"✓ Push {push_id} cancellation requested")
+    push = push_queue.get(push_id)
+    if push["status"] == "cancelled":
+        # Never attempted, so no attempt will release the job stream; a
+        # running push releases it when its attempt stops
+        _release_push_hold(push_id)
+    return push
+
+
+@app.get("/jobs")
+async def list_jobs(status: Optional[str] = None):
+    """List background jobs, optionally filtered by status."""
+    jobs = job_manager.list_jobs(status)
+    return {
+        "jobs": [job.to_dict() for job in jobs],
+        "count": len(jobs)
+    }
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
+    """Get status and result of a background job."""
+    return _get_job_or_404(job_id).to_dict()
+
+
+@app.post("/jobs/{job_id}/cancel", response_model=JobStatusResponse)
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running job.
+    
+    Queued jobs never start. Running jobs stop at the next stage or file
+    boundary; a project directory created by the job is removed, while
+    an existing project keeps the files already rewritten. The job's
+    status becomes "cancelled" once it has stopped.
+    """
+    job = _get_job_or_404(job_id)
+    
+    if job.finished:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job {job_id} already {job.status}"
+        )
+    
+    job_manager.cancel(job_id)
+    logger.info(f"✓ Job {job_id} cancellation requested")
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """
+    Stream job progress as server-sent events.
+    
+    Each event carries the pipeline stage (plan, generate, review, write,
+    memory, push, ...), a message, a timestamp and structured data. The
+    stream ends once the job and the first attempt of any follow-up push
+    have finished; later retries are visible under /pushes.
+    Reconnecting clients can resume with the Last-Event-ID header.
+    """
+    job = _get_job_or_404(job_id)
+    last_seq = _last_event_id(request.headers.get("last-event-id"))
+    
+    async def event_stream():
+        seq = last_seq
+        idle = 0.0
+        
+        while True:
+            closed = job.stream_closed
+            
+            for event in job.events_since(seq):
+                seq = event["seq"]
+                idle = 0.0
+                yield (
+                    f"id: {seq}\n"
+                    f"event: {event['stage']}\n"
+                    f"data: {json.dumps(event)}\n\n"
+                )
+            
+            if closed or await request.is_disconnected():
+                break
+            
+            await asyncio.sleep(SSE_POLL_INTERVAL)
+            idle += SSE_POLL_INTERVAL
+            if idle >= SSE_KEEPALIVE_INTERVAL:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _last_event_id(header: Optional[str]) -> int:
+    """
+    Sequence number a reconnecting SSE client has seen.
+    
+    Browsers send the header back verbatim, so anything that is not a
+    non-negative integer replays the stream from the start.
+    """
+    try:
+        return max(int(header or 0), 0)
+    except ValueError:
+        return 0
+
+
+def _client_id(http_request: Request) -> str:
+    """Identify the caller for rate limiting."""
+    client_id = http_request.headers.get("x-client-id")
+    if client_id:
+        return client_id
+    return http_request.client.host if http_request.client else "unknown"
+
+
+def _admit(http_request: Request, cost: float = 1.0):
+    """Charge the caller's token bucket or reject with 429."""
+    allowed, retry_after = rate_limiter.check(_client_id(http_request), cost)
+    
+    if not allowed:
+        metrics.ADMISSION_REJECTIONS.inc(reason="rate_limited")
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+def _priority(http_request: Request,
+              requested: Optional[str],
+              default: str = "interactive") -> str:
+    """Resolve a scheduling class from the request body or X-Priority header."""
+    priority = requested or http_request.headers.get("x-priority", default).lower()
+    
+    if priority not in JobManager.PRIORITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown priority {priority}; expected one of {', '.join(JobManager.PRIORITIES)}"
+        )
+    
+    return priority
+
+
+def _submit_or_reject(submit: Callable[..., Any], *args, **kwargs):
+    """Submit to the job manager or push queue, turning a full queue into a 503."""
+    try:
+        return submit(*args, **kwargs)
+    except QueueFullError as e:
+        metrics.ADMISSION_REJECTIONS.inc(reason="queue_full")
+        logger.warning(f"Rejecting request: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+
+def _get_job_or_404(job_id: str):
+    """Look up a job or raise 404."""
+    job = job_manager.get(job_id)
+    
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Job {job_id} not found"
+        )
+    
+    return job
+
+
+def _get_push_or_404(push_id: int) -> Dict[str, Any]:
+    """Look up a push or raise 404."""
+    push = push_queue.get(push_id)
+    
+    if push is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Push {push_id} not found"
+        )
+    
+    return push
+
+
+def _job_submit_response(job, coalesced: bool = False) -> JobSubmitResponse:
+    """Build the 202 response for a queued job."""
+    if coalesced:
+        logger.info(f"✓ Attached to in-flight job {job.job_id}")
+    
+    return JobSubmitResponse(
+        job_id=job.job_id,
+        status=job.status,
+        status_url=f"/jobs/{job.job_id}",
+        events_url=f"/jobs/{job.job_id}/events",
+        coalesced=coalesced
+    )
+
+
+def _dedupe_key(kind: str, request: BaseModel) -> str:
+    """
+    Key identifying identical pipeline requests for in-flight coalescing.
+    
+    The token, deadline and priority are excluded so retries that differ
+    only in credentials, patience or urgency still share one computation,
+    and prompts are whitespace-normalized as in the result cache key.
+    """
+    fields = request.model_dump(exclude={"github_token", "timeout_seconds", "priority"})
+    for name in ("prompt", "update_prompt"):
+        if isinstance(fields.get(name), str):
+            fields[name] = " ".join(fields[name].split())
+    payload = json.dumps(fields, sort_keys=True, default=str)
+    return f"{kind}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+def _job_timeout(request: BaseModel) -> Optional[float]:
+    """Deadline for a pipeline job: the request's, else the configured default."""
+    return request.timeout_seconds or Config.JOB_TIMEOUT_SECONDS or None
+
+
+def _run_generation(job, request: ProjectGenerateRequest) -> GenerationResponse:
+    """
+    Run the full generation pipeline (job worker).
+    
+    Args:
+        job: Job running the pipeline, used for progress events
+        request: Project generation request with prompt
         
     Returns:
         Generation response with repo URL and file count
@@ -100,58 +975,33 @@ async def generate_project(
     try:
         logger.info(f"Generating project from prompt: {request.prompt[:50]}...")
         
-        # Step 1: Plan the project
-        project_plan = planner.plan(
+        # Steps 1-3: Plan, then generate and review code as a stream
+        project_plan, reviewed_files = _stream_project(
             request.prompt,
             memory_manager.get_memory_dict(),
-            request.github_repo_name
+            request.github_repo_name,
+            job.emit,
+            job.cancel_token
         )
-        logger.info(f"✓ Project plan created: {project_plan.project_name}")
+        logger.info(f"✓ Planned {len(project_plan.files)} files")
         
-        # Step 2: Generate code files
-        generated_files = generator.generate_files(
+        # Steps 4-5: Write each file as soon as it is reviewed, then
+        # update memory
+        project_path, files_created = _write_project(
             project_plan,
-            memory_manager.get_memory_dict()
-        )
-        logger.info(f"✓ Generated {len(generated_files)} files")
-        
-        # Step 3: Review and improve code
-        reviewed_files = reviewer.review_files(generated_files)
-        logger.info(f"✓ Code review completed")
-        
-        # Step 4: Write files to workspace
-        project_path = file_writer.create_project_structure(
-            project_plan.project_name,
-            project_plan.structure
+            reviewed_files,
+            job.emit,
+            job.cancel_token
         )
         
-        write_results = file_writer.write_files(
+        # Step 6: Push to GitHub if requested
+        repo_url = _schedule_push(
+            request,
             project_plan.project_name,
-            reviewed_files
+            project_path,
+            project_plan.description,
+            parent=job
         )
-        files_created = sum(1 for success in write_results.values() if success)
-        logger.info(f"✓ Wrote {files_created} files to workspace")
-        
-        # Step 5: Update memory with project info
-        memory_manager.learn_from_project({
-            "project_name": project_plan.project_name,
-            "tech_stack": project_plan.tech_stack,
-            "style_notes": memory_manager.memory.coding_style
-        })
-        logger.info(f"✓ Memory updated")
-        
-        # Step 6: Push to GitHub if requested
-        repo_url = None
-        if request.auto_push and GITHUB_TOKEN and GITHUB_USERNAME:
-            background_tasks.add_task(
-                _push_to_github,
-                project_plan.project_name,
-                str(project_path),
-                request.github_repo_name or project_plan.project_name,
-                project_plan.description
-            )
-            repo_url = f"https://github.com/{GITHUB_USERNAME}/{request.github_repo_name or project_plan.project_name}"
-            logger.info(f"✓ GitHub push scheduled")
         
         return GenerationResponse(
             success=True,
@@ -162,104 +1012,450 @@ async def generate_project(
             workspace_path=str(project_path)
         )
     
+    except JobCancelledError as e:
+        logger.warning(f"Project generation cancelled: {e}")
+        raise
     except Exception as e:
         logger.error(f"Error generating project: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Project generation failed: {str(e)}"
+        raise RuntimeError(f"Project generation failed: {str(e)}")
+
+
+def _build_project(prompt: str,
+                   memory: Dict[str, Any],
+                   project_name: Optional[str] = None,
+                   progress_callback: Optional[Callable[..., None]] = None,
+                   cancel_token: Optional[CancelToken] = None,
+                   only_paths: Optional[List[str]] = None
+                   ) -> Tuple[ProjectPlan, List[GeneratedFile], Dict[str, float]]:
+    """
+    Run plan/generate/review, serving repeats from the result cache.
+    
+    Returns:
+        Tuple of (plan, reviewed files, stage timings in seconds)
+    """
+    templates = pipeline.registry.current()
+    if result_cache is None:
+        result = pipeline.build_project(
+            prompt, memory, project_name, progress_callback, cancel_token, only_paths,
+            templates
         )
+        metrics.observe_stages(result[2])
+        return result
+    
+    cache_key = ResultCache.make_key(prompt, project_name, memory, only_paths, templates.version)
+    cached = _cached_project(cache_key, progress_callback)
+    if cached is not None:
+        return cached
+    
+    project_plan, reviewed_files, timings = pipeline.build_project(
+        prompt, memory, project_name, progress_callback, cancel_token, only_paths,
+        templates
+    )
+    metrics.observe_stages(timings)
+    result_cache.put(cache_key, project_plan, reviewed_files)
+    return project_plan, reviewed_files, timings
 
 
-@app.post("/update", response_model=UpdateResponse)
-async def update_project(
-    request: ProjectUpdateRequest,
-    background_tasks: BackgroundTasks
-):
+def _stream_project(prompt: str,
+                    memory: Dict[str, Any],
+                    project_name: Optional[str] = None,
+                    progress_callback: Optional[Callable[..., None]] = None,
+                    cancel_token: Optional[CancelToken] = None
+                    ) -> Tuple[ProjectPlan, Iterable[GeneratedFile]]:
     """
-    Update an existing project from GitHub or locally.
+    Like _build_project, but reviewed files are streamed as they are ready.
+    
+    Stage metrics are recorded, and the result cached, once the stream
+    has been consumed to the end.
+    
+    Returns:
+        Tuple of (plan, reviewed files in plan order)
+    """
+    templates = pipeline.registry.current()
+    cache_key = None
+    if result_cache is not None:
+        cache_key = ResultCache.make_key(
+            prompt, project_name, memory, templates_version=templates.version
+        )
+        cached = _cached_project(cache_key, progress_callback)
+        if cached is not None:
+            return cached[0], cached[1]
+    
+    project_plan, reviewed_files, timings = pipeline.stream_project(
+        prompt, memory, project_name, progress_callback, cancel_token,
+        templates=templates
+    )
+    return project_plan, _finish_stream(project_plan, reviewed_files, timings, cache_key)
+
+
+def _cached_project(cache_key: str,
+                    progress_callback: Optional[Callable[..., None]] = None
+                    ) -> Optional[Tuple[ProjectPlan, List[GeneratedFile], Dict[str, float]]]:
+    """Get a cached pipeline result, reporting the hit."""
+    started = time.perf_counter()
+    cached = result_cache.get(cache_key)
+    if cached is None:
+        return None
+    
+    project_plan, reviewed_files = cached
+    logger.info(f"✓ Result cache hit: {project_plan.project_name}")
+    if progress_callback:
+        progress_callback(
+            "cache",
+            f"Reusing cached result for {project_plan.project_name}",
+            project_name=project_plan.project_name,
+            files=[f.path for f in reviewed_files]
+        )
+    timings = {"cache": time.perf_counter() - started}
+    metrics.observe_stages(timings)
+    return project_plan, reviewed_files, timings
+
+
+def _finish_stream(project_plan: ProjectPlan,
+                   reviewed_files: Iterator[GeneratedFile],
+                   timings: Dict[str, float],
+                   cache_key: Optional[str]) -> Iterator[GeneratedFile]:
+    """Pass a pipeline stream through, then record metrics and cache it."""
+    # The cache needs every file, so files are only kept when caching
+    kept = [] if cache_key is not None else None
+    try:
+        for file_obj in reviewed_files:
+            if kept is not None:
+                kept.append(file_obj)
+            yield file_obj
+    finally:
+        reviewed_files.close()
+    
+    metrics.observe_stages(timings)
+    if kept is not None:
+        result_cache.put(cache_key, project_plan, kept)
+
+
+def _write_project(project_plan: ProjectPlan,
+                   reviewed_files: Iterable[GeneratedFile],
+                   progress_callback: Optional[Callable[..., None]] = None,
+                   cancel_token: Optional[CancelToken] = None
+                   ) -> Tuple[Path, int]:
+    """
+    Write reviewed files to the workspace and record the project in memory.
+    
+    The project's lock is held for the whole write, including while
+    waiting for streamed files, so two jobs writing the same project never
+    interleave; jobs writing other projects are not held up. If the write
+    is cancelled or the stream fails, a project directory created by this
+    call is removed so no half-written project is left behind; no other
+    job can be writing into it at that point. Memory is only updated once
+    every file has been written.
+    
+    Returns:
+        Tuple of (project path, number of files written)
+    """
+    with _project_lock(project_plan.project_name):
+        check_cancelled(cancel_token)
+        created = not file_writer.project_exists(project_plan.project_name)
+        
+        try:
+            with metrics.STAGE_LATENCY.time(stage="structure"):
+                project_path = file_writer.create_project_structure(
+                    project_plan.project_name,
+                    project_plan.structure
+                )
+            if progress_callback:
+                progress_callback("structure", f"Project structure created at {project_path}")
+            
+            with metrics.STAGE_LATENCY.time(stage="write"):
+                write_results = file_writer.write_files(
+                    project_plan.project_name,
+                    reviewed_files,
+                    progress_callback,
+                    cancel_token
+                )
+        except Exception:
+            # Stop generation and review of files that will not be written
+            if not isinstance(reviewed_files, list):
+                reviewed_files.close()
+            if created:
+                shutil.rmtree(file_writer.get_project_path(project_plan.project_name), ignore_errors=True)
+                project_index.drop(project_plan.project_name)
+            raise
+        
+    files_created = sum(1 for success in write_results.values() if success)
+    logger.info(f"✓ Wrote {files_created} files to workspace")
+    
+    with workspace_lock, metrics.STAGE_LATENCY.time(stage="memory"):
+        memory_manager.learn_from_project({
+            "project_name": project_plan.project_name,
+            "tech_stack": project_plan.tech_stack,
+            "style_notes": memory_manager.memory.coding_style
+        })
+    logger.info(f"✓ Memory updated")
+    if progress_callback:
+        progress_callback("memory", "Memory updated")
+    
+    return project_path, files_created
+
+
+@contextmanager
+def _project_lock(project_name: str) -> Iterator[None]:
+    """
+    Hold the write lock of one workspace project.
+    
+    Locks are created on first use and dropped once no writer holds or
+    waits for them, so the table only grows with concurrent writes.
+    """
+    with _project_locks_guard:
+        entry = _project_locks.setdefault(project_name, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _project_locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _project_locks[project_name]
+
+
+def _schedule_push(request: ProjectGenerateRequest,
+                   project_name: str,
+                   project_path: Path,
+                   description: str,
+                   parent=None,
+                   priority: Optional[str] = None) -> Optional[str]:
+    """Queue a GitHub push if requested and configured; return the repo URL."""
+    if not (request.auto_push and GITHUB_TOKEN and GITHUB_USERNAME):
+        return None
+    
+    repo_name = request.github_repo_name or project_name
+    push_id = _enqueue_push(project_name, project_path, repo_name, description, parent, priority)
+    
+    repo_url = f"https://github.com/{GITHUB_USERNAME}/{repo_name}"
+    if parent is not None:
+        parent.emit("push", "GitHub push scheduled", repo_url=repo_url, push_id=push_id)
+    
+    return repo_url
+
+
+def _enqueue_push(project_name: str,
+                  project_path: Path,
+                  repo_name: str,
+                  description: str,
+                  parent=None,
+                  priority: Optional[str] = None) -> int:
+    """
+    Queue a follow-up push for admitted work.
+    
+    The parent job's event stream stays open until the first push attempt
+    has finished or the push is cancelled, so clients see its outcome
+    live. The push inherits the parent's priority unless one is given.
+    
+    Returns:
+        Push id
+    """
+    if priority is None:
+        priority = parent.priority if parent is not None else "interactive"
+    if parent is not None:
+        parent.hold()
+    
+    # Registered under the lock so a worker finishing the push straight
+    # away waits in _release_push_hold until the hold is recorded
+    with _push_holds_lock:
+        try:
+            push_id = push_queue.enqueue(
+                project_name,
+                str(project_path),
+                repo_name,
+                description,
+                job_id=parent.job_id if parent is not None else None,
+                bounded=False,
+                priority=priority
+            )
+        except Exception:
+            if parent is not None:
+                parent.release()
+            raise
+        if parent is not None:
+            _push_holds[push_id] = parent
+    
+    logger.info(f"✓ GitHub push {push_id} scheduled")
+    return push_id
+
+
+def _run_update(job, request: ProjectUpdateRequest) -> UpdateResponse:
+    """
+    Run the project update pipeline (job worker).
     
     Args:
+        job: Job running the pipeline, used for progress events
         request: Project update request with GitHub URL and update prompt
-        background_tasks: Background task handler
         
+    The repository's current tree is fetched first (one API call) so
+    only the files the update touches are regenerated, and of those only
+    the ones whose content actually differs are written and pushed.
+    Touched files are request.paths, or else those the prompt names (see
+    _files_mentioned); only planned files are regenerated, so repository
+    files the planner has no template for are never overwritten.
+    
     Returns:
-        Update response with file count
+        Update response with file counts
     """
     try:
         logger.info(f"Starting project update: {request.github_repo_url}")
         
-        # Extract repo name from URL
-        repo_url_parts = request.github_repo_url.rstrip('/').split('/')
-        repo_name = repo_url_parts[-1]
-        github_user = repo_url_parts[-2]
+        # Extract repo name from URL; /update checked the owner is the
+        # account pushes go to
+        github_user, repo_name = _parse_repo_url(request.github_repo_url)
         
         # Create a temporary project name for the update
         update_project_name = f"{repo_name}_updated"
         
-        # Step 1: Clone or create update plan
+        # Step 1: Read the repository's files and blob SHAs
+        remote_shas = _fetch_remote_tree(repo_name, github_user)
+        if remote_shas is not None:
+            job.emit("tree", f"Repository has {len(remote_shas)} files", files=len(remote_shas))
+        if request.paths is not None:
+            touched = set(request.paths)
+        else:
+            touched = _files_mentioned(request.update_prompt, remote_shas or {})
+        
+        # Steps 2-4: Plan, generate and review the touched files that are
+        # planned (every planned file when none are touched). Files are
+        # generated under the repository's own name so unchanged ones hash
+        # to the remote blob
         logger.info(f"Planning updates for {repo_name}...")
-        update_plan = planner.plan(
+        update_plan, reviewed_files, _ = _build_project(
             request.update_prompt,
             memory_manager.get_memory_dict(),
-            update_project_name
+            repo_name,
+            job.emit,
+            job.cancel_token,
+            sorted(touched) or None
         )
-        logger.info(f"✓ Update plan created")
         
-        # Step 2: Generate updated files
-        logger.info(f"Generating updated files...")
-        generated_files = generator.generate_files(
-            update_plan,
-            memory_manager.get_memory_dict()
+        skipped_files = sorted(touched - {f.path for f in update_plan.files})
+        if skipped_files:
+            logger.warning(f"Not regenerating files outside the plan: {skipped_files}")
+            job.emit(
+                "plan",
+                f"Leaving {len(skipped_files)} files outside the plan untouched",
+                skipped_files=skipped_files
+            )
+        
+        from github_manager import GitHubManager
+        changed_files = [
+            f for f in reviewed_files
+            if remote_shas is None
+            or remote_shas.get(f.path) != GitHubManager.git_blob_sha(f.content.encode())
+        ]
+        logger.info(
+            f"✓ Generated and reviewed {len(reviewed_files)} files, "
+            f"{len(changed_files)} differ from {repo_name}"
         )
-        logger.info(f"✓ Generated {len(generated_files)} files")
         
-        # Step 3: Review updated code
-        logger.info(f"Reviewing updated code...")
-        reviewed_files = reviewer.review_files(generated_files)
-        logger.info(f"✓ Code review completed")
+        # Step 5: Update memory
+        job.cancel_token.check()
+        with workspace_lock, metrics.STAGE_LATENCY.time(stage="memory"):
+            memory_manager.learn_from_project({
+                "project_name": update_project_name,
+                "tech_stack": update_plan.tech_stack,
+                "style_notes": memory_manager.memory.coding_style
+            })
+        job.emit("memory", "Memory updated")
         
-        # Step 4: Update memory
-        memory_manager.learn_from_project({
-            "project_name": update_project_name,
-            "tech_stack": update_plan.tech_stack,
-            "style_notes": memory_manager.memory.coding_style
-        })
-        
-        # Step 5: If auto_push is true, schedule GitHub update
+        # Step 6: If auto_push is true, schedule a push of the changed files
         if request.auto_push:
             if not GITHUB_TOKEN:
                 logger.warning("GitHub token not configured")
+                job.emit("push", "GitHub token not configured, push skipped")
+            elif not changed_files:
+                job.emit("push", "Repository already up to date, nothing to push")
             else:
-                # For now, we'll create a local copy with updates
-                # In a full implementation, this would push directly to GitHub
-                project_path = file_writer.create_project_structure(
-                    update_project_name,
-                    update_plan.structure
-                )
-                file_writer.write_files(update_project_name, reviewed_files)
+                # The local copy holds exactly this update's changed files,
+                # so the push uploads nothing else. Files already written stay
+                # on cancellation: the next update replaces the copy wholesale
+                with _project_lock(update_project_name), metrics.STAGE_LATENCY.time(stage="write"):
+                    file_writer.delete_project(update_project_name)
+                    project_path = file_writer.create_project_structure(update_project_name, {})
+                    file_writer.write_files(
+                        update_project_name,
+                        changed_files,
+                        job.emit,
+                        job.cancel_token
+                    )
                 
-                background_tasks.add_task(
-                    _push_to_github,
+                push_id = _enqueue_push(
                     update_project_name,
-                    str(project_path),
+                    project_path,
                     repo_name,
-                    request.commit_message or "Update from AI Project Generator"
+                    request.commit_message or "Update from AI Project Generator",
+                    parent=job
+                )
+                job.emit(
+                    "push",
+                    "GitHub push scheduled",
+                    repo_url=request.github_repo_url,
+                    push_id=push_id
                 )
-                logger.info(f"✓ GitHub push scheduled")
         
         return UpdateResponse(
             success=True,
             message=f"Project {repo_name} update completed",
-            files_modified=len(reviewed_files),
-            repo_url=request.github_repo_url
+            files_modified=len(changed_files),
+            repo_url=request.github_repo_url,
+            files_unchanged=len(reviewed_files) - len(changed_files),
+            changed_files=[f.path for f in changed_files],
+            skipped_files=skipped_files
         )
     
+    except JobCancelledError as e:
+        logger.warning(f"Project update cancelled: {e}")
+        raise
     except Exception as e:
         logger.error(f"Error updating project: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Project update failed: {str(e)}"
-        )
+        raise RuntimeError(f"Project update failed: {str(e)}")
+
+
+def _parse_repo_url(url: str) -> Optional[Tuple[str, str]]:
+    """(owner, repository name) of a GitHub repository URL, or None if it has neither."""
+    parts = url.strip().rstrip('/').split('/')
+    if len(parts) < 2 or not parts[-1] or not parts[-2] or parts[-2].endswith(":"):
+        return None
+    return parts[-2], parts[-1]
+
+
+def _fetch_remote_tree(repo_name: str, owner: str) -> Optional[Dict[str, str]]:
+    """
+    Get a repository's file paths and blob SHAs.
+    
+    Returns:
+        Path -> blob SHA, or None when GitHub is not configured or the
+        tree cannot be read (every regenerated file then counts as changed)
+    """
+    if not GITHUB_TOKEN:
+        return None
+    
+    from github_manager import GitHubManager
+    try:
+        return GitHubManager(GITHUB_TOKEN, GITHUB_USERNAME).get_tree(repo_name, owner=owner)
+    except Exception as e:
+        logger.warning(f"Could not read tree of {owner}/{repo_name}: {e}")
+        return None
+
+
+def _files_mentioned(prompt: str, paths: Iterable[str]) -> Set[str]:
+    """
+    Repository files an update prompt refers to by path or file name.
+    
+    A bare file name such as "main.py" matches that file in any directory.
+    This is a word match only: a prompt that describes a file without
+    naming it touches nothing, and the update then regenerates every
+    planned file. Clients wanting a precise update pass request.paths.
+    """
+    words = {word.strip(".,;:!?'\"`()") for word in prompt.split()}
+    return {
+        path for path in paths
+        if path in words or ('.' in path.rsplit('/', 1)[-1] and path.rsplit('/', 1)[-1] in words)
+    }
 
 
 @app.get("/memory")
@@ -304,6 +1500,66 @@ async def get_project_info(project_name: str):
     }
 
 
+@app.get(
+    "/project/{project_name}/files",
+    response_model=ProjectFilesResponse,
+    response_model_exclude_none=True
+)
+def list_project_files(
+    project_name: str,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    prefix: Optional[str] = None,
+    glob: Optional[str] = None,
+    fields: str = "",
+    refresh: bool = False
+):
+    """
+    List a project's files one page at a time, in path order.
+    
+    Served from the project's maintained manifest, so a page costs the
+    same however many files the project has. Pass refresh=true to rebuild
+    the manifest after files were changed outside the API. A plain def so
+    FastAPI runs it in its threadpool: the first listing of a project
+    created before the index existed walks it once.
+    
+    Args:
+        cursor: next_cursor of the previous page
+        limit: Files per page (1-1000)
+        prefix: Only paths starting with this prefix, e.g. "src/"
+        glob: Only paths matching this pattern, e.g. "*.py"
+        fields: Comma-separated metadata to include: size, mtime, sha256
+        refresh: Rebuild the manifest from disk first
+    """
+    if file_writer.resolve_path(project_name) is None or not file_writer.project_exists(project_name):
+        raise HTTPException(status_code=404, detail=f"Project {project_name} not found")
+    if not 1 <= limit <= 1000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 1000")
+    
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - {"size", "mtime", "sha256"}
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    
+    if refresh:
+        project_index.rebuild(project_name)
+    
+    try:
+        entries, next_cursor = project_index.list_files(project_name, cursor, limit, prefix, glob)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "project_name": project_name,
+        "files": [
+            {key: value for key, value in entry.items() if key == "path" or key in requested}
+            for entry in entries
+        ],
+        "next_cursor": next_cursor,
+        "total": project_index.count(project_name)
+    }
+
+
 @app.delete("/project/{project_name}")
 async def delete_project(project_name: str):
     """Delete a project."""
@@ -316,6 +1572,36 @@ async def delete_project(project_name: str):
         )
 
 
+@app.get("/project/{project_name}/archive")
+async def download_project_archive(project_name: str, format: str = "zip"):
+    """
+    Download a whole project as a ZIP or tar.gz archive in one request.
+    
+    The archive is streamed while files are read, without a temporary file
+    or buffering the project in memory. Files written while the download is
+    in progress may or may not be included.
+    """
+    if format not in archive.FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format {format}; expected one of {', '.join(archive.FORMATS)}"
+        )
+    
+    project_path = file_writer.resolve_path(project_name)
+    if project_path is None or not project_path.is_dir():
+        raise HTTPException(
+            status_code=404,
+            detail=f"Project {project_name} not found"
+        )
+    
+    media_type, extension = archive.FORMATS[format]
+    return StreamingResponse(
+        archive.iter_archive(project_path, format, prefix=project_path.name),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{project_path.name}{extension}"'}
+    )
+
+
 @app.get("/project/{project_name}/file/{file_path:path}")
 async def get_file_content(project_name: str, file_path: str):
     """Get content of a specific file in project."""
@@ -340,6 +1626,135 @@ async def get_file_content(project_name: str, file_path: str):
     }
 
 
+@app.post(
+    "/project/{project_name}/files:batchGet",
+    response_model=FileBatchGetResponse,
+    response_model_exclude_none=True
+)
+def batch_get_files(project_name: str, request: FileBatchGetRequest, http_request: Request):
+    """
+    Read many files of a project in one request.
+    
+    Results come back in request order; files that cannot be read carry
+    an error instead of failing the batch. With "Accept:
+    application/x-ndjson" each file is streamed as its own JSON line as
+    soon as it is read, so large batches are never held in memory.
+    """
+    if file_writer.resolve_path(project_name) is None or not file_writer.project_exists(project_name):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Project {project_name} not found"
+        )
+    
+    results = file_writer.iter_files(project_name, request.paths)
+    
+    if "application/x-ndjson" in http_request.headers.get("accept", ""):
+        return StreamingResponse(
+            (json.dumps(entry) + "\n" for entry in results),
+            media_type="application/x-ndjson"
+        )
+    
+    return {
+        "project_name": project_name,
+        "files": list(results)
+    }
+
+
+@app.get("/project/{project_name}/raw/{file_path:path}")
+@app.head("/project/{project_name}/raw/{file_path:path}", include_in_schema=False)
+def get_raw_file(project_name: str, file_path: str, request: Request):
+    """
+    Download the raw bytes of a project file.
+    
+    Responses carry a strong ETag derived from the file content, so
+    clients polling with If-None-Match get an empty 304 while the file is
+    unchanged. Single byte ranges (Range, optionally guarded by If-Range)
+    are answered with 206; full reads are streamed by FileResponse.
+    """
+    path = file_writer.resolve_path(project_name, file_path)
+    if path is None or not path.is_file():
+        raise HTTPException(
+            status_code=404,
+            detail=f"File {file_path} not found"
+        )
+    
+    stat_result = path.stat()
+    etag = etag_cache.etag(path, stat_result)
+    media_type = mimetypes.guess_type(path.name)[0] or "text/plain"
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "no-cache"
+    }
+    
+    if http_utils.etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    # If-Range: only honour the range when the client's copy is current
+    if_range = request.headers.get("if-range")
+    if if_range is None or if_range.strip() == etag:
+        try:
+            byte_range = http_utils.parse_range(request.headers.get("range"), stat_result.st_size)
+        except http_utils.RangeNotSatisfiableError:
+            return Response(
+                status_code=416,
+                headers={**headers, "Content-Range": f"bytes */{stat_result.st_size}"}
+            )
+        
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{stat_result.st_size}"
+            headers["Content-Length"] = str(end - start + 1)
+            if request.method == "HEAD":
+                # Headers only; Content-Length still describes the range
+                return Response(status_code=206, media_type=media_type, headers=headers)
+            return StreamingResponse(
+                http_utils.iter_file_range(path, start, end),
+                status_code=206,
+                media_type=media_type,
+                headers=headers
+            )
+    
+    return FileResponse(
+        path,
+        headers=headers,
+        media_type=media_type,
+        stat_result=stat_result,
+        method=request.method
+    )
+
+
+@app.post("/project/{project_name}/changes", response_model=ProjectChangesResponse)
+def apply_project_changes(project_name: str, request: ProjectChangesRequest):
+    """
+    Create, update and delete several files in one atomic step.
+    
+    Updates carry either full content or a unified diff. Either every
+    change is applied or none is: a change that does not fit the current
+    files answers 409 with the offending paths marked, and the project is
+    left untouched.
+    """
+    if file_writer.resolve_path(project_name) is None or not file_writer.project_exists(project_name):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Project {project_name} not found"
+        )
+    
+    applied, results = file_writer.apply_changes(project_name, request.changes)
+    response = {
+        "project_name": project_name,
+        "applied": applied,
+        "results": results
+    }
+    
+    if not applied:
+        return JSONResponse(status_code=409, content=response)
+    
+    logger.info(f"✓ Applied {len(results)} changes to {project_name}")
+    return response
+
+
 @app.post("/project/{project_name}/file/{file_path:path}")
 async def update_file_content(
     project_name: str,
@@ -378,7 +1793,7 @@ async def update_file_content(
 async def push_project_to_github(
     project_name: str,
     request: FilePushRequest,
-    background_tasks: BackgroundTasks
+    http_request: Request
 ):
     """Push project changes to GitHub."""
     if not file_writer.project_exists(project_name):
@@ -393,15 +1808,17 @@ async def push_project_to_github(
             detail="GitHub credentials not configured. Set GITHUB_TOKEN and GITHUB_USERNAME in .env"
         )
     
+    _admit(http_request)
     repo_name = request.repo_name or project_name
     project_path = file_writer.get_project_path(project_name)
     
-    background_tasks.add_task(
-        _push_to_github,
+    push_id = _submit_or_reject(
+        push_queue.enqueue,
         project_name,
-        project_path,
+        str(project_path),
         repo_name,
-        f"Update: {request.message}"
+        f"Update: {request.message}",
+        priority=_priority(http_request, request.priority)
     )
     
     repo_url = f"https://github.com/{GITHUB_USERNAME}/{repo_name}"
@@ -410,7 +1827,9 @@ async def push_project_to_github(
         "success": True,
         "message": f"Push to {repo_name} scheduled",
         "repo_url": repo_url,
-        "project_name": project_name
+        "project_name": project_name,
+        "push_id": push_id,
+        "status_url": f"/pushes/{push_id}"
     }
 
 
@@ -425,33 +1844,95 @@ async def set_preference(key: str, value: str):
     }
 
 
-def _push_to_github(
-    project_name: str,
-    project_path: str,
-    repo_name: str,
-    description: str
-):
-    """Push project to GitHub (background task)."""
+def _push_to_github(push: Dict[str, Any], cancel_token: CancelToken):
+    """
+    Run one attempt of a queued GitHub push (push queue worker).
+    
+    Progress goes to the originating job's event stream while that job is
+    still tracked. Any failure, including a single file that did not
+    upload, is raised so the push queue retries with backoff.
+    
+    Args:
+        push: Push record from the push queue
+        cancel_token: Checked before each file upload
+    """
+    job = job_manager.get(push["job_id"]) if push["job_id"] else None
+    progress = job.emit if job is not None else None
+    repo_name = push["repo_name"]
+    
     try:
         if not GITHUB_TOKEN or not GITHUB_USERNAME:
-            logger.warning("GitHub credentials not configured")
-            return
+            raise RuntimeError("GitHub credentials not configured")
         
+        started = time.perf_counter()
+        # Imported on first push: requests is slow to import and unused until then
+        from github_manager import GitHubManager
         github = GitHubManager(GITHUB_TOKEN, GITHUB_USERNAME)
         
-        # Create repository
-        logger.info(f"Creating repository: {repo_name}")
-        github.create_repo(repo_name, description)
+        # Create repository (returns the existing one on retries)
+        logger.info(f"Creating repository: {repo_name} (push {push['id']}, attempt {push['attempts']})")
+        github.create_repo(repo_name, push["description"])
+        if progress:
+            progress("push", f"Repository ready: {repo_name}", repo_name=repo_name, push_id=push["id"])
+        
+        # One tree read replaces a SHA lookup per file and lets files that
+        # are already identical (e.g. uploaded by an earlier attempt) be skipped
+        try:
+            remote_shas = github.get_tree(repo_name)
+        except Exception as e:
+            logger.warning(f"Could not read tree of {repo_name}, uploading every file: {e}")
+            remote_shas = None
         
         # Upload project files
         logger.info(f"Uploading files to {repo_name}")
-        upload_results = github.upload_project(repo_name, project_path)
+        upload_results = github.upload_project(
+            repo_name,
+            push["project_path"],
+            progress_callback=progress,
+            cancel_token=cancel_token,
+            remote_shas=remote_shas
+        )
         
-        success_count = sum(1 for v in upload_results.values() if v)
-        logger.info(f"✓ GitHub push completed: {success_count} files uploaded")
+        failed = [path for path, success in upload_results.items() if not success]
+        if failed:
+            raise RuntimeError(
+                f"{len(failed)} of {len(upload_results)} files failed to upload: {', '.join(failed[:5])}"
+            )
         
+        metrics.STAGE_LATENCY.observe(time.perf_counter() - started, stage="push")
+        logger.info(f"✓ GitHub push completed: {len(upload_results)} files uploaded")
+        if progress:
+            progress(
+                "push",
+                f"GitHub push completed: {len(upload_results)} files uploaded",
+                uploaded=len(upload_results),
+                total=len(upload_results),
+                push_id=push["id"]
+            )
+    
     except Exception as e:
         logger.error(f"Error pushing to GitHub: {e}")
+        if progress:
+            progress(
+                "push",
+                f"GitHub push attempt {push['attempts']} failed: {e}",
+                error=str(e),
+                push_id=push["id"],
+                attempts=push["attempts"]
+            )
+        raise
+    
+    finally:
+        # The job stream waits only for the first attempt; see _enqueue_push
+        _release_push_hold(push["id"])
+
+
+def _release_push_hold(push_id: int):
+    """Release the parent job hold taken for a push; later calls do nothing."""
+    with _push_holds_lock:
+        parent = _push_holds.pop(push_id, None)
+    if parent is not None:
+        parent.release()
 
 
 @app.exception_handler(Exception)
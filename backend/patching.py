@@ -0,0 +1,148 @@
+"""
+Patching: Apply unified diffs to file content.
+Lets clients send small patches for edits instead of whole files.
+"""
+
+import re
+from typing import List, Tuple
+
+
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class PatchError(ValueError):
+    """Raised when a diff is malformed or does not apply to the content."""
+
+
+def _split_lines(text: str) -> List[str]:
+    """
+    Split text into lines that keep their endings.
+
+    Only line feeds end a line, so a carriage return before one stays
+    with its line. Unlike str.splitlines, form feeds, NEL, the Unicode
+    line separators and the like are content.
+    """
+    parts = text.split("\n")
+    lines = [part + "\n" for part in parts[:-1]]
+    if parts[-1]:
+        lines.append(parts[-1])
+    return lines
+
+
+def _strip_newline(lines: List[str]):
+    if lines and lines[-1].endswith("\n"):
+        lines[-1] = lines[-1][:-2] if lines[-1].endswith("\r\n") else lines[-1][:-1]
+
+
+def _parse_hunks(diff: str) -> List[Tuple[int, List[str], List[str]]]:
+    """
+    Parse a unified diff into hunks.
+
+    Returns:
+        List of (old start line, old lines, new lines); lines keep their
+        line endings
+
+    Raises:
+        PatchError: If a hunk's line counts differ from its header's
+    """
+    hunks = []
+    counts = []
+    current = None
+    previous = None
+
+    for line in _split_lines(diff):
+        match = HUNK_HEADER.match(line)
+        if match:
+            _check_counts(len(hunks), current, counts)
+            current = (int(match.group(1)), [], [])
+            hunks.append(current)
+            # An omitted count means one line
+            counts = [int(match.group(2) or 1), int(match.group(4) or 1)]
+            previous = None
+            continue
+        if current is None:
+            # ---/+++ file headers and anything else before the first hunk
+            continue
+
+        old, new = current[1], current[2]
+        if line.startswith("\\"):
+            # "\ No newline at end of file" applies to the previous line
+            if previous in (" ", "-"):
+                _strip_newline(old)
+            if previous in (" ", "+"):
+                _strip_newline(new)
+            continue
+
+        if [len(old), len(new)] == counts:
+            raise PatchError(f"Hunk {len(hunks)} has more lines than its header says")
+        kind, text = line[:1], line[1:]
+        if line in ("\n", "\r\n"):
+            # Some tools drop the leading space of empty context lines
+            kind, text = " ", line
+        if kind == " ":
+            old.append(text)
+            new.append(text)
+        elif kind == "-":
+            old.append(text)
+        elif kind == "+":
+            new.append(text)
+        else:
+            raise PatchError(f"Unexpected line in hunk: {line.rstrip()}")
+        previous = kind
+
+    if not hunks:
+        raise PatchError("Patch contains no hunks")
+    _check_counts(len(hunks), current, counts)
+    return hunks
+
+
+def _check_counts(number: int, hunk, counts: List[int]):
+    """Reject a finished hunk, e.g. a truncated one, whose lines its header doesn't count."""
+    if hunk is None:
+        return
+    if [len(hunk[1]), len(hunk[2])] != counts:
+        raise PatchError(
+            f"Hunk {number} has {len(hunk[1])} old and {len(hunk[2])} new lines, "
+            f"header says {counts[0]} and {counts[1]}"
+        )
+
+
+def apply_unified_diff(original: str, diff: str) -> str:
+    """
+    Apply a unified diff (as produced by diff -u or git diff) to content.
+
+    Hunks must match exactly; a hunk whose context moved is looked for
+    after the previous hunk, like patch does with an offset.
+
+    Args:
+        original: Current file content
+        diff: Unified diff of a single file
+
+    Returns:
+        Patched content
+
+    Raises:
+        PatchError: If the diff is malformed or a hunk does not apply
+    """
+    lines = _split_lines(original)
+    result: List[str] = []
+    position = 0
+
+    for number, (start, old, new) in enumerate(_parse_hunks(diff), 1):
+        # Line numbers are 1-based; an empty old range names the line before
+        expected = max(start - 1, 0) if old else start
+        candidates = [expected] + [
+            i for i in range(position, len(lines) - len(old) + 1) if i != expected
+        ]
+        for index in candidates:
+            if index >= position and lines[index:index + len(old)] == old:
+                break
+        else:
+            raise PatchError(f"Hunk {number} does not apply")
+
+        result.extend(lines[position:index])
+        result.extend(new)
+        position = index + len(old)
+
+    result.extend(lines[position:])
+    return "".join(result)
@@ -0,0 +1,296 @@
+"""
+Pipeline: Side-effect free plan -> generate -> review stages.
+Shared by the API job workers and the batch process pool. Generation and
+review overlap, streaming files through bounded queues.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from schemas import ProjectPlan, GeneratedFile
+from agent_planner import AgentPlanner
+from agent_generator import AgentGenerator
+from agent_reviewer import AgentReviewer
+from cancellation import CancelToken, check_cancelled
+from config import Config
+from lazy import Lazy
+from template_registry import TemplateRegistry, TemplateSet
+
+
+# Agents are stateless, so one instance per process is enough; each is
+# built on first use so importing the pipeline (e.g. in batch worker
+# processes) stays cheap
+planner = Lazy(AgentPlanner, "planner")
+generator = Lazy(
+    lambda: AgentGenerator(
+        Config.GENERATOR_WORKERS,
+        Config.GENERATOR_USE_PROCESSES,
+        Config.RENDER_CACHE_MAX_ENTRIES
+    ),
+    "generator"
+)
+reviewer = Lazy(lambda: AgentReviewer(Config.REVIEW_CACHE_MAX_ENTRIES), "reviewer")
+
+# Built-in templates overlaid with the on-disk template packs
+registry = Lazy(
+    lambda: TemplateRegistry(
+        Config.TEMPLATE_PACKS_DIR,
+        AgentGenerator.COMPILED_TEMPLATES,
+        AgentPlanner.TEMPLATES
+    ),
+    "templates"
+)
+
+# Synthetic prompts that together reach every planner template and every
+# templated file the generator renders
+WARM_UP_PROMPTS = (
+    "Create a FastAPI api with a database and settings",
+    "Create a Flask web app",
+    "Create a Streamlit dashboard with a PyTorch model"
+)
+
+
+def build_project(prompt: str,
+                  memory: Dict[str, Any],
+                  project_name: Optional[str] = None,
+                  progress_callback: Optional[Callable[..., None]] = None,
+                  cancel_token: Optional[CancelToken] = None,
+                  only_paths: Optional[Iterable[str]] = None,
+                  templates: Optional[TemplateSet] = None
+                  ) -> Tuple[ProjectPlan, List[GeneratedFile], Dict[str, float]]:
+    """
+    Plan, generate and review a project without touching disk or memory.
+
+    Args:
+        prompt: Natural language project description
+        memory: Snapshot of user memory
+        project_name: Optional project name override
+        progress_callback: Optional callback(stage, message, **data)
+        cancel_token: Optional token checked between stages and files
+        only_paths: Generate and review just the planned files among
+            these (e.g. the files an update touches) instead of every
+            planned file; other paths are ignored
+        templates: Templates to plan and render with (default the
+            registry's current set); pass one in to key caches by its
+            version, or to use it in another process
+
+    Returns:
+        Tuple of (plan, reviewed files, stage timings in seconds)
+
+    Raises:
+        JobCancelledError: If cancelled or past the deadline
+    """
+    plan, reviewed_files, timings = stream_project(
+        prompt, memory, project_name, progress_callback, cancel_token, only_paths,
+        templates=templates
+    )
+    return plan, list(reviewed_files), timings
+
+
+def stream_project(prompt: str,
+                   memory: Dict[str, Any],
+                   project_name: Optional[str] = None,
+                   progress_callback: Optional[Callable[..., None]] = None,
+                   cancel_token: Optional[CancelToken] = None,
+                   only_paths: Optional[Iterable[str]] = None,
+                   queue_size: Optional[int] = None,
+                   templates: Optional[TemplateSet] = None
+                   ) -> Tuple[ProjectPlan, Iterator[GeneratedFile], Dict[str, float]]:
+    """
+    Plan a project, then generate and review its files as a stream.
+
+    Generation and review each run on their own thread, connected to each
+    other and to the consumer by bounded queues: a file is reviewed as
+    soon as it is generated and handed on (e.g. to FileWriter.write_files)
+    as soon as it is reviewed, and at most queue_size files wait between
+    two stages. Stopping iteration early stops both stages.
+
+    Args:
+        prompt: Natural language project description
+        memory: Snapshot of user memory
+        project_name: Optional project name override
+        progress_callback: Optional callback(stage, message, **data),
+            called from the stage threads
+        cancel_token: Optional token checked between stages and files
+        only_paths: Generate and review just the planned files among these
+        queue_size: Files buffered between stages (default
+            Config.PIPELINE_QUEUE_SIZE)
+        templates: Templates to plan and render with (default the
+            registry's current set); a reload while the files stream
+            does not affect them
+
+    Returns:
+        Tuple of (plan, iterator of reviewed files in plan order, stage
+        timings in seconds). "generate" and "review" are time spent in
+        each stage, complete once the iterator is exhausted.
+
+    Raises:
+        JobCancelledError: If cancelled or past the deadline, from the
+            planning step or while iterating
+    """
+    queue_size = queue_size or Config.PIPELINE_QUEUE_SIZE
+    templates = templates or registry.current()
+    timings = {}
+
+    check_cancelled(cancel_token)
+    started = time.perf_counter()
+    plan = planner.plan(prompt, memory, project_name, templates.planner)
+    if only_paths:
+        plan = restrict_plan(plan, only_paths)
+    timings["plan"] = time.perf_counter() - started
+
+    if progress_callback:
+        progress_callback(
+            "plan",
+            f"Project plan created: {plan.project_name}",
+            project_name=plan.project_name,
+            files=[f.path for f in plan.files]
+        )
+
+    check_cancelled(cancel_token)
+    timings["generate"] = 0.0
+    timings["review"] = 0.0
+
+    generated_files = _timed(
+        generator.iter_generated_files(
+            plan, memory, progress_callback, cancel_token, templates.generator
+        ),
+        timings,
+        "generate"
+    )
+    reviewed_files = _reviewed(
+        _threaded(generated_files, queue_size, "generate"),
+        progress_callback,
+        cancel_token,
+        timings
+    )
+    return plan, _threaded(reviewed_files, queue_size, "review"), timings
+
+
+def _timed(items: Iterator, timings: Dict[str, float], stage: str) -> Iterator:
+    """Yield from items, adding the time spent producing them to timings[stage]."""
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+            finally:
+                timings[stage] += time.perf_counter() - started
+            yield item
+    finally:
+        items.close()
+
+
+def _reviewed(files: Iterator[GeneratedFile],
+              progress_callback: Optional[Callable[..., None]],
+              cancel_token: Optional[CancelToken],
+              timings: Dict[str, float]) -> Iterator[GeneratedFile]:
+    """Review files one by one as they arrive (time waiting for them is not counted)."""
+    try:
+        for file_obj in files:
+            started = time.perf_counter()
+            reviewed_file, = reviewer.review_files([file_obj], progress_callback, cancel_token)
+            timings["review"] += time.perf_counter() - started
+            yield reviewed_file
+    finally:
+        # Stop generation now rather than when the traceback is freed
+        files.close()
+
+
+class _Failure:
+    """An exception raised by a stage, handed to the consumer."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_END = object()
+
+
+def _threaded(items: Iterator, queue_size: int, stage: str) -> Iterator:
+    """
+    Run an iterator on a background thread, passing its items through a
+    bounded queue.
+
+    items must be a generator. Exceptions (including JobCancelledError)
+    are re-raised in the consumer. When the consumer stops early the
+    thread stops at its next hand-over and closes items, which stops
+    upstream stages in turn.
+    """
+    buffer: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    stopped = threading.Event()
+
+    def hand_over(item) -> bool:
+        try:
+            buffer.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not hand_over(item):
+                    return
+            hand_over(_END)
+        except BaseException as e:
+            hand_over(_Failure(e))
+        finally:
+            items.close()
+
+    threading.Thread(target=produce, name=f"pipeline-{stage}", daemon=True).start()
+
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+
+
+def restrict_plan(plan: ProjectPlan, paths: Iterable[str]) -> ProjectPlan:
+    """
+    Narrow a plan to those of the given files it contains.
+
+    Paths outside the plan are dropped: the generator only has a
+    placeholder for them, which must never replace a real file.
+    """
+    wanted = set(paths)
+    return plan.model_copy(update={"files": [f for f in plan.files if f.path in wanted]})
+
+
+def warm_up() -> float:
+    """
+    Run synthetic generations so first real requests run at steady state.
+
+    Exercises the reviewer's rules, every template and the pydantic
+    validation and serialization paths the API and caches use. Nothing is
+    written and no metrics are recorded.
+
+    Returns:
+        Seconds spent
+    """
+    started = time.perf_counter()
+    reviewer.warm_up()
+
+    for prompt in WARM_UP_PROMPTS:
+        plan, files, _ = build_project(prompt, {}, "warm_up")
+        ProjectPlan.model_validate_json(plan.model_dump_json())
+        for file_obj in files:
+            GeneratedFile.model_validate(file_obj.model_dump())
+
+    return time.perf_counter() - started
@@ -0,0 +1,280 @@
+"""
+Project Index: Per-project file manifests kept up to date by FileWriter.
+Listing a project reads a sorted in-memory manifest instead of walking the
+directory, so a page of results costs O(page) however large the project is.
+"""
+
+import base64
+import bisect
+import fnmatch
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class _Manifest:
+    """Sorted file paths of one project plus their metadata."""
+
+    def __init__(self, entries: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.entries: Dict[str, Dict[str, Any]] = entries or {}
+        self.paths: List[str] = sorted(self.entries)
+
+    def put(self, path: str, entry: Dict[str, Any]):
+        if path not in self.entries:
+            bisect.insort(self.paths, path)
+        self.entries[path] = entry
+
+    def discard(self, path: str):
+        if self.entries.pop(path, None) is not None:
+            del self.paths[bisect.bisect_left(self.paths, path)]
+
+
+class ProjectIndex:
+    """Maintained manifests of every project in the workspace."""
+
+    def __init__(self, workspace_dir: str = "workspace", index_dir: str = "cache/index"):
+        """
+        Initialize project index.
+
+        Args:
+            workspace_dir: Base directory of generated projects
+            index_dir: Directory holding one persisted manifest per project
+        """
+        self.workspace_dir = Path(workspace_dir)
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self._manifests: Dict[str, _Manifest] = {}
+        # Project name -> [open deferred() blocks, whether a save is owed]
+        self._deferred: Dict[str, List[Any]] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def encode_cursor(path: str) -> str:
+        """Opaque cursor pointing just after a path."""
+        return base64.urlsafe_b64encode(path.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> str:
+        """
+        Decode a cursor from encode_cursor.
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            return base64.b64decode(cursor.encode("ascii"), altchars=b"-_", validate=True).decode("utf-8")
+        except Exception:
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+    def record(self, project_name: str, files: Dict[str, Optional[bytes]]):
+        """
+        Record files that were just written.
+
+        Args:
+            project_name: Project name
+            files: Relative path -> written bytes (None to hash from disk)
+        """
+        project_path = self.workspace_dir / project_name
+        updates = {}
+        for path, data in files.items():
+            try:
+                updates[path] = self.describe(project_path / path, data)
+            except OSError:
+                continue
+
+        self.record_entries(project_name, updates)
+
+    def record_entries(self, project_name: str, entries: Dict[str, Dict[str, Any]]):
+        """
+        Record files described with describe() as they were written, so a
+        streaming writer need not keep file contents until it finishes.
+        """
+        with self._lock:
+            manifest = self._manifest(project_name)
+            for path, entry in entries.items():
+                manifest.put(path, entry)
+            self._save(project_name, manifest)
+
+    def remove(self, project_name: str, paths: Iterable[str]):
+        """Forget deleted files."""
+        with self._lock:
+            manifest = self._manifest(project_name)
+            for path in paths:
+                manifest.discard(path)
+            self._save(project_name, manifest)
+
+    @contextmanager
+    def deferred(self, project_name: str) -> Iterator[None]:
+        """
+        Write a project's manifest once, when the block ends, rather than
+        after every update inside it.
+
+        The in-memory manifest is updated as usual, so listings stay
+        current. Blocks may nest and overlap across threads; the last one
+        to end writes the manifest.
+        """
+        with self._lock:
+            state = self._deferred.setdefault(project_name, [0, False])
+            state[0] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                state[0] -= 1
+                if state[0] == 0:
+                    del self._deferred[project_name]
+                    manifest = self._manifests.get(project_name)
+                    if state[1] and manifest is not None:
+                        self._save(project_name, manifest)
+
+    def drop(self, project_name: str):
+        """Forget a deleted project."""
+        with self._lock:
+            self._manifests.pop(project_name, None)
+            try:
+                self._manifest_path(project_name).unlink()
+            except FileNotFoundError:
+                pass
+
+    def rebuild(self, project_name: str) -> int:
+        """
+        Rebuild a manifest from disk, e.g. after files changed outside the API.
+
+        Returns:
+            Number of files indexed
+        """
+        project_path = self.workspace_dir / project_name
+        entries = {}
+        for root, dirs, filenames in os.walk(project_path):
+            for filename in filenames:
+                full_path = Path(root) / filename
+                try:
+                    entries[full_path.relative_to(project_path).as_posix()] = self.describe(full_path)
+                except OSError:
+                    continue
+
+        with self._lock:
+            manifest = _Manifest(entries)
+            self._manifests[project_name] = manifest
+            self._save(project_name, manifest)
+            return len(manifest.paths)
+
+    def count(self, project_name: str) -> int:
+        """Number of files in a project."""
+        with self._lock:
+            return len(self._manifest(project_name).paths)
+
+    def paths(self, project_name: str) -> List[str]:
+        """All file paths of a project in sorted order."""
+        with self._lock:
+            return list(self._manifest(project_name).paths)
+
+    def list_files(self,
+                   project_name: str,
+                   cursor: Optional[str] = None,
+                   limit: int = 100,
+                   prefix: Optional[str] = None,
+                   pattern: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Get one page of a project's files in path order.
+
+        Args:
+            project_name: Project name
+            cursor: Cursor from a previous page
+            limit: Maximum files returned
+            prefix: Only paths starting with this prefix
+            pattern: Only paths matching this glob (fnmatch rules, so "*"
+                also crosses "/": "src/*.py" matches nested files)
+
+        Returns:
+            Tuple of (file entries, cursor for the next page or None)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        after = self.decode_cursor(cursor) if cursor else None
+
+        # The literal head of a glob narrows the scan like a prefix would
+        if pattern:
+            wildcard = min((i for i in map(pattern.find, "*?[") if i >= 0), default=len(pattern))
+            if pattern[:wildcard].startswith(prefix or ""):
+                prefix = pattern[:wildcard]
+
+        with self._lock:
+            manifest = self._manifest(project_name)
+            paths = manifest.paths
+            start = bisect.bisect_left(paths, prefix or "")
+            if after is not None:
+                start = max(start, bisect.bisect_right(paths, after))
+
+            page = []
+            last = None
+            for i in range(start, len(paths)):
+                path = paths[i]
+                if prefix and not path.startswith(prefix):
+                    break
+                if pattern and not fnmatch.fnmatchcase(path, pattern):
+                    continue
+                if len(page) == limit:
+                    return page, self.encode_cursor(last)
+                page.append({"path": path, **manifest.entries[path]})
+                last = path
+
+        return page, None
+
+    def describe(self, path: Path, data: Optional[bytes] = None) -> Dict[str, Any]:
+        """Build the manifest entry of one file (data is read if not given)."""
+        stat = path.stat()
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        return {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha256": hashlib.sha256(data).hexdigest()
+        }
+
+    def _manifest(self, project_name: str) -> _Manifest:
+        """Get a loaded manifest, reading or rebuilding it on first use (lock held)."""
+        manifest = self._manifests.get(project_name)
+        if manifest is not None:
+            return manifest
+
+        try:
+            with open(self._manifest_path(project_name), "r", encoding="utf-8") as f:
+                manifest = _Manifest(json.load(f))
+        except FileNotFoundError:
+            manifest = None
+        except Exception as e:
+            print(f"Error reading manifest for {project_name}: {e}")
+            manifest = None
+
+        if manifest is None:
+            # No manifest yet (project predates the index): index it once
+            self.rebuild(project_name)
+            return self._manifests[project_name]
+
+        self._manifests[project_name] = manifest
+        return manifest
+
+    def _manifest_path(self, project_name: str) -> Path:
+        return self.index_dir / f"{project_name}.json"
+
+    def _save(self, project_name: str, manifest: _Manifest):
+        """Persist a manifest atomically, unless deferred (lock held)."""
+        state = self._deferred.get(project_name)
+        if state is not None:
+            state[1] = True
+            return
+        path = self._manifest_path(project_name)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest.entries, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error writing manifest for {project_name}: {e}")
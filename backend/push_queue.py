@@ -0,0 +1,365 @@
+"""
+Push Queue: Durable GitHub push queue backed by SQLite.
+Pushes survive restarts, are retried with exponential backoff and are
+processed by worker threads independent of request handling.
+"""
+
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from job_manager import QueueFullError
+from cancellation import CLIENT_CANCELLED, CancelToken, JobCancelledError
+
+
+class PushQueue:
+    """Persistent queue of GitHub pushes with retrying worker threads."""
+
+    STATUSES = ("pending", "running", "failed", "cancelled", "done")
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS pushes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            project_name TEXT NOT NULL,
+            project_path TEXT NOT NULL,
+            repo_name TEXT NOT NULL,
+            description TEXT NOT NULL DEFAULT '',
+            job_id TEXT,
+            priority TEXT NOT NULL DEFAULT 'interactive',
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            next_attempt_at REAL NOT NULL,
+            last_error TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_pushes_ready ON pushes (status, next_attempt_at);
+    """
+
+    def __init__(self,
+                 db_path: str,
+                 workers: int = 2,
+                 max_attempts: int = 5,
+                 base_delay: float = 2.0,
+                 max_delay: float = 300.0,
+                 poll_interval: float = 1.0,
+                 max_pending: Optional[int] = None,
+                 retry_after: int = 30,
+                 attempt_timeout: Optional[float] = None):
+        """
+        Initialize push queue.
+
+        Args:
+            db_path: SQLite database file
+            workers: Number of worker threads
+            max_attempts: Attempts before a push is marked failed
+            base_delay: Backoff before the first retry, doubled per attempt
+            max_delay: Upper bound on the backoff delay
+            poll_interval: Idle wait between checks for ready pushes
+            max_pending: Pending pushes accepted before enqueue is refused;
+                None for unbounded
+            retry_after: Retry-After hint when enqueue is refused
+            attempt_timeout: Seconds before a running attempt is stopped
+                and counted as failed; None for no deadline
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self.attempt_timeout = attempt_timeout
+        self.handler: Optional[Callable[[Dict[str, Any], CancelToken], None]] = None
+        self._running: Dict[int, CancelToken] = {}
+        self._running_lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(pushes)")}
+            if "priority" not in columns:
+                conn.execute(
+                    "ALTER TABLE pushes ADD COLUMN priority TEXT NOT NULL DEFAULT 'interactive'"
+                )
+
+    def start(self, handler: Callable[[Dict[str, Any], CancelToken], None]):
+        """
+        Recover interrupted pushes and start worker threads.
+
+        Args:
+            handler: Performs one push attempt given the push record and a
+                cancel token to check between files; raising marks the
+                attempt as failed
+        """
+        if self._threads:
+            return
+
+        self.handler = handler
+
+        # Pushes that were running when the process died are safe to redo:
+        # create_or_update_file is idempotent per file
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE pushes SET status = 'pending', updated_at = ? WHERE status = 'running'",
+                (datetime.now().isoformat(),)
+            )
+
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker_loop,
+                name=f"push-worker-{i}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        """Stop worker threads after their current push."""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def enqueue(self,
+                project_name: str,
+                project_path: str,
+                repo_name: str,
+                description: str = "",
+                job_id: Optional[str] = None,
+                bounded: bool = True,
+                priority: str = "interactive") -> int:
+        """
+        Add a push to the queue.
+
+        Args:
+            project_name: Workspace project name
+            project_path: Local project directory to upload
+            repo_name: Target GitHub repository
+            description: Repository description / commit context
+            job_id: Job whose event stream should receive push progress
+            bounded: Whether max_pending applies; follow-ups of admitted
+                work pass False
+            priority: "interactive" pushes are claimed before "bulk" ones
+
+        Returns:
+            Push id
+
+        Raises:
+            QueueFullError: If bounded and max_pending pushes are waiting
+        """
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            if bounded and self.max_pending is not None:
+                (pending,) = conn.execute(
+                    "SELECT COUNT(*) FROM pushes WHERE status = 'pending'"
+                ).fetchone()
+                if pending >= self.max_pending:
+                    raise QueueFullError(
+                        f"Push queue full ({pending} pending)",
+                        self.retry_after
+                    )
+
+            cursor = conn.execute(
+                """
+                INSERT INTO pushes (project_name, project_path, repo_name, description,
+                                    job_id, priority, max_attempts, next_attempt_at,
+                                    created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (project_name, str(project_path), repo_name, description,
+                 job_id, priority, self.max_attempts, time.time(), now, now)
+            )
+            push_id = cursor.lastrowid
+
+        self._wake.set()
+        return push_id
+
+    def get(self, push_id: int) -> Optional[Dict[str, Any]]:
+        """Get a push by id."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM pushes WHERE id = ?", (push_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list_pushes(self, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """List pushes, newest first, optionally filtered by status."""
+        with self._connect() as conn:
+            if status:
+                rows = conn.execute(
+                    "SELECT * FROM pushes WHERE status = ? ORDER BY id DESC LIMIT ?",
+                    (status, limit)
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT * FROM pushes ORDER BY id DESC LIMIT ?",
+                    (limit,)
+                ).fetchall()
+        return [dict(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of pushes in each status."""
+        counts = {status: 0 for status in self.STATUSES}
+        with self._connect() as conn:
+            for status, count in conn.execute(
+                "SELECT status, COUNT(*) FROM pushes GROUP BY status"
+            ):
+                counts[status] = count
+        return counts
+
+    def cancel(self, push_id: int) -> bool:
+        """
+        Cancel a push.
+
+        Pending pushes are cancelled immediately; a running push stops
+        before its next file upload. Files already uploaded stay, and the
+        push can be resumed with retry.
+
+        Returns:
+            Whether the push was pending or running
+        """
+        with self._running_lock:
+            token = self._running.get(push_id)
+        if token is not None:
+            token.cancel(CLIENT_CANCELLED)
+            return True
+
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE pushes SET status = 'cancelled', last_error = ?, updated_at = ?
+                WHERE id = ? AND status = 'pending'
+                """,
+                (CLIENT_CANCELLED, datetime.now().isoformat(), push_id)
+            )
+            return cursor.rowcount > 0
+
+    def retry(self, push_id: int) -> bool:
+        """
+        Requeue a failed or cancelled push with a fresh attempt budget.
+
+        Returns:
+            Whether the push was requeued
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE pushes SET status = 'pending', max_attempts = attempts + ?,
+                                  next_attempt_at = ?, updated_at = ?
+                WHERE id = ? AND status IN ('failed', 'cancelled')
+                """,
+                (self.max_attempts, time.time(), datetime.now().isoformat(), push_id)
+            )
+            requeued = cursor.rowcount > 0
+
+        if requeued:
+            self._wake.set()
+        return requeued
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a short-lived autocommit connection."""
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Atomically move the next ready push to running."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                """
+                SELECT * FROM pushes
+                WHERE status = 'pending' AND next_attempt_at <= ?
+                ORDER BY priority != 'interactive', next_attempt_at, id LIMIT 1
+                """,
+                (time.time(),)
+            ).fetchone()
+
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "UPDATE pushes SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (datetime.now().isoformat(), row["id"])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        push = dict(row)
+        push["attempts"] += 1
+        push["status"] = "running"
+        return push
+
+    def _finish(self, push: Dict[str, Any], error: Optional[str], cancelled: bool = False):
+        """Record the outcome of an attempt, scheduling a retry if allowed."""
+        now = datetime.now().isoformat()
+
+        if cancelled:
+            status, next_attempt_at = "cancelled", push["next_attempt_at"]
+        elif error is None:
+            status, next_attempt_at = "done", push["next_attempt_at"]
+        elif push["attempts"] >= push["max_attempts"]:
+            status, next_attempt_at = "failed", push["next_attempt_at"]
+        else:
+            delay = min(self.max_delay, self.base_delay * 2 ** (push["attempts"] - 1))
+            delay *= random.uniform(0.8, 1.2)
+            status, next_attempt_at = "pending", time.time() + delay
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE pushes SET status = ?, next_attempt_at = ?, last_error = ?, updated_at = ?
+                WHERE id = ?
+                """,
+                (status, next_attempt_at, error, now, push["id"])
+            )
+
+        push.update(status=status, next_attempt_at=next_attempt_at, last_error=error)
+
+    def _worker_loop(self):
+        """Claim and execute ready pushes until stopped."""
+        while not self._stop.is_set():
+            try:
+                push = self._claim()
+            except Exception as e:
+                print(f"✗ Push queue error: {e}")
+                push = None
+
+            if push is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+
+            token = CancelToken(self.attempt_timeout)
+            with self._running_lock:
+                self._running[push["id"]] = token
+
+            try:
+                self.handler(push, token)
+                self._finish(push, None)
+            except JobCancelledError as e:
+                # A client cancel is final; a timed-out attempt is retried
+                self._finish(push, str(e), cancelled=token.reason == CLIENT_CANCELLED)
+                print(f"✗ Push {push['id']} attempt {push['attempts']} stopped: {e}")
+            except Exception as e:
+                self._finish(push, str(e))
+                print(f"✗ Push {push['id']} attempt {push['attempts']} failed: {e}")
+            finally:
+                with self._running_lock:
+                    self._running.pop(push["id"], None)
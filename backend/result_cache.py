@@ -0,0 +1,224 @@
+"""
+Result Cache: Persistent content-addressed cache for pipeline results.
+Maps a hash of the normalized request and memory snapshot to the plan and
+reviewed files, so repeat generations skip planning, generation and review.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from schemas import ProjectPlan, GeneratedFile, UserMemory
+
+
+class ResultCache:
+    """Size-bounded LRU cache of pipeline results stored as JSON files."""
+
+    # Memory fields that record history but never influence generated output
+    VOLATILE_MEMORY_FIELDS = tuple(
+        name for name, field in UserMemory.model_fields.items()
+        if (field.json_schema_extra or {}).get("volatile")
+    )
+
+    def __init__(self,
+                 cache_dir: str = "cache",
+                 max_entries: int = 256,
+                 max_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize result cache.
+
+        Args:
+            cache_dir: Directory holding one JSON file per cached result
+            max_entries: Maximum number of cached results
+            max_bytes: Maximum total size of cached results on disk
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._load_index()
+
+    @classmethod
+    def make_key(cls,
+                 prompt: str,
+                 project_name: Optional[str],
+                 memory: Dict[str, Any],
+                 only_paths: Optional[List[str]] = None,
+                 templates_version: Optional[str] = None) -> str:
+        """
+        Build the cache key for a pipeline run.
+
+        Only inputs that influence the pipeline output are hashed; delivery
+        options such as auto_push or tokens are deliberately left out, and
+        the prompt is whitespace-normalized as /plan does.
+
+        Args:
+            prompt: Natural language project description
+            project_name: Optional project name override
+            memory: Memory snapshot passed to the agents
+            only_paths: Files the run was restricted to, if any
+            templates_version: Version of the template packs the run
+                used (TemplateSet.version), if any were loaded
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        memory = {
+            k: v for k, v in memory.items()
+            if k not in cls.VOLATILE_MEMORY_FIELDS
+        }
+        inputs = {"prompt": " ".join(prompt.split()), "project_name": project_name or None, "memory": memory}
+        if only_paths:
+            # Only present when set, so keys of unrestricted runs are unchanged
+            inputs["only_paths"] = sorted(only_paths)
+        if templates_version:
+            # Results of other template packs, or of the built-ins, don't apply
+            inputs["templates"] = templates_version
+        payload = json.dumps(inputs, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[ProjectPlan, List[GeneratedFile]]]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Tuple of (plan, reviewed files) or None on a miss
+        """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+
+            try:
+                with open(self._path(key), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                plan = ProjectPlan(**data["plan"])
+                files = [GeneratedFile(**item) for item in data["files"]]
+            except Exception as e:
+                print(f"Error reading cache entry {key}: {e}")
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._touch(key)
+            self.hits += 1
+            return plan, files
+
+    def put(self, key: str, plan: ProjectPlan, files: List[GeneratedFile]) -> bool:
+        """
+        Store a pipeline result.
+
+        Args:
+            key: Cache key from make_key
+            plan: Project plan
+            files: Reviewed files
+
+        Returns:
+            Whether the result was stored
+        """
+        data = json.dumps({
+            "key": key,
+            "created_at": datetime.now().isoformat(),
+            "plan": plan.model_dump(),
+            "files": [f.model_dump() for f in files]
+        }).encode("utf-8")
+
+        if len(data) > self.max_bytes:
+            return False
+
+        with self._lock:
+            try:
+                tmp_path = self._path(key).with_suffix(".tmp")
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, self._path(key))
+            except Exception as e:
+                print(f"Error writing cache entry {key}: {e}")
+                return False
+
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+            return True
+
+    def invalidate(self, key: Optional[str] = None) -> int:
+        """
+        Remove one cached result, or all of them when key is None.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = list(self._entries) if key is None else [key]
+            removed = 0
+            for k in keys:
+                if k in self._entries:
+                    self._remove(k)
+                    removed += 1
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache size and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def _path(self, key: str) -> Path:
+        """Path of the file backing a cache entry."""
+        return self.cache_dir / f"{key}.json"
+
+    def _load_index(self):
+        """Rebuild the LRU index from disk, least recently used first."""
+        paths = sorted(self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for path in paths:
+            size = path.stat().st_size
+            self._entries[path.stem] = size
+            self._total_bytes += size
+        self._evict()
+
+    def _touch(self, key: str):
+        """Bump the entry's mtime so LRU order survives restarts."""
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Drop least recently used entries until within bounds (lock held)."""
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or self._total_bytes > self.max_bytes):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        """Delete an entry from the index and disk (lock held)."""
+        self._total_bytes -= self._entries.pop(key, 0)
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
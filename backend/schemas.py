@@ -3,10 +3,14 @@ Pydantic schemas for request/response validation.
 Defines all data models used in the AI Project Generator system.
 """
 
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 from pydantic import BaseModel, Field
 
 
+# Scheduling classes: interactive work is served first, bulk uses spare capacity
+Priority = Literal["interactive", "bulk"]
+
+
 class ProjectPlanRequest(BaseModel):
     """Request model for project planning."""
     prompt: str = Field(..., description="Natural language project description")
@@ -19,6 +23,8 @@ class ProjectGenerateRequest(BaseModel):
     github_repo_name: Optional[str] = Field(None, description="GitHub repo name")
     github_token: Optional[str] = Field(None, description="GitHub personal access token")
     auto_push: bool = Field(True, description="Automatically push to GitHub")
+    timeout_seconds: Optional[float] = Field(None, gt=0, description="Cancel the job if not finished within this many seconds")
+    priority: Optional[Priority] = Field(None, description="Scheduling class; defaults to the X-Priority header, then interactive")
 
 
 class ProjectUpdateRequest(BaseModel):
@@ -28,6 +34,9 @@ class ProjectUpdateRequest(BaseModel):
     github_token: Optional[str] = Field(None, description="GitHub personal access token")
     auto_push: bool = Field(True, description="Automatically push changes")
     commit_message: Optional[str] = Field("Update from AI Project Generator", description="Commit message")
+    paths: Optional[List[str]] = Field(None, min_length=1, description="Repository files to regenerate; by default the files the prompt names, or every planned file if it names none")
+    timeout_seconds: Optional[float] = Field(None, gt=0, description="Cancel the job if not finished within this many seconds")
+    priority: Optional[Priority] = Field(None, description="Scheduling class; defaults to the X-Priority header, then interactive")
 
 
 class FileEditRequest(BaseModel):
@@ -35,10 +44,58 @@ class FileEditRequest(BaseModel):
     content: str = Field(..., description="New file content")
 
 
+class FileBatchGetRequest(BaseModel):
+    """Request model for reading several files at once."""
+    paths: List[str] = Field(..., min_length=1, max_length=1000, description="Relative file paths")
+
+
+class FileContentEntry(BaseModel):
+    """Content of one file, or why it could not be read."""
+    path: str
+    content: Optional[str] = None
+    size: Optional[int] = Field(None, description="Size in bytes")
+    error: Optional[str] = Field(None, description="Set instead of content when the file could not be read")
+
+
+class FileBatchGetResponse(BaseModel):
+    """Response model for a bulk file read."""
+    project_name: str
+    files: List[FileContentEntry]
+
+
+class FileChange(BaseModel):
+    """One file operation of an atomic change set."""
+    path: str = Field(..., description="Relative file path")
+    action: Literal["create", "update", "delete"]
+    content: Optional[str] = Field(None, description="Full new content (create, update)")
+    patch: Optional[str] = Field(None, description="Unified diff against the current content (update)")
+
+
+class ProjectChangesRequest(BaseModel):
+    """Request model for applying several file changes atomically."""
+    changes: List[FileChange] = Field(..., min_length=1, max_length=1000)
+
+
+class FileChangeResult(BaseModel):
+    """Outcome of one file operation."""
+    path: str
+    action: str
+    success: bool
+    error: Optional[str] = None
+
+
+class ProjectChangesResponse(BaseModel):
+    """Response model for an atomic change set."""
+    project_name: str
+    applied: bool = Field(..., description="All changes were applied; otherwise none were")
+    results: List[FileChangeResult]
+
+
 class FilePushRequest(BaseModel):
     """Request model for pushing to GitHub."""
     message: str = Field(..., description="Commit message")
     repo_name: Optional[str] = Field(None, description="GitHub repo name")
+    priority: Optional[Priority] = Field(None, description="Scheduling class; defaults to the X-Priority header, then interactive")
 
 
 class FileDefinition(BaseModel):
@@ -84,12 +141,100 @@ class GenerationResponse(BaseModel):
     workspace_path: str
 
 
+class BatchGenerateRequest(BaseModel):
+    """Request model for generating many projects at once."""
+    requests: List[ProjectGenerateRequest] = Field(..., min_length=1, description="Projects to generate")
+
+
+class BatchItemResult(BaseModel):
+    """Result of a single project in a batch generation."""
+    index: int
+    success: bool
+    project_name: Optional[str] = None
+    files_created: int = 0
+    workspace_path: Optional[str] = None
+    repo_url: Optional[str] = None
+    error: Optional[str] = None
+    timings: Dict[str, float] = Field(default_factory=dict)
+
+
+class BatchGenerateResponse(BaseModel):
+    """Response for batch generation endpoint."""
+    total: int
+    succeeded: int
+    failed: int
+    wall_time: float
+    timings: Dict[str, float] = Field(default_factory=dict, description="Summed seconds per stage")
+    results: List[BatchItemResult]
+
+
 class UpdateResponse(BaseModel):
     """Response for project update endpoint."""
     success: bool
     message: str
     files_modified: int
     repo_url: str
+    files_unchanged: int = Field(0, description="Regenerated files identical to the repository, not pushed")
+    changed_files: List[str] = Field(default_factory=list, description="Files that differ from the repository")
+    skipped_files: List[str] = Field(default_factory=list, description="Requested files the plan has no template for, left untouched")
+
+
+class JobSubmitResponse(BaseModel):
+    """Response for endpoints that enqueue background jobs."""
+    job_id: str
+    status: str
+    status_url: str
+    events_url: str
+    coalesced: bool = Field(False, description="Attached to an identical in-flight job")
+
+
+class JobStatusResponse(BaseModel):
+    """Status and result of a background job."""
+    job_id: str
+    kind: str
+    priority: str = "interactive"
+    status: str
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+    attached: int = Field(0, description="Identical requests coalesced into this job")
+    deadline_in: Optional[float] = Field(None, description="Seconds left before an unfinished job is cancelled")
+    result: Optional[Dict[str, Any]] = None
+
+
+class PushStatusResponse(BaseModel):
+    """State of a queued GitHub push."""
+    id: int
+    project_name: str
+    project_path: str
+    repo_name: str
+    description: str = ""
+    job_id: Optional[str] = Field(None, description="Job whose event stream receives push progress")
+    priority: str = "interactive"
+    status: str = Field(..., description="pending, running, failed, cancelled or done")
+    attempts: int
+    max_attempts: int
+    next_attempt_at: float = Field(..., description="Unix time of the next attempt while pending")
+    last_error: Optional[str] = None
+    created_at: str
+    updated_at: str
+
+
+class ProjectFileEntry(BaseModel):
+    """One file of a project listing; metadata is only set when requested."""
+    path: str
+    size: Optional[int] = None
+    mtime: Optional[float] = None
+    sha256: Optional[str] = None
+
+
+class ProjectFilesResponse(BaseModel):
+    """One page of a project's files."""
+    project_name: str
+    files: List[ProjectFileEntry]
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor to get the next page; null on the last page")
+    total: int = Field(..., description="Files in the project, before filters")
 
 
 class MemoryEntry(BaseModel):
@@ -109,7 +254,8 @@ class UserMemory(BaseModel):
     frameworks: List[str] = []
     language_preference: str = "python"
     database_preference: str = "sqlite"
-    last_projects: List[str] = []
+    # Volatile: history that never influences generated output
+    last_projects: List[str] = Field(default_factory=list, json_schema_extra={"volatile": True})
     preferences: Dict[str, str] = Field(default_factory=dict)
 
 
@@ -0,0 +1,162 @@
+"""
+Serialization: Accept-negotiated response encoding and compression.
+Responses are rendered as orjson JSON or MessagePack depending on the
+Accept header and compressed with brotli or gzip when large enough.
+orjson, msgpack and brotli are optional; without them the stdlib JSON
+encoder and gzip are used.
+"""
+
+import json
+import zlib
+from contextvars import ContextVar
+from typing import Any, List, Optional, Tuple
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# Settings applied by configure(); responses smaller than this stay uncompressed
+_settings = {"min_size": 1024, "gzip_level": 1, "brotli_quality": 4}
+
+# (Accept, Accept-Encoding) of the request being handled, set by middleware
+_request_headers: ContextVar[Tuple[str, str]] = ContextVar("request_headers", default=("", ""))
+
+
+def configure(min_size: int = 1024, gzip_level: int = 1, brotli_quality: int = 4):
+    """Set the compression threshold and levels."""
+    _settings.update(min_size=min_size, gzip_level=gzip_level, brotli_quality=brotli_quality)
+
+
+def set_request_headers(accept: str, accept_encoding: str):
+    """
+    Remember the negotiation headers of the current request.
+
+    Returns:
+        Token for reset_request_headers
+    """
+    return _request_headers.set((accept or "", accept_encoding or ""))
+
+
+def reset_request_headers(token):
+    """Forget the headers set by set_request_headers."""
+    _request_headers.reset(token)
+
+
+def _preferences(header: str) -> List[Tuple[str, float]]:
+    """Parse an Accept-style header into (value, q) pairs, best first."""
+    preferences = []
+    for position, part in enumerate(header.split(",")):
+        value, *params = [item.strip() for item in part.split(";")]
+        if not value:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, number = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(number)
+                except ValueError:
+                    q = 0.0
+        preferences.append((value.lower(), q, position))
+    preferences.sort(key=lambda item: (-item[1], item[2]))
+    return [(value, q) for value, q, _ in preferences if q > 0]
+
+
+def choose_media_type(accept: str) -> str:
+    """
+    Pick the response format for an Accept header.
+
+    MessagePack is only chosen when the client asks for it ahead of JSON
+    and msgpack is installed; everything else gets JSON.
+    """
+    if msgpack is None:
+        return JSON_MEDIA_TYPE
+    for value, _ in _preferences(accept):
+        if value in MSGPACK_MEDIA_TYPES:
+            return value
+        if value in (JSON_MEDIA_TYPE, "application/*", "*/*"):
+            return JSON_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick "br", "gzip" or None for an Accept-Encoding header."""
+    available = {"gzip"} | ({"br"} if brotli is not None else set())
+    preferences = _preferences(accept_encoding)
+    # Between equally preferred codings brotli wins: smaller at similar cost
+    preferences.sort(key=lambda item: (-item[1], item[0] != "br"))
+    for value, _ in preferences:
+        if value in available:
+            return value
+        if value == "identity":
+            return None
+        if value == "*":
+            return "br" if "br" in available else "gzip"
+    return None
+
+
+def dumps(content: Any, media_type: str = JSON_MEDIA_TYPE) -> bytes:
+    """Serialize content for a media type from choose_media_type."""
+    if media_type in MSGPACK_MEDIA_TYPES:
+        return msgpack.packb(content, use_bin_type=True)
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body with "br" or "gzip"."""
+    if encoding == "br":
+        return brotli.compress(body, quality=_settings["brotli_quality"])
+    # wbits=31 makes zlib emit a complete gzip stream
+    compressor = zlib.compressobj(_settings["gzip_level"], zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+class NegotiatedResponse(JSONResponse):
+    """JSONResponse rendered in the format and encoding the client accepts."""
+
+    def __init__(self,
+                 content: Any,
+                 status_code: int = 200,
+                 headers: Optional[dict] = None,
+                 media_type: Optional[str] = None,
+                 background=None):
+        accept, accept_encoding = _request_headers.get()
+        self.media_type = media_type or choose_media_type(accept)
+        self.content_encoding = choose_encoding(accept_encoding)
+        super().__init__(content, status_code, headers, self.media_type, background)
+
+        self.headers["Vary"] = "Accept, Accept-Encoding"
+        if self.content_encoding is not None:
+            self.headers["Content-Encoding"] = self.content_encoding
+
+    def render(self, content: Any) -> bytes:
+        body = dumps(content, self.media_type)
+        if self.content_encoding is not None and len(body) >= _settings["min_size"]:
+            return compress(body, self.content_encoding)
+        # Too small to be worth compressing
+        self.content_encoding = None
+        return body
@@ -0,0 +1,192 @@
+"""
+Template Engine: Compiles file templates once into render functions.
+A template is parsed into segments and turned into a single join
+expression, instead of copying the whole template for every replaced
+placeholder on each render.
+
+Syntax:
+    {{name}}                          Variable (missing renders as "")
+    {{#if name}}...{{else}}...{{/if}} Conditional on a truthy value
+    {{#each name}}...{{/each}}        Loop; {{this}} is the item and
+                                      {{@index}} its position
+Tags must name an identifier, so other "{{...}}" text passes through.
+"""
+
+import functools
+import hashlib
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+
+# {{name}}, {{#if name}}, {{#each name}}, {{else}}, {{/if}}, {{/each}}
+TAG_PATTERN = re.compile(r"\{\{\s*(#if\s+|#each\s+|/)?(@?\w+)\s*\}\}")
+
+# Compiled segments: literal text, ("var", name), ("if", name, then, else)
+# or ("each", name, body)
+Segment = Union[str, Tuple]
+
+
+class TemplateSyntaxError(ValueError):
+    """Raised when a template's block tags are not balanced."""
+
+
+class Template:
+    """A template parsed into segments, ready to render repeatedly."""
+
+    def __init__(self, source: str, name: str = "template"):
+        """
+        Compile a template.
+
+        Args:
+            source: Template text
+            name: Label used in error messages
+
+        Raises:
+            TemplateSyntaxError: If a block is unclosed or mismatched
+        """
+        self.source = source
+        self.name = name
+        # Changes whenever the source does, so cached renders of an older
+        # version of a template are never served
+        self.version = hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+        self.segments = self._compile(source)
+        self.variables = tuple(sorted(_variables(self.segments)))
+        self._render = _build_renderer(self.segments, name)
+
+    def render(self, context: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Render the template.
+
+        Args:
+            context: Values for the template's variables
+
+        Returns:
+            Rendered text
+        """
+        return self._render(context or {})
+
+    def __reduce__(self):
+        # The render function can't be pickled; rebuild it from source
+        # (once per process and source) on the receiving side
+        return _unpickle_template, (self.source, self.name)
+
+    def _compile(self, source: str) -> List[Segment]:
+        """Parse source into nested segment lists."""
+        # Stack of (block tag, name, segment list being filled, line)
+        root: List[Segment] = []
+        stack: List[Tuple[str, str, List[Segment], int]] = []
+        current = root
+        position = 0
+
+        for match in TAG_PATTERN.finditer(source):
+            if match.start() > position:
+                _append_text(current, source[position:match.start()])
+            position = match.end()
+
+            kind, name = (match.group(1) or "").strip(), match.group(2)
+            line = source.count("\n", 0, match.start()) + 1
+
+            if kind in ("#if", "#each"):
+                block = kind[1:]
+                stack.append((block, name, current, line))
+                segment = (block, name, []) if block == "each" else (block, name, [], [])
+                current.append(segment)
+                current = segment[2]
+            elif kind == "/":
+                if not stack or stack[-1][0] != name:
+                    raise TemplateSyntaxError(
+                        f"{self.name}:{line}: unexpected {{{{/{name}}}}}"
+                    )
+                current = stack.pop()[2]
+            elif name == "else" and stack and stack[-1][0] == "if":
+                current = stack[-1][2][-1][3]
+            else:
+                current.append(("var", name))
+
+        if position < len(source):
+            _append_text(current, source[position:])
+
+        if stack:
+            block, name, _, line = stack[-1]
+            raise TemplateSyntaxError(
+                f"{self.name}:{line}: {{{{#{block} {name}}}}} is never closed"
+            )
+        return root or [""]
+
+
+def compile_template(source: str, name: str = "template") -> Template:
+    """Compile template source; see Template."""
+    return Template(source, name)
+
+
+@functools.lru_cache(maxsize=256)
+def _unpickle_template(source: str, name: str) -> Template:
+    """Compile a template received from another process, reusing earlier copies."""
+    return Template(source, name)
+
+
+def _append_text(segments: List[Segment], text: str):
+    """Add literal text, merging it with a preceding literal."""
+    if segments and isinstance(segments[-1], str):
+        segments[-1] += text
+    else:
+        segments.append(text)
+
+
+def _variables(segments: List[Segment]) -> set:
+    """Context names a template reads (loop-local names excluded)."""
+    names = set()
+    for segment in segments:
+        if isinstance(segment, str):
+            continue
+        if segment[1] not in ("this", "@index"):
+            names.add(segment[1])
+        for nested in segment[2:]:
+            names |= _variables(nested)
+    return names
+
+
+def _build_renderer(segments: List[Segment], name: str) -> Callable[[Dict[str, Any]], str]:
+    """
+    Turn segments into a Python function returning one join expression:
+    literals become constants, variables dict lookups, {{#if}} a
+    conditional expression and {{#each}} a comprehension.
+    """
+    source = f"def render(context):\n    get = context.get\n    return {_expression(segments, {})}\n"
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, f"<template {name}>", "exec"), namespace)
+    return namespace["render"]
+
+
+def _expression(segments: List[Segment], loop: Dict[str, str]) -> str:
+    """
+    Python expression rendering segments.
+
+    loop maps "this" and "@index" to the variables of the innermost
+    {{#each}}; every other name is looked up in the context.
+    """
+    parts = []
+    for segment in segments:
+        if isinstance(segment, str):
+            parts.append(repr(segment))
+            continue
+
+        kind, name = segment[0], segment[1]
+        value = loop.get(name) or f"get({name!r}, '')"
+        if kind == "var":
+            # f-string formatting passes str through and converts the rest
+            parts.append(f'f"{{{value}}}"')
+        elif kind == "if":
+            then, otherwise = _expression(segment[2], loop), _expression(segment[3], loop)
+            parts.append(f"({then} if {value} else {otherwise})")
+        else:
+            # Each comprehension has its own scope, so nested loops can
+            # reuse the names; the outer item is not addressable anyway
+            body = _expression(segment[2], {"this": "item", "@index": "index"})
+            parts.append(f"''.join([{body} for index, item in enumerate({value} or ())])")
+
+    if not parts:
+        return "''"
+    if len(parts) == 1:
+        return parts[0]
+    return f"''.join(({', '.join(parts)}))"
@@ -0,0 +1,305 @@
+"""
+Template Registry: Planner and generator templates loaded from on-disk
+template packs, layered over the built-in templates.
+
+A pack is a subdirectory of the packs directory:
+
+    <packs dir>/<pack name>/
+        planner.json            {"<framework>": {"files": [
+                                    {"path", "description"}, ...]}}
+        generator/<id>.tmpl     Template source for generator template <id>
+
+The planner reads only each framework's files; the tech stack and entry
+point of a plan are worked out from the prompt and those files, so other
+keys are ignored. Every entry replaces the built-in one of the same name;
+packs are applied in name order, so a later pack overrides an earlier
+one. Each reload publishes a new immutable TemplateSet, so a generation
+that took a set keeps rendering with it while newer sets are published.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from template_engine import Template, compile_template
+
+
+PLANNER_FILE = "planner.json"
+GENERATOR_DIR = "generator"
+TEMPLATE_SUFFIX = ".tmpl"
+
+# (relative path, size, mtime in ns) of every file a pack is read from
+Fingerprint = Tuple[Tuple[str, int, int], ...]
+
+
+class TemplateSet:
+    """An immutable snapshot of the templates in effect."""
+
+    def __init__(self,
+                 version: Optional[str],
+                 generator: Dict[str, Template],
+                 planner: Dict[str, Dict[str, Any]]):
+        """
+        Initialize template set.
+
+        Args:
+            version: Content hash of the packs in the set; None when only
+                the built-in templates are in use
+            generator: Generator template id -> compiled template
+            planner: Framework -> planner project template
+        """
+        self.version = version
+        self.generator = generator
+        self.planner = planner
+
+
+class _Pack:
+    """A loaded pack: its compiled templates plus what it was read from."""
+
+    def __init__(self,
+                 name: str,
+                 fingerprint: Fingerprint,
+                 version: str,
+                 generator: Dict[str, Template],
+                 planner: Dict[str, Dict[str, Any]]):
+        self.name = name
+        self.fingerprint = fingerprint
+        self.version = version
+        self.generator = generator
+        self.planner = planner
+        self.loaded_at = time.time()
+
+
+class TemplateRegistry:
+    """Versioned registry of template packs with polling hot reload."""
+
+    def __init__(self,
+                 packs_dir: str,
+                 generator_templates: Dict[str, Template],
+                 planner_templates: Dict[str, Dict[str, Any]]):
+        """
+        Initialize registry and load the packs found on disk.
+
+        Args:
+            packs_dir: Directory of template packs; may not exist
+            generator_templates: Built-in compiled generator templates
+            planner_templates: Built-in planner project templates
+        """
+        self.packs_dir = Path(packs_dir)
+        self._builtin = TemplateSet(None, generator_templates, planner_templates)
+        self._current = self._builtin
+        self._packs: Dict[str, _Pack] = {}
+        # Pack name -> (fingerprint of the files that failed, error)
+        self._errors: Dict[str, Tuple[Optional[Fingerprint], str]] = {}
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        self.reload()
+
+    def current(self) -> TemplateSet:
+        """
+        Templates in effect now.
+
+        Take one set per generation and pass it to every stage, so a
+        reload mid-way never mixes templates of two versions.
+        """
+        return self._current
+
+    def reload(self) -> Dict[str, Any]:
+        """
+        Reload packs whose files changed since they were last loaded.
+
+        Unchanged packs keep their compiled templates without being read.
+        A pack that fails to load keeps its previous version (or stays
+        absent if it never loaded), so a half-written edit never reaches
+        a generation; the error is reported until the pack loads.
+
+        Returns:
+            Dict with the new version and the loaded, removed and failed packs
+        """
+        with self._reload_lock:
+            packs: Dict[str, _Pack] = {}
+            errors: Dict[str, Tuple[Optional[Fingerprint], str]] = {}
+            loaded: List[str] = []
+
+            for directory in self._pack_dirs():
+                name = directory.name
+                previous = self._packs.get(name)
+                fingerprint = None
+                try:
+                    fingerprint = _fingerprint(directory)
+                    if previous is not None and previous.fingerprint == fingerprint:
+                        packs[name] = previous
+                        continue
+                    failed = self._errors.get(name)
+                    if failed is not None and failed[0] == fingerprint:
+                        # Same broken files as last time; don't retry every poll
+                        raise ValueError(failed[1])
+                    packs[name] = _load_pack(directory, fingerprint)
+                    loaded.append(name)
+                except (OSError, ValueError) as e:
+                    if name not in self._errors or self._errors[name][0] != fingerprint:
+                        print(f"✗ Could not load template pack {name}: {e}")
+                    errors[name] = (fingerprint, str(e))
+                    if previous is not None:
+                        packs[name] = previous
+
+            removed = sorted(set(self._packs) - set(packs))
+            if loaded or removed:
+                self._current = self._build_set(packs)
+                for name in loaded:
+                    print(f"✓ Loaded template pack {name} ({packs[name].version})")
+            self._packs = packs
+            self._errors = errors
+
+            return {
+                "version": self._current.version,
+                "loaded": loaded,
+                "removed": removed,
+                "errors": {name: error for name, (_, error) in errors.items()}
+            }
+
+    def describe(self) -> Dict[str, Any]:
+        """Registry version, packs and errors, for the templates endpoint."""
+        packs = self._packs
+        return {
+            "version": self._current.version,
+            "packs_dir": str(self.packs_dir),
+            "watching": self._watcher is not None,
+            "packs": [
+                {
+                    "name": pack.name,
+                    "version": pack.version,
+                    "loaded_at": pack.loaded_at,
+                    "generator_templates": sorted(pack.generator),
+                    "planner_templates": sorted(pack.planner)
+                }
+                for pack in packs.values()
+            ],
+            "errors": {name: error for name, (_, error) in self._errors.items()}
+        }
+
+    def start_watching(self, interval: float):
+        """
+        Reload changed packs every interval seconds on a daemon thread.
+
+        Polls file sizes and modification times, so no file-watching
+        dependency is needed and it works on any filesystem.
+        """
+        if self._watcher is not None:
+            return
+        self._stop_watching.clear()
+
+        def watch():
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.reload()
+                except Exception as e:
+                    print(f"✗ Template reload failed: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="template-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        """Stop the watcher thread, if running."""
+        if self._watcher is not None:
+            self._stop_watching.set()
+            self._watcher.join()
+            self._watcher = None
+
+    def _pack_dirs(self) -> List[Path]:
+        """Pack directories in the order they are applied."""
+        if not self.packs_dir.is_dir():
+            return []
+        return sorted(
+            (path for path in self.packs_dir.iterdir()
+             if path.is_dir() and not path.name.startswith(".")),
+            key=lambda path: path.name
+        )
+
+    def _build_set(self, packs: Dict[str, _Pack]) -> TemplateSet:
+        """Layer packs, in name order, over the built-in templates."""
+        if not packs:
+            return self._builtin
+
+        generator = dict(self._builtin.generator)
+        planner = dict(self._builtin.planner)
+        digest = hashlib.sha256()
+        for name in sorted(packs):
+            pack = packs[name]
+            generator.update(pack.generator)
+            planner.update(pack.planner)
+            digest.update(f"{name}:{pack.version}\n".encode("utf-8"))
+
+        return TemplateSet(digest.hexdigest()[:16], generator, planner)
+
+
+def _fingerprint(directory: Path) -> Fingerprint:
+    """Size and modification time of each file the pack is read from."""
+    paths = []
+    planner_file = directory / PLANNER_FILE
+    if planner_file.is_file():
+        paths.append(planner_file)
+    generator_dir = directory / GENERATOR_DIR
+    if generator_dir.is_dir():
+        paths.extend(sorted(generator_dir.glob(f"*{TEMPLATE_SUFFIX}")))
+
+    fingerprint = []
+    for path in paths:
+        stat = path.stat()
+        fingerprint.append((path.relative_to(directory).as_posix(), stat.st_size, stat.st_mtime_ns))
+    return tuple(fingerprint)
+
+
+def _load_pack(directory: Path, fingerprint: Fingerprint) -> _Pack:
+    """
+    Read and compile a pack.
+
+    Raises:
+        OSError: If a file can't be read
+        ValueError: If planner.json is malformed or a template doesn't compile
+    """
+    digest = hashlib.sha256()
+    generator: Dict[str, Template] = {}
+    planner: Dict[str, Dict[str, Any]] = {}
+
+    for relative_path, _, _ in fingerprint:
+        data = (directory / relative_path).read_bytes()
+        digest.update(f"{relative_path}\0{len(data)}\0".encode("utf-8"))
+        digest.update(data)
+        text = data.decode("utf-8")
+
+        if relative_path == PLANNER_FILE:
+            try:
+                planner = json.loads(text)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{PLANNER_FILE}: {e}")
+            _validate_planner(planner)
+        else:
+            template_id = relative_path[len(GENERATOR_DIR) + 1:-len(TEMPLATE_SUFFIX)]
+            generator[template_id] = compile_template(text, f"{directory.name}/{template_id}")
+
+    return _Pack(directory.name, fingerprint, digest.hexdigest()[:16], generator, planner)
+
+
+def _validate_planner(planner: Any):
+    """
+    Check planner.json has the shape AgentPlanner expects.
+
+    Raises:
+        ValueError: If it doesn't
+    """
+    if not isinstance(planner, dict):
+        raise ValueError(f"{PLANNER_FILE}: expected an object of project templates")
+    for framework, template in planner.items():
+        files = template.get("files") if isinstance(template, dict) else None
+        if not isinstance(files, list) or not all(
+            isinstance(f, dict) and isinstance(f.get("path"), str)
+            and isinstance(f.get("description"), str)
+            for f in files
+        ):
+            raise ValueError(
+                f"{PLANNER_FILE}: {framework} needs a files list of path/description objects"
+            )
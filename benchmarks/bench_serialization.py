@@ -0,0 +1,120 @@
+"""
+Benchmark: Response serialization cost per endpoint, before and after
+Accept-negotiated encoding.
+
+"before" is FastAPI's default JSONResponse (stdlib json); the other rows
+are what NegotiatedResponse produces for the given Accept/Accept-Encoding.
+Rows for msgpack and brotli only appear when those packages are installed.
+
+Usage:
+    python benchmarks/bench_serialization.py [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from fastapi.responses import JSONResponse
+import serialization
+
+
+SOURCE = (
+    "from fastapi import FastAPI\n\n"
+    "app = FastAPI()\n\n\n"
+    "@app.get('/items/{item_id}')\n"
+    "async def read_item(item_id: int, q: str = None):\n"
+    "    \"\"\"Return one item.\"\"\"\n"
+    "    return {'item_id': item_id, 'q': q}\n"
+) * 40
+
+
+def endpoint_payloads() -> Dict[str, Any]:
+    """Representative bodies of the heaviest JSON endpoints."""
+    return {
+        "files:batchGet (50 files)": {
+            "project_name": "demo",
+            "files": [
+                {"path": f"src/module_{i}.py", "content": SOURCE, "size": len(SOURCE)}
+                for i in range(50)
+            ]
+        },
+        "/project/{name}/files (1000 entries)": {
+            "project_name": "demo",
+            "files": [
+                {"path": f"src/pkg_{i // 50}/module_{i}.py", "size": 4096 + i,
+                 "mtime": 1700000000.0 + i, "sha256": f"{i:064x}"}
+                for i in range(1000)
+            ],
+            "next_cursor": "c3JjL3BrZ18xOS9tb2R1bGVfOTk5LnB5",
+            "total": 25000
+        },
+        "/memory": {
+            "preferred_language": "python",
+            "preferred_framework": "fastapi",
+            "coding_style": "pep8",
+            "last_projects": [
+                {"name": f"project_{i}", "tech_stack": ["Python", "Fastapi"], "files": 12}
+                for i in range(100)
+            ]
+        }
+    }
+
+
+def variants() -> List[Tuple[str, str, str]]:
+    """(label, Accept, Accept-Encoding) rows measured for every payload."""
+    rows = [
+        ("json", "application/json", "identity"),
+        ("json+gzip", "application/json", "gzip")
+    ]
+    if serialization.brotli is not None:
+        rows.append(("json+br", "application/json", "br"))
+    if serialization.msgpack is not None:
+        rows.append(("msgpack", "application/msgpack", "identity"))
+        rows.append(("msgpack+gzip", "application/msgpack", "gzip"))
+    return rows
+
+
+def measure(render: Callable[[], bytes], repeat: int) -> Tuple[float, int]:
+    """Best-of-3 microseconds per render and the rendered size."""
+    body = render()
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            render()
+        best = min(best, (time.perf_counter() - started) / repeat)
+    return best * 1e6, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"orjson={'yes' if serialization.orjson else 'no'} "
+          f"msgpack={'yes' if serialization.msgpack else 'no'} "
+          f"brotli={'yes' if serialization.brotli else 'no'}")
+    print(f"{'endpoint':40} {'variant':14} {'us/op':>10} {'bytes':>10} {'speedup':>8}")
+
+    for endpoint, payload in endpoint_payloads().items():
+        before, size = measure(lambda: JSONResponse(payload).body, args.repeat)
+        print(f"{endpoint:40} {'before':14} {before:10.1f} {size:10d} {'1.00x':>8}")
+
+        for label, accept, accept_encoding in variants():
+            def render():
+                token = serialization.set_request_headers(accept, accept_encoding)
+                try:
+                    return serialization.NegotiatedResponse(payload).body
+                finally:
+                    serialization.reset_request_headers(token)
+
+            elapsed, size = measure(render, args.repeat)
+            print(f"{'':40} {label:14} {elapsed:10.1f} {size:10d} {before / elapsed:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -62,6 +62,8 @@ if 'generation_logs' not in st.session_state:
     st.session_state.generation_logs = []
 if 'current_memory' not in st.session_state:
     st.session_state.current_memory = {}
+if 'file_cache' not in st.session_state:
+    st.session_state.file_cache = {}
 
 
 def check_api_connection():
@@ -87,8 +89,9 @@ def load_memory():
     return {}
 
 
-def generate_project(prompt: str, repo_name: str = None, auto_push: bool = True):
-    """Generate a new project."""
+def generate_project(prompt: str, repo_name: str = None, auto_push: bool = True,
+                     log_placeholder=None):
+    """Generate a new project, streaming progress into log_placeholder."""
     st.session_state.generation_logs = []
     
     try:
@@ -101,10 +104,20 @@ def generate_project(prompt: str, repo_name: str = None, auto_push: bool = True)
         }
         
         st.session_state.generation_logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] Sending request to API...")
-        response = requests.post(f"{API_URL}/generate", json=payload, timeout=60)
+        response = requests.post(f"{API_URL}/generate", json=payload, timeout=10)
         
-        if response.status_code == 200:
-            result = response.json()
+        if response.status_code != 202:
+            error = response.json().get('detail', 'Unknown error')
+            st.session_state.generation_logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] ✗ Error: {error}")
+            return None
+        
+        job_id = response.json()['job_id']
+        st.session_state.generation_logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] Job queued: {job_id}")
+        
+        job = follow_job(job_id, st.session_state.generation_logs, log_placeholder)
+        
+        if job and job['status'] == 'completed':
+            result = job['result']
             st.session_state.generation_logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] ✓ Project generated successfully")
             st.session_state.generation_logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] Files created: {result['files_created']}")
             
@@ -113,7 +126,7 @@ def generate_project(prompt: str, repo_name: str = None, auto_push: bool = True)
             
             return result
         else:
-            error = response.json().get('detail', 'Unknown error')
+            error = job.get('error') if job else 'Timed out waiting for job'
             st.session_state.generation_logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] ✗ Error: {error}")
             return None
     
@@ -122,6 +135,36 @@ def generate_project(prompt: str, repo_name: str = None, auto_push: bool = True)
         return None
 
 
+def follow_job(job_id: str, logs: list, log_placeholder=None, timeout: float = 120):
+    """
+    Follow a background job's server-sent event stream.
+    
+    Each progress event is appended to logs and rendered into
+    log_placeholder as it arrives. Returns the final job status.
+    """
+    try:
+        with requests.get(
+            f"{API_URL}/jobs/{job_id}/events",
+            stream=True,
+            timeout=(5, timeout)
+        ) as response:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data: "):
+                    continue
+                
+                event = json.loads(line[len("data: "):])
+                timestamp = event['timestamp'][11:19]
+                logs.append(f"[{timestamp}] {event['stage']}: {event['message']}")
+                
+                if log_placeholder is not None:
+                    log_placeholder.text("\n".join(logs))
+    except requests.exceptions.RequestException as e:
+        logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] ✗ Progress stream interrupted: {e}")
+    
+    response = requests.get(f"{API_URL}/jobs/{job_id}", timeout=5)
+    return response.json() if response.status_code == 200 else None
+
+
 def get_recent_projects():
     """Get list of recent projects."""
     try:
@@ -133,6 +176,21 @@ def get_recent_projects():
     return []
 
 
+def get_file_content(project: str, file_path: str):
+    """Get file content, revalidating the cached copy by ETag on every rerun."""
+    url = f"{API_URL}/project/{project}/raw/{file_path}"
+    cached = st.session_state.file_cache.get(url)
+    headers = {"If-None-Match": cached[0]} if cached else {}
+    
+    response = requests.get(url, headers=headers, timeout=5)
+    if response.status_code == 304:
+        return cached[1]
+    if response.status_code == 200:
+        st.session_state.file_cache[url] = (response.headers.get("ETag"), response.text)
+        return response.text
+    return None
+
+
 # Main UI
 def main():
     # Header
@@ -181,13 +239,12 @@ def main():
                 st.error("Please enter a project description")
             else:
                 st.info("Generating project... This may take a moment.")
-                result = generate_project(prompt, repo_name, auto_push)
                 
-                # Display logs
+                # Display logs as progress events arrive
                 st.subheader("Generation Log")
-                with st.container():
-                    for log in st.session_state.generation_logs:
-                        st.text(log)
+                log_placeholder = st.empty()
+                result = generate_project(prompt, repo_name, auto_push, log_placeholder)
+                log_placeholder.text("\n".join(st.session_state.generation_logs))
                 
                 # Display result
                 if result:
@@ -225,8 +282,14 @@ def main():
                                     st.write(f"**Path:** {proj_info['path']}")
                                     st.write(f"**Files:** {proj_info['file_count']}")
                                     with st.expander("View Files"):
-                                        for file in proj_info['files'][:20]:
-                                            st.text(file)
+                                        files_response = requests.get(
+                                            f"{API_URL}/project/{project}/files",
+                                            params={"limit": 20, "fields": "size"},
+                                            timeout=5
+                                        )
+                                        files_response.raise_for_status()
+                                        for file in files_response.json()['files']:
+                                            st.text(f"{file['path']} ({file['size']} bytes)")
                             except Exception as e:
                                 st.error(f"Could not load project info: {e}")
         else:
@@ -275,16 +338,10 @@ def main():
                                 st.subheader(f"Editing: {file_to_edit}")
                                 
                                 try:
-                                    # Get file content
-                                    file_content_resp = requests.get(
-                                        f"{API_URL}/project/{selected_project}/file/{file_to_edit}",
-                                        timeout=5
-                                    )
+                                    # Get file content (unchanged files come back as 304)
+                                    current_content = get_file_content(selected_project, file_to_edit)
                                     
-                                    if file_content_resp.status_code == 200:
-                                        file_data = file_content_resp.json()
-                                        current_content = file_data.get('content', '')
-                                        
+                                    if current_content is not None:
                                         # Editor
                                         edited_content = st.text_area(
                                             "File content:",
@@ -363,13 +420,24 @@ def main():
                                 "auto_push": auto_commit,
                                 "commit_message": commit_msg
                             },
-                            timeout=120
+                            timeout=10
                         )
                         
-                        if update_resp.status_code == 200:
-                            result = update_resp.json()
-                            st.success("✓ Project updated successfully!")
-                            st.json(result)
+                        if update_resp.status_code == 202:
+                            update_logs = []
+                            log_placeholder = st.empty()
+                            job = follow_job(
+                                update_resp.json()['job_id'],
+                                update_logs,
+                                log_placeholder
+                            )
+                            
+                            if job and job['status'] == 'completed':
+                                st.success("✓ Project updated successfully!")
+                                st.json(job['result'])
+                            else:
+                                error = job.get('error') if job else 'Unknown error'
+                                st.error(f"Update failed: {error}")
                         else:
                             error = update_resp.json()
                             st.error(f"Update failed: {error.get('detail', 'Unknown error')}")
@@ -406,7 +474,8 @@ def main():
                     
                     if push_resp.status_code == 200:
                         result = push_resp.json()
-                        st.success(f"✓ Pushed to GitHub: {result.get('repo_url')}")
+                        st.success(f"✓ Push queued: {result.get('repo_url')}")
+                        st.caption(f"Track progress at {API_URL}{result.get('status_url')}")
                     else:
                         st.error(f"Error: {push_resp.json()}")
                 except Exception as e:
@@ -486,11 +555,21 @@ def main():
         
         st.subheader("API Endpoints")
         st.markdown("""
-        - `POST /generate` - Generate new project
-        - `POST /update` - Update existing project
+        - `POST /plan` - Preview the project plan for a prompt (no files written)
+        - `POST /generate` - Queue new project generation
+        - `GET /jobs/{id}` - Get generation job status and result
+        - `GET /jobs/{id}/events` - Stream live job progress (SSE)
+        - `POST /jobs/{id}/cancel` - Cancel a queued or running job
+        - `POST /update` - Queue update of existing project
+        - `GET /pushes` - List queued GitHub pushes and their status
         - `GET /memory` - Get user preferences
         - `GET /projects` - List recent projects
         - `GET /project/{name}` - Get project info
+        - `GET /project/{name}/files?cursor=&limit=&prefix=&glob=&fields=` - Paginated file listing
+        - `POST /project/{name}/files:batchGet` - Read many files at once (JSON or NDJSON)
+        - `POST /project/{name}/changes` - Atomic multi-file create/update/delete (content or diff)
+        - `GET /project/{name}/archive?format=zip|tar.gz` - Download whole project
+        - `GET /project/{name}/raw/{path}` - Raw file bytes (ETag, Range)
         - `POST /preference` - Update preference
         
         API Documentation available at: http://localhost:8000/api/docs
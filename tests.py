@@ -11,6 +11,70 @@ from backend.agent_generator import AgentGenerator
 from backend.agent_reviewer import AgentReviewer
 from backend.memory_manager import MemoryManager
 from backend.file_writer import FileWriter
+from backend.job_manager import JobManager, QueueFullError
+from backend.admission import RateLimiter
+from backend.pipeline import build_project
+from backend.result_cache import ResultCache
+from backend.metrics import MetricsRegistry
+from backend.push_queue import PushQueue
+from backend.cancellation import CancelToken, JobCancelledError
+from backend.archive import iter_zip, iter_tar_gz
+from backend.http_utils import ETagCache, RangeNotSatisfiableError, etag_matches, parse_range
+from backend.project_index import ProjectIndex
+from backend.lru_cache import LRUCache
+from backend import serialization
+from backend.lazy import Lazy, initialize, is_initialized
+from backend.template_engine import TemplateSyntaxError, compile_template
+
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory):
+    """
+    The API module with its app started and warmed up, working in an empty
+    directory and without rate limits; yields (main module, TestClient).
+    """
+    import os
+    import time
+    from fastapi.testclient import TestClient
+    from backend import main
+    
+    cwd = os.getcwd()
+    rate_limiter = main.rate_limiter
+    os.chdir(tmp_path_factory.mktemp("api"))
+    main.rate_limiter = RateLimiter(0, 0)
+    try:
+        with TestClient(main.app) as client:
+            deadline = time.monotonic() + 60
+            while client.get("/ready").status_code != 200:
+                assert time.monotonic() < deadline, "warm-up did not finish"
+                time.sleep(0.05)
+            yield main, client
+    finally:
+        main.rate_limiter = rate_limiter
+        os.chdir(cwd)
+
+
+def wait_for_job(client, job_id: str, timeout: float = 30) -> dict:
+    """Poll /jobs/{id} until the job has finished."""
+    import time
+    
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed", "cancelled"):
+            return job
+        assert time.monotonic() < deadline, f"job {job_id} still {job['status']}"
+        time.sleep(0.02)
+
+
+def make_project(main, project_name: str, files: dict):
+    """Write a project into the API's workspace."""
+    from backend.schemas import GeneratedFile
+    
+    main.file_writer.create_project_structure(project_name, {})
+    main.file_writer.write_files(project_name, [
+        GeneratedFile(path=path, content=content) for path, content in files.items()
+    ])
 
 
 class TestAgentPlanner:
@@ -57,6 +121,150 @@ class TestCodeGenerator:
         main_file = next((f for f in files if "main" in f.path), None)
         assert main_file
         assert "FastAPI" in main_file.content or "fastapi" in main_file.content
+    
+    def test_compiled_templates_match_str_replace(self):
+        """Test that compiled templates render what placeholder replacement did."""
+        from backend.schemas import ProjectPlan
+        
+        generator = AgentGenerator()
+        plan = ProjectPlan(
+            project_name="shop_api",
+            description="Online shop",
+            tech_stack=["Python", "FastAPI", "PyTorch", "Pandas"],
+            files=[],
+            structure={},
+            entry_point="main.py"
+        )
+        
+        main = AgentGenerator.TEMPLATES["fastapi_main"]
+        expected_main = main.replace("{{project_name}}", "shop_api").replace("{{description}}", "Online shop")
+        assert generator._generate_main_file(plan, {}) == expected_main
+        
+        requirements = generator._generate_requirements(plan)
+        assert requirements.startswith("# shop_api Requirements\n# Python 3.11\n")
+        assert requirements.endswith(
+            "mypy==1.7.1\n\ntorch==2.1.1\ntorchvision==0.16.1\n\npandas==2.1.1\nnumpy==1.26.2\n"
+        )
+        assert "## Tech Stack\n\n- Python\n- FastAPI\n- PyTorch\n- Pandas\n\n## Project" in generator._generate_readme(plan)
+
+
+class TestTemplateEngine:
+    """Test the precompiled template engine."""
+    
+    def test_variables_conditionals_and_loops(self):
+        """Test rendering of every tag kind."""
+        template = compile_template(
+            "{{name}}:{{#if flag}}on{{else}}off{{/if}}"
+            "{{#each items}}[{{@index}}={{this}}{{#if flag}}!{{/if}}]{{/each}}{{missing}}"
+            "{'keep': '{{ not a tag }}'}"
+        )
+        
+        assert template.render({"name": "x", "flag": True, "items": ["a", 2]}) == \
+            "x:on[0=a!][1=2!]{'keep': '{{ not a tag }}'}"
+        assert template.render({"name": "y"}) == "y:off{'keep': '{{ not a tag }}'}"
+        assert compile_template("static").render() == "static"
+    
+    def test_unbalanced_blocks_raise(self):
+        """Test that block tag mistakes are reported with a line number."""
+        with pytest.raises(TemplateSyntaxError, match="t:2"):
+            compile_template("a\n{{#if x}}b", "t")
+        with pytest.raises(TemplateSyntaxError):
+            compile_template("{{#each x}}{{/if}}")
+
+
+    def test_render_cache_shares_files_across_projects(self):
+        """Test that files independent of the project are rendered once."""
+        from backend.schemas import FileDefinition
+        
+        planner = AgentPlanner()
+        generator = AgentGenerator()
+        contents = []
+        for name in ("shop_api", "blog_api"):
+            plan = planner.plan("Create a FastAPI app", {}, name)
+            plan.files = [
+                FileDefinition(path=".gitignore", description="", file_type="gitignore"),
+                FileDefinition(path="main.py", description="", file_type="py")
+            ]
+            contents.append([f.content for f in generator.generate_files(plan, {})])
+        
+        assert contents[0][0] is contents[1][0]
+        assert contents[0][1] != contents[1][1]
+        stats = generator.render_cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 3)
+    
+    def test_parallel_generation_matches_serial(self):
+        """Test that pooled generation keeps plan order and content."""
+        plan = AgentPlanner().plan("Create a FastAPI api with a database and settings", {})
+        serial = AgentGenerator().generate_files(plan, {})
+        
+        for use_processes in (False, True):
+            generator = AgentGenerator(workers=3, use_processes=use_processes)
+            events = []
+            try:
+                parallel = generator.generate_files(
+                    plan, {}, lambda stage, message, **data: events.append(data["path"])
+                )
+            finally:
+                generator.shutdown()
+            
+            assert parallel == serial
+            assert events == [f.path for f in plan.files]
+
+
+class TestTemplateRegistry:
+    """Test on-disk template packs."""
+    
+    def _registry(self, packs_dir):
+        from backend.template_registry import TemplateRegistry
+        return TemplateRegistry(packs_dir, AgentGenerator.COMPILED_TEMPLATES, AgentPlanner.TEMPLATES)
+    
+    def test_packs_override_builtins_and_reload(self, tmp_path):
+        """Test that packs are layered in, reloaded on change and pickle."""
+        import pickle
+        
+        assert self._registry(tmp_path / "missing").current().version is None
+        
+        pack = tmp_path / "custom"
+        (pack / "generator").mkdir(parents=True)
+        (pack / "generator" / "gitignore.tmpl").write_text("*.log\n")
+        (pack / "planner.json").write_text(json.dumps({"fastapi": {"files": [
+            {"path": ".gitignore", "description": "Ignored files"}
+        ]}}))
+        registry = self._registry(tmp_path)
+        first = registry.current()
+        
+        plan, files, _ = build_project("Create a FastAPI app", {}, templates=first)
+        assert [(f.path, f.content) for f in files] == [(".gitignore", "*.log\n")]
+        assert pickle.loads(pickle.dumps(first)).generator["gitignore"].render() == "*.log\n"
+        
+        assert registry.reload()["loaded"] == []
+        assert registry.current() is first
+        
+        (pack / "generator" / "gitignore.tmpl").write_text("*.log\n*.tmp\n")
+        assert registry.reload()["loaded"] == ["custom"]
+        assert registry.current().version not in (None, first.version)
+        assert registry.current().generator["gitignore"].render() == "*.log\n*.tmp\n"
+        # A generation holding the previous set is unaffected
+        assert first.generator["gitignore"].render() == "*.log\n"
+    
+    def test_broken_pack_keeps_previous_version(self, tmp_path):
+        """Test that a pack that fails to load is reported and not applied."""
+        template = tmp_path / "custom" / "generator" / "env.tmpl"
+        template.parent.mkdir(parents=True)
+        template.write_text("DEBUG=1\n")
+        registry = self._registry(tmp_path)
+        loaded = registry.current()
+        
+        template.write_text("{{#if debug}}DEBUG=1\n")
+        result = registry.reload()
+        assert "never closed" in result["errors"]["custom"]
+        assert registry.current() is loaded
+        assert registry.describe()["errors"] == result["errors"]
+        
+        template.unlink()
+        template.parent.rmdir()
+        (tmp_path / "custom").rmdir()
+        assert registry.reload() == {"version": None, "loaded": [], "removed": ["custom"], "errors": {}}
 
 
 class TestCodeReviewer:
@@ -82,6 +290,20 @@ def another_func(a,b,c):
         assert reviewed.reviewed
         assert reviewed.review_notes
         assert len(reviewed.content) >= len(bad_code)  # Should add improvements
+    
+    def test_review_cache_reuses_results(self):
+        """Test that identical files are reviewed once with the same outcome."""
+        from backend.schemas import GeneratedFile
+        
+        reviewer = AgentReviewer()
+        code = "def add(a, b):\n    return a + b  \n"
+        first = reviewer.review_file(GeneratedFile(path="a/util.py", content=code))
+        second = reviewer.review_file(GeneratedFile(path="b/util.py", content=code))
+        other_type = reviewer.review_file(GeneratedFile(path="util.txt", content=code))
+        
+        assert (second.content, second.review_notes) == (first.content, first.review_notes)
+        assert other_type.content == code
+        assert reviewer.review_cache.stats()["hits"] == 1
 
 
 class TestMemoryManager:
@@ -145,6 +367,1357 @@ class TestFileWriter:
         results = writer.write_files("test_project", files)
         assert results["main.py"]
         assert results["config.py"]
+    
+    def test_iter_files(self, tmp_path):
+        """Test bulk reads keep request order and report bad paths per file."""
+        writer = FileWriter(str(tmp_path))
+        writer.write_single_file("test_project", "src/app.py", "x = 1")
+        (tmp_path / "test_project" / "logo.bin").write_bytes(b"\xff\xfe")
+        
+        results = list(writer.iter_files(
+            "test_project", ["src/app.py", "missing.py", "../secret", "logo.bin"]
+        ))
+        assert results[0] == {"path": "src/app.py", "content": "x = 1", "size": 5}
+        assert [r.get("error") for r in results[1:]] == ["not found", "invalid path", "not UTF-8 text"]
+    
+    def test_apply_changes(self, tmp_path):
+        """Test that a change set applies fully, with patches, or not at all."""
+        from backend.schemas import FileChange
+        
+        writer = FileWriter(str(tmp_path))
+        writer.write_single_file("test_project", "main.py", "a = 1\nb = 2\n")
+        writer.write_single_file("test_project", "old.py", "x")
+        project = tmp_path / "test_project"
+        
+        applied, results = writer.apply_changes("test_project", [
+            FileChange(path="main.py", action="update", patch="@@ -2 +2 @@\n-b = 2\n+b = 3\n"),
+            FileChange(path="pkg/new.py", action="create", content="c = 4\n"),
+            FileChange(path="old.py", action="delete")
+        ])
+        assert applied and all(r["success"] for r in results)
+        assert (project / "main.py").read_text() == "a = 1\nb = 3\n"
+        assert (project / "pkg" / "new.py").read_text() == "c = 4\n"
+        assert not (project / "old.py").exists()
+        
+        applied, results = writer.apply_changes("test_project", [
+            FileChange(path="main.py", action="update", content="changed"),
+            FileChange(path="missing.py", action="update", content="x")
+        ])
+        assert not applied
+        assert results[1]["error"] == "not found"
+        assert (project / "main.py").read_text() == "a = 1\nb = 3\n"
+    
+    def test_apply_changes_rolls_back(self, tmp_path, monkeypatch):
+        """Test that a failed rename restores files already replaced."""
+        from backend.schemas import FileChange
+        import backend.file_writer as file_writer_module
+        
+        writer = FileWriter(str(tmp_path))
+        writer.write_single_file("test_project", "a.py", "old a")
+        writer.write_single_file("test_project", "b.py", "old b")
+        
+        real_replace = file_writer_module.os.replace
+        def failing_replace(src, dst):
+            if str(dst).endswith("b.py"):
+                raise OSError("disk full")
+            real_replace(src, dst)
+        monkeypatch.setattr(file_writer_module.os, "replace", failing_replace)
+        
+        applied, results = writer.apply_changes("test_project", [
+            FileChange(path="a.py", action="update", content="new a"),
+            FileChange(path="sub/c.py", action="create", content="c"),
+            FileChange(path="b.py", action="update", content="new b")
+        ])
+        assert not applied
+        assert (tmp_path / "test_project" / "a.py").read_text() == "old a"
+        assert sorted(p.name for p in (tmp_path / "test_project").iterdir()) == ["a.py", "b.py"]
+
+
+class TestPatching:
+    """Test applying unified diffs."""
+    
+    def test_only_line_feeds_split_lines(self):
+        """Test that form feeds and Unicode line separators are line content."""
+        from backend.patching import apply_unified_diff
+        
+        original = "a\x0cb\nc = 1\r\nd\u2028e\x85\n"
+        patch = "@@ -1,3 +1,3 @@\n a\x0cb\n-c = 1\r\n+c = 2\r\n-d\u2028e\x85\n+d\u2028f\n"
+        assert apply_unified_diff(original, patch) == "a\x0cb\nc = 2\r\nd\u2028f\n"
+        
+        no_newline = "@@ -2 +2 @@\n-b\n\\ No newline at end of file\n+c\n\\ No newline at end of file\n"
+        assert apply_unified_diff("a\nb", no_newline) == "a\nc"
+    
+    def test_hunk_must_match_its_header_counts(self):
+        """Test that truncated or overlong hunks are rejected instead of applied."""
+        from backend.patching import PatchError, apply_unified_diff
+        
+        original = "a\nb\nc\n"
+        assert apply_unified_diff(original, "@@ -1,3 +1,3 @@\n a\n-b\n+B\n c\n") == "a\nB\nc\n"
+        with pytest.raises(PatchError, match="header says 3 and 3"):
+            apply_unified_diff(original, "@@ -1,3 +1,3 @@\n a\n-b\n+B\n")
+        with pytest.raises(PatchError, match="header says 2 and 2"):
+            apply_unified_diff(original, "@@ -1,2 +1,2 @@\n-a\n+A\n@@ -3 +3 @@\n-c\n+C\n")
+        with pytest.raises(PatchError, match="more lines"):
+            apply_unified_diff(original, "@@ -2 +2 @@\n-b\n+B\n c\n")
+
+
+class TestJobManager:
+    """Test background job engine."""
+    
+    def test_job_completes_with_result(self):
+        """Test that a submitted job runs and stores its result."""
+        manager = JobManager(max_workers=2)
+        job = manager.submit("test", lambda job, x: x * 2, 21)
+        manager.shutdown(wait=True)
+        
+        assert job.status == "completed"
+        assert job.result == 42
+        assert manager.get(job.job_id) is job
+    
+    def test_job_failure_is_recorded(self, caplog):
+        """Test that exceptions mark the job as failed and are logged with a traceback."""
+        def fail(job):
+            raise ValueError("boom")
+        
+        manager = JobManager(max_workers=1)
+        job = manager.submit("test", fail)
+        manager.shutdown(wait=True)
+        
+        assert job.status == "failed"
+        assert "boom" in job.error
+        failures = [record for record in caplog.records if record.levelname == "ERROR"]
+        assert len(failures) == 1 and failures[0].exc_info[0] is ValueError
+    
+    def test_job_progress_events(self):
+        """Test that progress events are recorded in order."""
+        def work(job):
+            job.emit("plan", "planned", files=3)
+            return "done"
+        
+        manager = JobManager(max_workers=1)
+        job = manager.submit("test", work)
+        manager.shutdown(wait=True)
+        
+        stages = [event["stage"] for event in job.events]
+        assert stages == ["queued", "running", "plan", "completed"]
+        assert job.events[2]["data"]["files"] == 3
+        assert job.stream_closed
+
+
+    def test_identical_jobs_are_coalesced(self):
+        """Test that in-flight duplicates attach to the running job."""
+        import threading
+        release = threading.Event()
+        calls = []
+        
+        def work(job):
+            calls.append(1)
+            release.wait(5)
+            return "shared"
+        
+        manager = JobManager(max_workers=2)
+        first, attached1 = manager.submit_deduplicated("k", "test", work)
+        second, attached2 = manager.submit_deduplicated("k", "test", work)
+        release.set()
+        manager.shutdown(wait=True)
+        
+        assert not attached1 and attached2
+        assert first is second
+        assert first.result == "shared"
+        assert len(calls) == 1
+
+
+    def test_full_queue_rejects_new_jobs(self):
+        """Test that submissions beyond workers + queue are rejected."""
+        import threading
+        release = threading.Event()
+        
+        manager = JobManager(max_workers=1, max_queue=1)
+        manager.submit("test", lambda job: release.wait(5))
+        manager.submit("test", lambda job: release.wait(5))
+        
+        with pytest.raises(QueueFullError) as exc_info:
+            manager.submit("test", lambda job: None)
+        assert exc_info.value.retry_after >= 1
+        
+        release.set()
+        manager.shutdown(wait=True)
+
+
+class TestPriorityScheduling:
+    """Test interactive/bulk job scheduling."""
+    
+    def test_bulk_jobs_leave_reserved_workers_free(self):
+        """Test that interactive jobs run while a bulk backlog waits."""
+        import threading
+        release = threading.Event()
+        interactive_ran = threading.Event()
+        
+        manager = JobManager(max_workers=2, reserved_workers=1)
+        bulk = [manager.submit("bulk", lambda job: release.wait(5), priority="bulk") for _ in range(3)]
+        interactive = manager.submit("ui", lambda job: interactive_ran.set())
+        
+        assert interactive_ran.wait(5)
+        stats = manager.class_stats()
+        assert stats["bulk"]["running"] == 1
+        assert stats["bulk"]["queued"] == 2
+        
+        release.set()
+        manager.shutdown(wait=True)
+        assert interactive.status == "completed"
+        assert all(job.status == "completed" for job in bulk)
+    
+    def test_interactive_jobs_are_dequeued_first(self):
+        """Test that queued interactive jobs overtake queued bulk jobs."""
+        import threading
+        release = threading.Event()
+        order = []
+        
+        manager = JobManager(max_workers=1)
+        manager.submit("block", lambda job: release.wait(5))
+        manager.submit("bulk", lambda job: order.append("bulk"), priority="bulk")
+        manager.submit("ui", lambda job: order.append("interactive"))
+        release.set()
+        manager.shutdown(wait=True)
+        
+        assert order == ["interactive", "bulk"]
+
+
+class TestCancellation:
+    """Test job cancellation and deadlines."""
+    
+    def test_running_job_stops_at_next_check_point(self):
+        """Test that a cancelled job stops between files."""
+        import threading
+        import time
+        started = threading.Event()
+        processed = []
+        
+        def work(job):
+            for i in range(100):
+                job.cancel_token.check()
+                processed.append(i)
+                started.set()
+                time.sleep(0.01)
+        
+        manager = JobManager(max_workers=1)
+        job = manager.submit("test", work)
+        started.wait(5)
+        manager.cancel(job.job_id)
+        manager.shutdown(wait=True)
+        
+        assert job.status == "cancelled"
+        assert job.events[-1]["stage"] == "cancelled"
+        assert len(processed) < 100
+    
+    def test_deadline_cancels_pipeline(self):
+        """Test that an expired deadline stops generate_files."""
+        import time
+        token = CancelToken(timeout=0.001)
+        time.sleep(0.01)
+        
+        with pytest.raises(JobCancelledError, match="deadline"):
+            build_project("Create a FastAPI app", {}, cancel_token=token)
+        assert token.remaining() == 0.0
+
+
+class TestAdmission:
+    """Test per-client rate limiting."""
+    
+    def test_token_bucket_limits_each_client(self):
+        """Test that a client is limited after its burst is used."""
+        limiter = RateLimiter(rate=0.5, burst=2)
+        
+        assert limiter.check("a")[0]
+        assert limiter.check("a")[0]
+        allowed, retry_after = limiter.check("a")
+        
+        assert not allowed
+        assert retry_after >= 1
+        assert limiter.check("b")[0]
+
+
+class TestPipeline:
+    """Test side-effect free pipeline stages."""
+    
+    def test_build_project_reports_stage_timings(self):
+        """Test that build_project plans, generates and reviews files."""
+        plan, files, timings = build_project("Create a FastAPI app", {})
+        
+        assert plan.project_name
+        assert len(files) == len(plan.files)
+        assert all(f.reviewed for f in files)
+        assert set(timings) == {"plan", "generate", "review"}
+    
+    def test_build_project_only_paths(self):
+        """Test that an update regenerates only the requested planned files."""
+        plan, _, _ = build_project("Create a FastAPI app", {})
+        kept = plan.files[0].path
+        
+        _, files, _ = build_project("Create a FastAPI app", {}, only_paths=[kept, "docs/NOTES.md"])
+        
+        # No placeholder is generated for a path the plan doesn't contain
+        assert [f.path for f in files] == [kept]
+        assert all(f.reviewed for f in files)
+    
+    def test_stream_project_matches_build_project(self, tmp_path):
+        """Test that streamed files equal the collected ones and can be written as they arrive."""
+        from backend.pipeline import stream_project
+        
+        _, expected, _ = build_project("Create a FastAPI app", {})
+        plan, stream, timings = stream_project("Create a FastAPI app", {}, queue_size=1)
+        
+        writer = FileWriter(str(tmp_path))
+        results = writer.write_files(plan.project_name, stream)
+        
+        assert list(results) == [f.path for f in expected]
+        assert all(results.values())
+        assert (tmp_path / plan.project_name / expected[0].path).read_text() == expected[0].content
+        assert timings["generate"] > 0 and timings["review"] > 0
+    
+    def test_stream_project_stops_on_cancel_and_close(self):
+        """Test that cancellation reaches the consumer and closing stops the stage threads."""
+        import threading
+        import time
+        from backend.pipeline import stream_project
+        from backend.template_registry import TemplateSet
+        
+        token = CancelToken()
+        files = [{"path": f"pkg/module_{i}.py", "description": "Module"} for i in range(50)]
+        templates = TemplateSet(None, AgentGenerator.COMPILED_TEMPLATES, {"fastapi": {"files": files}})
+        _, stream, _ = stream_project("Create a FastAPI app", {}, cancel_token=token,
+                                     queue_size=1, templates=templates)
+        next(stream)
+        token.cancel()
+        with pytest.raises(JobCancelledError):
+            list(stream)
+        
+        _, stream, _ = stream_project("Create a FastAPI app", {}, queue_size=1)
+        next(stream)
+        stream.close()
+        deadline = time.time() + 2
+        while any(t.name.startswith("pipeline-") for t in threading.enumerate()) and time.time() < deadline:
+            time.sleep(0.01)
+        assert not any(t.name.startswith("pipeline-") for t in threading.enumerate())
+    
+    def test_warm_up_has_no_side_effects(self, tmp_path, monkeypatch):
+        """Test that the startup warm-up runs without touching disk."""
+        from backend.pipeline import warm_up
+        
+        monkeypatch.chdir(tmp_path)
+        assert warm_up() > 0
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestResultCache:
+    """Test persistent pipeline result cache."""
+    
+    def test_cache_roundtrip_and_counters(self, tmp_path):
+        """Test that stored results are returned and counted as hits."""
+        cache = ResultCache(str(tmp_path))
+        plan, files, _ = build_project("Create a FastAPI app", {})
+        key = ResultCache.make_key("Create a FastAPI app", None, {})
+        
+        assert cache.get(key) is None
+        cache.put(key, plan, files)
+        cached_plan, cached_files = cache.get(key)
+        
+        assert cached_plan == plan
+        assert [f.content for f in cached_files] == [f.content for f in files]
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+    
+    def test_cache_evicts_least_recently_used(self, tmp_path):
+        """Test LRU eviction and persistence across instances."""
+        cache = ResultCache(str(tmp_path), max_entries=2)
+        plan, files, _ = build_project("Create a FastAPI app", {})
+        
+        cache.put("a", plan, files)
+        cache.put("b", plan, files)
+        cache.get("a")
+        cache.put("c", plan, files)
+        
+        reopened = ResultCache(str(tmp_path), max_entries=2)
+        assert reopened.get("b") is None
+        assert reopened.get("a") is not None
+        assert reopened.invalidate() == 2
+    
+    def test_key_ignores_project_history(self):
+        """Test that project history does not change the cache key."""
+        key1 = ResultCache.make_key("app", None, {"last_projects": ["x"]})
+        key2 = ResultCache.make_key("app", None, {"last_projects": ["y"]})
+        assert key1 == key2
+        assert ResultCache.VOLATILE_MEMORY_FIELDS == ("last_projects",)
+    
+    def test_key_normalizes_prompt_whitespace(self):
+        """Test that prompts differing only in whitespace share keys."""
+        from backend.main import _dedupe_key
+        from backend.schemas import ProjectGenerateRequest
+        
+        assert ResultCache.make_key(" todo\n  app ", None, {}) == ResultCache.make_key("todo app", None, {})
+        assert _dedupe_key("generate", ProjectGenerateRequest(prompt="todo\tapp")) == \
+            _dedupe_key("generate", ProjectGenerateRequest(prompt="todo app "))
+        assert _dedupe_key("generate", ProjectGenerateRequest(prompt="todo app")) != \
+            _dedupe_key("generate", ProjectGenerateRequest(prompt="todo apps"))
+    
+    def test_key_includes_only_paths(self):
+        """Test that partial regenerations are cached separately."""
+        full = ResultCache.make_key("app", None, {})
+        assert ResultCache.make_key("app", None, {}, None) == full
+        assert ResultCache.make_key("app", None, {}, ["main.py"]) != full
+    
+    def test_key_includes_template_version(self):
+        """Test that results of other template packs are not reused."""
+        builtin = ResultCache.make_key("app", None, {})
+        assert ResultCache.make_key("app", None, {}, templates_version=None) == builtin
+        assert ResultCache.make_key("app", None, {}, templates_version="abc") != builtin
+
+
+class TestGitHubManager:
+    """Test GitHub helpers that need no network."""
+    
+    def test_git_blob_sha_matches_git(self):
+        """Test that blob SHAs match `git hash-object`."""
+        from backend.github_manager import GitHubManager
+        
+        assert GitHubManager.git_blob_sha(b"hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+        assert GitHubManager.git_blob_sha(b"") == "e69de29bb2d1d6434b8b29ae775ad8c2e48c5391"
+    
+    def test_truncated_tree_is_read_per_directory(self, monkeypatch):
+        """Test that files missing from a truncated tree still get their SHAs."""
+        from backend.github_manager import GitHubManager
+        
+        responses = {
+            "/repos/me/repo/git/trees/main?recursive=1": {
+                "truncated": True,
+                "tree": [{"path": "README.md", "type": "blob", "sha": "r"}]
+            },
+            "/repos/me/repo/git/trees/main": {"tree": [
+                {"path": "README.md", "type": "blob", "sha": "r"},
+                {"path": "src", "type": "tree", "sha": "t1"}
+            ]},
+            "/repos/me/repo/git/trees/t1": {"tree": [
+                {"path": "app.py", "type": "blob", "sha": "a"},
+                {"path": "lib", "type": "tree", "sha": "t2"}
+            ]},
+            "/repos/me/repo/git/trees/t2": {"tree": [
+                {"path": "util.py", "type": "blob", "sha": "u"}
+            ]}
+        }
+        github = GitHubManager("token", "me")
+        monkeypatch.setattr(github, "_request", lambda method, endpoint, data=None: responses[endpoint])
+        
+        assert github.get_tree("repo") == {
+            "README.md": "r", "src/app.py": "a", "src/lib/util.py": "u"
+        }
+        
+        responses["/repos/me/repo/git/trees/t2"]["truncated"] = True
+        with pytest.raises(Exception, match="src/lib/"):
+            github.get_tree("repo")
+
+
+class TestLRUCache:
+    """Test the in-memory LRU cache."""
+    
+    def test_eviction_order(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+
+class TestSerialization:
+    """Test negotiated response encoding."""
+    
+    def test_negotiation(self):
+        """Test format and coding choices honour q-values and availability."""
+        assert serialization.choose_encoding("gzip;q=0.5, identity") is None
+        assert serialization.choose_encoding("deflate, gzip;q=0.8") == "gzip"
+        assert serialization.choose_encoding("") is None
+        assert serialization.choose_media_type("*/*") == "application/json"
+    
+    def test_compresses_above_threshold(self):
+        """Test that large bodies are gzipped and small ones are not."""
+        import gzip
+        
+        token = serialization.set_request_headers("application/json", "gzip")
+        try:
+            large = serialization.NegotiatedResponse({"content": "x" * 5000})
+            small = serialization.NegotiatedResponse({"ok": True})
+        finally:
+            serialization.reset_request_headers(token)
+        
+        assert large.headers["content-encoding"] == "gzip"
+        assert json.loads(gzip.decompress(large.body)) == {"content": "x" * 5000}
+        assert "content-encoding" not in small.headers
+        assert json.loads(small.body) == {"ok": True}
+
+
+class TestColdStart:
+    """Test lazy construction and import cost."""
+    
+    # Seconds allowed for importing the API module; dominated by FastAPI itself
+    IMPORT_BUDGET_SECONDS = 2.5
+    
+    def test_lazy_builds_once(self):
+        """Test that a Lazy proxy builds on first use and then delegates."""
+        built = []
+        proxy = Lazy(lambda: built.append(1) or LRUCache(4), "cache")
+        assert not is_initialized(proxy) and built == []
+        
+        proxy.put("a", 1)
+        assert proxy.get("a") == 1
+        assert initialize(proxy) is initialize(proxy)
+        assert built == [1]
+    
+    def test_import_is_cheap_and_side_effect_free(self, tmp_path):
+        """Test that importing main stays in budget and writes nothing."""
+        import os
+        import subprocess
+        import sys
+        
+        code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=tmp_path,
+            env={**os.environ, "PYTHONPATH": str(Path(__file__).parent / "backend")},
+            capture_output=True,
+            text=True,
+            timeout=60
+        )
+        
+        assert result.returncode == 0, result.stderr
+        assert float(result.stdout.split()[-1]) < self.IMPORT_BUDGET_SECONDS
+        assert list(tmp_path.iterdir()) == []
+    
+    @staticmethod
+    def run_fresh(tmp_path, code: str) -> dict:
+        """Run code in a new interpreter in tmp_path; returns the JSON it prints last."""
+        import os
+        import subprocess
+        import sys
+        
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=tmp_path,
+            env={**os.environ, "PYTHONPATH": str(Path(__file__).parent / "backend")},
+            capture_output=True,
+            text=True,
+            timeout=90
+        )
+        assert result.returncode == 0, result.stderr
+        return json.loads(result.stdout.splitlines()[-1])
+    
+    def test_ready_only_after_warm_up(self, tmp_path):
+        """Test that /ready is 503 until the warm-up finishes and nothing is built at import."""
+        import textwrap
+        
+        code = textwrap.dedent("""
+            import json, threading, time
+            import main
+            from fastapi.testclient import TestClient
+            from lazy import is_initialized
+            
+            built_at_import = [is_initialized(proxy) for proxy in main._lazy_components()]
+            release = threading.Event()
+            main.Config.WARM_UP_ENABLED = True
+            main.pipeline.warm_up = lambda: release.wait(30) and 0.0
+            
+            with TestClient(main.app) as client:
+                before = client.get("/ready")
+                release.set()
+                deadline = time.monotonic() + 30
+                while (after := client.get("/ready")).status_code != 200 and time.monotonic() < deadline:
+                    time.sleep(0.05)
+            
+            print(json.dumps({
+                "built_at_import": built_at_import,
+                "before": [before.status_code, before.headers.get("retry-after"), before.json()],
+                "after": [after.status_code, after.json()]
+            }))
+        """)
+        report = self.run_fresh(tmp_path, code)
+        assert report["built_at_import"] and not any(report["built_at_import"])
+        status, retry_after, body = report["before"]
+        assert (status, retry_after, body["status"]) == (503, "1", "warming up")
+        status, body = report["after"]
+        assert status == 200 and all(body["components"].values())
+    
+    def test_stats_and_metrics_build_nothing(self, tmp_path):
+        """Test that scrapes and cache stats before warm-up leave lazy components unbuilt."""
+        import textwrap
+        
+        code = textwrap.dedent("""
+            import json
+            import main
+            from fastapi.testclient import TestClient
+            from lazy import is_initialized
+            
+            # Without the context manager the startup warm-up never runs
+            client = TestClient(main.app)
+            statuses = [
+                client.get("/metrics").status_code,
+                client.get("/cache/stats").status_code,
+                client.delete("/cache").status_code
+            ]
+            stats = client.get("/cache/stats").json()
+            agents = [main.pipeline.generator, main.pipeline.reviewer, main.job_manager, main.push_queue]
+            print(json.dumps({
+                "statuses": statuses,
+                "render_cache": stats["render_cache"],
+                "built": [is_initialized(proxy) for proxy in agents],
+                "metrics": client.get("/metrics").text
+            }))
+        """)
+        report = self.run_fresh(tmp_path, code)
+        
+        assert report["statuses"] == [200, 200, 200]
+        assert report["render_cache"] == {}
+        assert report["built"] == [False, False, False, False]
+        assert 'background_queue_depth{kind="push",state="pending"} 0' in report["metrics"]
+
+
+class TestMetrics:
+    """Test Prometheus-style metrics registry."""
+    
+    def test_histogram_renders_cumulative_buckets(self):
+        """Test histogram text exposition output."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("stage_seconds", "Stage time", ["stage"], buckets=(0.1, 1.0))
+        histogram.observe(0.05, stage="plan")
+        histogram.observe(0.5, stage="plan")
+        
+        output = registry.render()
+        assert '# TYPE stage_seconds histogram' in output
+        assert 'stage_seconds_bucket{stage="plan",le="0.1"} 1' in output
+        assert 'stage_seconds_bucket{stage="plan",le="+Inf"} 2' in output
+        assert 'stage_seconds_count{stage="plan"} 2' in output
+    
+    def test_counter_labels(self):
+        """Test labelled counters."""
+        registry = MetricsRegistry()
+        counter = registry.counter("calls_total", "Calls", ["status"])
+        counter.inc(status="200")
+        counter.inc(2, status="200")
+        
+        assert counter.get(status="200") == 3
+        assert 'calls_total{status="200"} 3' in registry.render()
+
+
+class TestPushQueue:
+    """Test durable retrying push queue."""
+    
+    @staticmethod
+    def _wait_for(queue, push_id, status, timeout=5.0):
+        import time
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            push = queue.get(push_id)
+            if push["status"] == status:
+                return push
+            time.sleep(0.01)
+        return queue.get(push_id)
+    
+    def test_failed_attempts_are_retried(self, tmp_path):
+        """Test that a push is retried with backoff until it succeeds."""
+        attempts = []
+        
+        def handler(push, cancel_token):
+            attempts.append(push["attempts"])
+            if len(attempts) < 3:
+                raise RuntimeError("GitHub unavailable")
+        
+        queue = PushQueue(str(tmp_path / "push.db"), workers=1, base_delay=0.01, poll_interval=0.01)
+        queue.start(handler)
+        push_id = queue.enqueue("demo", str(tmp_path), "demo")
+        push = self._wait_for(queue, push_id, "done")
+        queue.stop()
+        
+        assert push["status"] == "done"
+        assert attempts == [1, 2, 3]
+        assert push["last_error"] is None
+    
+    def test_exhausted_push_fails_and_can_be_retried(self, tmp_path):
+        """Test max attempts, manual retry and recovery after restart."""
+        def fail(push, cancel_token):
+            raise RuntimeError("bad credentials")
+        
+        db_path = str(tmp_path / "push.db")
+        queue = PushQueue(db_path, workers=1, max_attempts=2, base_delay=0.01, poll_interval=0.01)
+        queue.start(fail)
+        push_id = queue.enqueue("demo", str(tmp_path), "demo")
+        push = self._wait_for(queue, push_id, "failed")
+        queue.stop()
+        
+        assert push["attempts"] == 2
+        assert "bad credentials" in push["last_error"]
+        assert queue.retry(push_id)
+        assert not queue.retry(push_id)
+        
+        reopened = PushQueue(db_path, workers=1, poll_interval=0.01)
+        assert reopened.counts()["pending"] == 1
+        reopened.start(lambda push, cancel_token: None)
+        push = self._wait_for(reopened, push_id, "done")
+        reopened.stop()
+        
+        assert push["status"] == "done"
+        assert push["attempts"] == 3
+    
+    def test_pending_push_can_be_cancelled(self, tmp_path):
+        """Test that a pending push is cancelled and can be resumed."""
+        queue = PushQueue(str(tmp_path / "push.db"))
+        push_id = queue.enqueue("demo", str(tmp_path), "demo")
+        
+        assert queue.cancel(push_id)
+        assert queue.get(push_id)["status"] == "cancelled"
+        assert not queue.cancel(push_id)
+        assert queue.retry(push_id)
+        assert queue.get(push_id)["status"] == "pending"
+
+
+class TestArchive:
+    """Test streaming project archives."""
+    
+    def test_zip_and_tar_gz_roundtrip(self, tmp_path):
+        """Test that both formats contain every file byte for byte."""
+        import io
+        import tarfile
+        import zipfile
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "main.py").write_text("print('hi')\n" * 1000)
+        (tmp_path / "README.md").write_text("# Demo\n")
+        
+        zip_data = b"".join(iter_zip(tmp_path, "demo"))
+        with zipfile.ZipFile(io.BytesIO(zip_data)) as archive:
+            assert archive.testzip() is None
+            assert archive.read("demo/src/main.py") == (tmp_path / "src" / "main.py").read_bytes()
+        
+        tar_data = b"".join(iter_tar_gz(tmp_path, "demo"))
+        with tarfile.open(fileobj=io.BytesIO(tar_data), mode="r:gz") as archive:
+            assert sorted(archive.getnames()) == ["demo/README.md", "demo/src/main.py"]
+            assert archive.extractfile("demo/README.md").read() == b"# Demo\n"
+    
+    def test_symlinks_are_not_followed(self, tmp_path):
+        """Test that links to files or directories outside the project are left out."""
+        import io
+        import tarfile
+        import zipfile
+        outside = tmp_path / "outside"
+        (outside / "secrets").mkdir(parents=True)
+        (outside / "secret.txt").write_text("secret")
+        (outside / "secrets" / "key.txt").write_text("key")
+        project = tmp_path / "project"
+        project.mkdir()
+        (project / "main.py").write_text("x = 1\n")
+        (project / "linked.txt").symlink_to(outside / "secret.txt")
+        (project / "linked_dir").symlink_to(outside / "secrets", target_is_directory=True)
+        
+        with zipfile.ZipFile(io.BytesIO(b"".join(iter_zip(project)))) as archive:
+            assert archive.namelist() == ["main.py"]
+        with tarfile.open(fileobj=io.BytesIO(b"".join(iter_tar_gz(project))), mode="r:gz") as archive:
+            assert archive.getnames() == ["main.py"]
+
+
+class TestHttpUtils:
+    """Test conditional and range request helpers."""
+    
+    def test_parse_range(self):
+        """Test single, open-ended, suffix and invalid ranges."""
+        assert parse_range("bytes=0-9", 100) == (0, 9)
+        assert parse_range("bytes=90-", 100) == (90, 99)
+        assert parse_range("bytes=-10", 100) == (90, 99)
+        assert parse_range("bytes=50-500", 100) == (50, 99)
+        assert parse_range("bytes=0-1,5-6", 100) is None
+        assert parse_range("items=0-1", 100) is None
+        with pytest.raises(RangeNotSatisfiableError):
+            parse_range("bytes=100-", 100)
+    
+    def test_etag_changes_with_content(self, tmp_path):
+        """Test that ETags track content and match If-None-Match."""
+        path = tmp_path / "main.py"
+        path.write_text("print('a')")
+        cache = ETagCache()
+        etag = cache.etag(path, path.stat())
+        
+        assert cache.etag(path, path.stat()) == etag
+        assert etag_matches(f'W/{etag}, "other"', etag)
+        
+        path.write_text("print('bb')")
+        assert cache.etag(path, path.stat()) != etag
+
+
+class TestProjectIndex:
+    """Test indexed project file listings."""
+    
+    def test_pagination_and_filters(self, tmp_path):
+        """Test cursor paging, glob filtering and indexing of writes."""
+        from backend.schemas import GeneratedFile
+        index = ProjectIndex(str(tmp_path / "workspace"), str(tmp_path / "index"))
+        writer = FileWriter(str(tmp_path / "workspace"), index)
+        writer.write_files("demo", [
+            GeneratedFile(path=f"src/mod{i}.py", content=f"x = {i}\n", language="python")
+            for i in range(5)
+        ] + [GeneratedFile(path="README.md", content="# Demo\n", language="markdown")])
+        
+        pages, cursor = [], None
+        while True:
+            page, cursor = index.list_files("demo", cursor, limit=2)
+            pages.append([entry["path"] for entry in page])
+            if cursor is None:
+                break
+        assert sum(pages, []) == writer.get_all_files_in_project("demo")
+        assert len(pages) == 3
+        
+        page, _ = index.list_files("demo", pattern="src/*.py", limit=10)
+        assert [entry["path"] for entry in page] == [f"src/mod{i}.py" for i in range(5)]
+        assert page[0]["size"] == len("x = 0\n")
+        
+        # A fresh index rebuilds from disk on first use
+        assert ProjectIndex(str(tmp_path / "workspace"), str(tmp_path / "other")).count("demo") == 6
+        with pytest.raises(ValueError):
+            index.list_files("demo", cursor="%%%")
+    
+    def test_deferred_updates_are_saved_on_exit(self, tmp_path):
+        """Test that a change set's manifest updates are listed at once and persisted when it ends."""
+        from backend.schemas import FileChange
+        index = ProjectIndex(str(tmp_path / "workspace"), str(tmp_path / "index"))
+        writer = FileWriter(str(tmp_path / "workspace"), index)
+        writer.create_project_structure("demo", {})
+        writer.write_single_file("demo", "old.py", "x")
+        manifest_path = tmp_path / "index" / "demo.json"
+        
+        with index.deferred("demo"):
+            (tmp_path / "workspace" / "demo" / "late.py").write_text("y")
+            index.record("demo", {"late.py": b"y"})
+            assert "late.py" in index.paths("demo")
+            assert "late.py" not in json.loads(manifest_path.read_text())
+        assert "late.py" in json.loads(manifest_path.read_text())
+        
+        applied, _ = writer.apply_changes("demo", [
+            FileChange(path="new.py", action="create", content="y"),
+            FileChange(path="old.py", action="delete")
+        ])
+        assert applied
+        assert sorted(json.loads(manifest_path.read_text())) == ["late.py", "new.py"]
+
+
+class TestGenerateAPI:
+    """Test queued generation and the /jobs endpoints."""
+    
+    def test_generate_is_queued_and_polled(self, api):
+        """Test that /generate answers 202 at once and /jobs reports the result."""
+        main, client = api
+        response = client.post("/generate", json={
+            "prompt": "queued todo api", "github_repo_name": "queued_api", "auto_push": False
+        })
+        
+        assert response.status_code == 202
+        submitted = response.json()
+        assert submitted["status"] in ("queued", "running")
+        assert submitted["status_url"] == f"/jobs/{submitted['job_id']}"
+        
+        job = wait_for_job(client, submitted["job_id"])
+        assert job["status"] == "completed" and job["kind"] == "generate"
+        assert job["result"]["success"] is True
+        assert job["result"]["project_name"] == "queued_api"
+        assert job["result"]["files_created"] > 0
+        assert main.file_writer.project_exists("queued_api")
+    
+    def test_unknown_job_is_404(self, api):
+        """Test that status, events and cancel of an unknown job are 404."""
+        main, client = api
+        assert client.get("/jobs/missing").status_code == 404
+        assert client.get("/jobs/missing/events").status_code == 404
+        assert client.post("/jobs/missing/cancel").status_code == 404
+    
+    def test_full_queue_is_503_with_retry_after(self, api, monkeypatch):
+        """Test that a full job queue rejects /generate with a Retry-After hint."""
+        import threading
+        
+        main, client = api
+        release = threading.Event()
+        # main's own class, so the QueueFullError it raises is the one main catches
+        manager = main.JobManager(max_workers=1, max_queue=1)
+        monkeypatch.setattr(main, "job_manager", manager)
+        manager.submit("test", lambda job: release.wait(10))
+        manager.submit("test", lambda job: release.wait(10))
+        try:
+            response = client.post("/generate", json={"prompt": "rejected api", "auto_push": False})
+        finally:
+            release.set()
+            manager.shutdown(wait=True)
+        
+        assert response.status_code == 503
+        assert int(response.headers["retry-after"]) >= 1
+
+
+class TestJobEventsAPI:
+    """Test the /jobs/{id}/events server-sent event stream."""
+    
+    @staticmethod
+    def parse_events(text: str) -> list:
+        """(id, event name, data) of each event in an SSE body."""
+        events = []
+        for block in text.split("\n\n"):
+            fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+            if "id" in fields:
+                events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+        return events
+    
+    def test_events_arrive_in_order_and_stream_closes(self, api):
+        """Test live delivery in order, ending after the terminal event."""
+        import threading
+        
+        main, client = api
+        proceed = threading.Event()
+        
+        def work(job):
+            job.emit("plan", "planned")
+            proceed.wait(10)
+            job.emit("write", "wrote", path="main.py")
+            return {}
+        
+        job = main.job_manager.submit("generate", work)
+        threading.Timer(0.3, proceed.set).start()
+        # Returns only once the job has finished
+        events = self.parse_events(client.get(f"/jobs/{job.job_id}/events").text)
+        
+        ids = [seq for seq, _, _ in events]
+        assert ids == list(range(1, len(events) + 1))
+        stages = [stage for _, stage, _ in events]
+        assert stages[-3:] == ["plan", "write", "completed"]
+        assert events[-2][2]["data"] == {"path": "main.py"}
+        assert all(data["seq"] == seq and data["timestamp"] for seq, _, data in events)
+    
+    def test_last_event_id_resumes_after_that_event(self, api):
+        """Test that a reconnecting client only gets events it has not seen."""
+        main, client = api
+        
+        def work(job):
+            for i in range(3):
+                job.emit("write", f"file {i}")
+            return {}
+        
+        job = main.job_manager.submit("generate", work)
+        wait_for_job(client, job.job_id)
+        url = f"/jobs/{job.job_id}/events"
+        everything = self.parse_events(client.get(url).text)
+        
+        resumed = self.parse_events(client.get(url, headers={"Last-Event-ID": "2"}).text)
+        assert resumed == everything[2:]
+        assert resumed[-1][1] == "completed"
+        
+        # Malformed ids replay everything instead of failing
+        for garbage in ("abc", "-5", "1.5"):
+            response = client.get(url, headers={"Last-Event-ID": garbage})
+            assert response.status_code == 200
+            assert self.parse_events(response.text) == everything
+
+
+class TestPlanAPI:
+    """Test plan previews and the plan cache."""
+    
+    def test_plan_cache_hit_and_miss(self, api):
+        """Test X-Plan-Cache across whitespace variants, project names and empty prompts."""
+        main, client = api
+        first = client.post("/plan", json={"prompt": "plan cache flask app"})
+        assert first.status_code == 200 and first.headers["x-plan-cache"] == "miss"
+        
+        again = client.post("/plan", json={"prompt": "  plan cache\n flask   app "})
+        assert again.headers["x-plan-cache"] == "hit"
+        assert again.json() == first.json()
+        
+        renamed = client.post("/plan", json={"prompt": "plan cache flask app", "project_name": "other"})
+        assert renamed.headers["x-plan-cache"] == "miss"
+        assert renamed.json()["project_name"] == "other"
+        
+        assert client.post("/plan", json={"prompt": "   "}).status_code == 400
+
+
+class TestChangesAPI:
+    """Test atomic change sets on /project/{name}/changes."""
+    
+    def test_conflict_is_409_and_writes_nothing(self, api):
+        """Test that one bad change rejects the whole set and leaves files and listing as they were."""
+        main, client = api
+        make_project(main, "changes_project", {"a.py": "old a\n", "b.py": "old b\n"})
+        project_path = Path(main.file_writer.get_project_path("changes_project"))
+        url = "/project/changes_project/changes"
+        
+        response = client.post(url, json={"changes": [
+            {"path": "a.py", "action": "update", "content": "new a\n"},
+            {"path": "c.py", "action": "create", "content": "c\n"},
+            {"path": "b.py", "action": "delete"},
+            {"path": "missing.py", "action": "update", "content": "x\n"}
+        ]})
+        
+        assert response.status_code == 409
+        body = response.json()
+        assert body["applied"] is False
+        assert [r["success"] for r in body["results"]] == [False] * 4
+        assert body["results"][3]["path"] == "missing.py" and body["results"][3]["error"]
+        assert sorted(p.name for p in project_path.iterdir()) == ["a.py", "b.py"]
+        assert (project_path / "a.py").read_text() == "old a\n"
+        listed = client.get("/project/changes_project/files").json()
+        assert [entry["path"] for entry in listed["files"]] == ["a.py", "b.py"]
+        
+        response = client.post(url, json={"changes": [
+            {"path": "a.py", "action": "update", "content": "new a\n"},
+            {"path": "b.py", "action": "delete"}
+        ]})
+        assert response.status_code == 200 and response.json()["applied"] is True
+        assert sorted(p.name for p in project_path.iterdir()) == ["a.py"]
+
+
+class TestBatchGetAPI:
+    """Test reading many files with /project/{name}/files:batchGet."""
+    
+    def test_json_and_ndjson_with_missing_paths(self, api):
+        """Test request order, per-path errors and NDJSON negotiation."""
+        main, client = api
+        make_project(main, "batchget_project", {"a.py": "a = 1\n", "src/b.py": "b = 2\n"})
+        url = "/project/batchget_project/files:batchGet"
+        paths = ["src/b.py", "gone.py", "a.py", "../outside.py"]
+        expected = [
+            {"path": "src/b.py", "content": "b = 2\n", "size": 6},
+            {"path": "gone.py", "error": "not found"},
+            {"path": "a.py", "content": "a = 1\n", "size": 6},
+            {"path": "../outside.py", "error": "invalid path"}
+        ]
+        
+        response = client.post(url, json={"paths": paths})
+        assert response.status_code == 200
+        assert response.json() == {"project_name": "batchget_project", "files": expected}
+        
+        response = client.post(url, json={"paths": paths}, headers={"Accept": "application/x-ndjson"})
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert [json.loads(line) for line in response.text.splitlines()] == expected
+        
+        assert client.post("/project/nowhere/files:batchGet", json={"paths": ["a.py"]}).status_code == 404
+
+
+class TestNegotiationAPI:
+    """Test response format and compression negotiated by the middleware."""
+    
+    LARGE = "print('negotiated')\n" * 200
+    
+    @pytest.fixture
+    def url(self, api):
+        main, client = api
+        make_project(main, "negotiated_project", {"main.py": self.LARGE})
+        return "/project/negotiated_project/file/main.py"
+    
+    def test_json_and_gzip_above_threshold(self, api, url):
+        """Test that large JSON bodies are gzipped and small ones are not."""
+        main, client = api
+        response = client.get(url, headers={"Accept": "application/json", "Accept-Encoding": "gzip"})
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept, Accept-Encoding"
+        assert response.json()["content"] == self.LARGE
+        
+        small = client.get("/health", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in small.headers
+        identity = client.get(url, headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in identity.headers
+        # Streams are left as they are
+        ndjson = client.post(
+            "/project/negotiated_project/files:batchGet", json={"paths": ["main.py"]},
+            headers={"Accept": "application/x-ndjson", "Accept-Encoding": "gzip"}
+        )
+        assert "content-encoding" not in ndjson.headers
+    
+    def test_threshold_is_configurable(self, api, url):
+        """Test that bodies below COMPRESSION_MIN_BYTES stay uncompressed."""
+        main, client = api
+        main.serialization.configure(min_size=len(self.LARGE) * 2)
+        try:
+            response = client.get(url, headers={"Accept-Encoding": "gzip"})
+        finally:
+            main.serialization.configure(
+                main.Config.COMPRESSION_MIN_BYTES, main.Config.GZIP_LEVEL, main.Config.BROTLI_QUALITY
+            )
+        assert "content-encoding" not in response.headers
+        assert response.json()["content"] == self.LARGE
+    
+    def test_msgpack(self, api, url):
+        """Test that Accept: application/msgpack gets MessagePack."""
+        msgpack = pytest.importorskip("msgpack")
+        main, client = api
+        response = client.get(url, headers={"Accept": "application/msgpack", "Accept-Encoding": "identity"})
+        assert response.headers["content-type"] == "application/msgpack"
+        assert msgpack.unpackb(response.content)["content"] == self.LARGE
+    
+    def test_brotli_preferred_over_gzip(self, api, url):
+        """Test that br wins over equally preferred gzip."""
+        brotli = pytest.importorskip("brotli")
+        main, client = api
+        response = client.get(url, headers={"Accept-Encoding": "gzip, br"})
+        assert response.headers["content-encoding"] == "br"
+        assert response.json()["content"] == self.LARGE
+
+
+class TestBatchAPI:
+    """Test the /generate/batch endpoint."""
+    
+    def test_items_succeed_or_fail_independently_in_order(self, api):
+        """Test partial failure, result order and the shape of a failed item."""
+        main, client = api
+        response = client.post("/generate/batch", json={"requests": [
+            {"prompt": "todo api", "github_repo_name": "batch_dup", "auto_push": False},
+            {"prompt": "streamlit dashboard", "github_repo_name": "batch_other", "auto_push": False},
+            {"prompt": "notes api", "github_repo_name": "batch_dup", "auto_push": False}
+        ]})
+        
+        # Batches answer when every item is done rather than queueing a job
+        assert response.status_code == 200
+        batch = response.json()
+        assert (batch["total"], batch["succeeded"], batch["failed"]) == (3, 2, 1)
+        assert [item["index"] for item in batch["results"]] == [0, 1, 2]
+        assert [item["project_name"] for item in batch["results"][:2]] == ["batch_dup", "batch_other"]
+        assert all(item["files_created"] > 0 for item in batch["results"][:2])
+        
+        failed = batch["results"][2]
+        assert failed["success"] is False
+        assert "Duplicate project name" in failed["error"]
+        assert failed["project_name"] is None and failed["files_created"] == 0
+        assert failed["timings"] == {}
+        assert main.file_writer.project_exists("batch_other")
+    
+    def test_oversized_batch_is_rejected(self, api, monkeypatch):
+        """Test that batches above MAX_BATCH_SIZE get 413 before any work."""
+        main, client = api
+        monkeypatch.setattr(main.Config, "MAX_BATCH_SIZE", 1)
+        response = client.post("/generate/batch", json={"requests": [
+            {"prompt": "a", "auto_push": False}, {"prompt": "b", "auto_push": False}
+        ]})
+        assert response.status_code == 413
+
+
+class TestUpdateAPI:
+    """Test the /update endpoint."""
+    
+    def test_unplanned_path_named_in_prompt_is_left_untouched(self, api, monkeypatch):
+        """Test that no placeholder is generated over a repository file outside the plan."""
+        main, client = api
+        monkeypatch.setattr(main, "_fetch_remote_tree", lambda repo, owner: {
+            "main.py": "0" * 40, "src/utils.py": "1" * 40
+        })
+        
+        response = client.post("/update", json={
+            "github_repo_url": "https://github.com/someone/myrepo",
+            "update_prompt": "fix the bug in src/utils.py",
+            "auto_push": False
+        })
+        assert response.status_code == 202
+        job = wait_for_job(client, response.json()["job_id"])
+        
+        assert job["status"] == "completed"
+        assert job["result"]["skipped_files"] == ["src/utils.py"]
+        assert job["result"]["changed_files"] == []
+        assert job["result"]["files_modified"] == 0
+    
+    def test_repository_of_another_owner_is_rejected(self, api, monkeypatch):
+        """Test that an update is refused unless it would push to the repository it reads."""
+        main, client = api
+        monkeypatch.setattr(main, "GITHUB_USERNAME", "me")
+        
+        def unexpected(repo, owner):
+            raise AssertionError("tree read for a rejected update")
+        
+        monkeypatch.setattr(main, "_fetch_remote_tree", unexpected)
+        jobs_before = len(main.job_manager.list_jobs())
+        
+        for url in ("https://github.com/someone/myrepo", "myrepo"):
+            response = client.post("/update", json={
+                "github_repo_url": url, "update_prompt": "fix it", "auto_push": False
+            })
+            assert response.status_code == 400
+        assert "someone" in client.post("/update", json={
+            "github_repo_url": "https://github.com/someone/myrepo", "update_prompt": "fix it"
+        }).json()["detail"]
+        assert len(main.job_manager.list_jobs()) == jobs_before
+
+
+class TestArchiveAPI:
+    """Test /project/{name}/archive downloads."""
+    
+    def test_zip_and_tar_gz_downloads(self, api):
+        """Test both formats, their headers and that symlinks are left out."""
+        import io
+        import tarfile
+        import zipfile
+        
+        main, client = api
+        make_project(main, "archived", {"main.py": "x = 1\n", "src/app.py": "y = 2\n"})
+        project_path = Path(main.file_writer.get_project_path("archived"))
+        outside = project_path.parent.parent / "outside.py"
+        outside.write_text("secret = 1\n")
+        (project_path / "linked.py").symlink_to(outside)
+        
+        response = client.get("/project/archived/archive")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        assert response.headers["content-disposition"] == 'attachment; filename="archived.zip"'
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert sorted(archive.namelist()) == ["archived/main.py", "archived/src/app.py"]
+            assert archive.read("archived/src/app.py") == b"y = 2\n"
+        
+        response = client.get("/project/archived/archive", params={"format": "tar.gz"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/gzip"
+        assert response.headers["content-disposition"] == 'attachment; filename="archived.tar.gz"'
+        with tarfile.open(fileobj=io.BytesIO(response.content), mode="r:gz") as archive:
+            assert sorted(archive.getnames()) == ["archived/main.py", "archived/src/app.py"]
+            assert archive.extractfile("archived/main.py").read() == b"x = 1\n"
+    
+    def test_unknown_project_and_format(self, api):
+        """Test 404 for an unknown project and 400 for an unsupported format."""
+        main, client = api
+        make_project(main, "archived_formats", {"main.py": "x = 1\n"})
+        assert client.get("/project/nowhere/archive").status_code == 404
+        assert client.get("/project/archived_formats/archive", params={"format": "rar"}).status_code == 400
+
+
+class TestRawFileAPI:
+    """Test conditional and ranged raw file downloads."""
+    
+    def test_etag_range_and_head(self, api):
+        """Test 200, 304, 206, If-Range and HEAD with and without a range."""
+        main, client = api
+        make_project(main, "raw_project", {"main.py": "0123456789abcdef"})
+        url = "/project/raw_project/raw/main.py"
+        
+        full = client.get(url)
+        etag = full.headers["etag"]
+        assert full.status_code == 200 and full.content == b"0123456789abcdef"
+        
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+        
+        ranged = client.get(url, headers={"Range": "bytes=2-5"})
+        assert ranged.status_code == 206 and ranged.content == b"2345"
+        assert ranged.headers["content-range"] == "bytes 2-5/16"
+        
+        # A stale If-Range gets the whole file
+        stale = client.get(url, headers={"Range": "bytes=2-5", "If-Range": '"stale"'})
+        assert stale.status_code == 200 and len(stale.content) == 16
+        current = client.get(url, headers={"Range": "bytes=2-5", "If-Range": etag})
+        assert current.status_code == 206
+        
+        head = client.head(url, headers={"Range": "bytes=0-9"})
+        assert head.status_code == 206 and head.content == b""
+        assert head.headers["content-length"] == "10"
+        assert head.headers["content-range"] == "bytes 0-9/16"
+        head = client.head(url)
+        assert head.status_code == 200 and head.headers["content-length"] == "16"
+
+
+class TestPushAPI:
+    """Test pushes scheduled by jobs."""
+    
+    def test_cancelled_pending_push_releases_job_stream(self, api, monkeypatch, tmp_path):
+        """Test that cancelling a push that never ran lets the job's event stream end."""
+        main, client = api
+        # Without started workers the push stays pending
+        monkeypatch.setattr(main, "push_queue", PushQueue(str(tmp_path / "pushes.db")))
+        job = main.job_manager.submit(
+            "generate",
+            lambda job: {"push_id": main._enqueue_push("held", tmp_path, "held", "", parent=job)}
+        )
+        push_id = wait_for_job(client, job.job_id)["result"]["push_id"]
+        assert not job.stream_closed
+        
+        assert client.post(f"/pushes/{push_id}/cancel").json()["status"] == "cancelled"
+        assert job.stream_closed
+        # Returns rather than polling forever
+        assert "event: completed" in client.get(f"/jobs/{job.job_id}/events").text
+
+
+class TestProjectWrites:
+    """Test concurrent writes of generated projects to the workspace."""
+    
+    def test_failed_stream_never_removes_another_jobs_files(self, api):
+        """Test that a second write of the same project waits for a streamed write to end."""
+        import threading
+        from backend.schemas import GeneratedFile, ProjectPlan
+        
+        main, client = api
+        plan = ProjectPlan(
+            project_name="contended", description="", tech_stack=["Python"],
+            structure={}, files=[], entry_point="main.py"
+        )
+        first_written = threading.Event()
+        fail_stream = threading.Event()
+        
+        def failing_stream():
+            yield GeneratedFile(path="a.py", content="a")
+            first_written.set()
+            fail_stream.wait(10)
+            raise RuntimeError("generation failed")
+        
+        def write_failing():
+            with pytest.raises(RuntimeError):
+                main._write_project(plan, failing_stream())
+        
+        failing = threading.Thread(target=write_failing)
+        failing.start()
+        assert first_written.wait(10)
+        second = threading.Thread(
+            target=main._write_project,
+            args=(plan, [GeneratedFile(path="b.py", content="b")])
+        )
+        second.start()
+        second.join(0.2)
+        assert second.is_alive()
+        
+        fail_stream.set()
+        failing.join(10)
+        second.join(10)
+        
+        project_path = Path(main.file_writer.get_project_path("contended"))
+        assert sorted(p.name for p in project_path.iterdir()) == ["b.py"]
+        assert main._project_locks == {}
+
+
+class TestMetricsAPI:
+    """Test the /metrics endpoint."""
+    
+    def test_worker_capacity_is_not_a_queue_state(self, api):
+        """Test that capacity has its own gauge, so summing job_queue_jobs gives queue depth."""
+        main, client = api
+        text = client.get("/metrics").text
+        
+        assert 'job_queue_jobs{priority="interactive",state="queued"}' in text
+        assert 'state="capacity"' not in text
+        capacity = {
+            line.split('"')[1]: float(line.split()[-1])
+            for line in text.splitlines() if line.startswith("job_workers_capacity{")
+        }
+        assert set(capacity) == {"interactive", "bulk"}
+        assert capacity["interactive"] >= capacity["bulk"] > 0
+
+
+class TestStartup:
+    """Test what the app does when it starts."""
+    
+    def test_startup_applies_log_level(self, api):
+        """Test that the app logger uses LOG_LEVEL and the configured format."""
+        import logging
+        from backend.config import Config
+        
+        main, client = api
+        assert main.logger.level == getattr(logging, Config.LOG_LEVEL)
+        assert not main.logger.propagate
+        assert any(
+            handler.formatter is not None and "%(levelname)s" in handler.formatter._fmt
+            for handler in main.logger.handlers
+        )
 
 
 class TestIntegration: